@@ -2,6 +2,12 @@
 Py_rinterpolate is a python wrapper for the rinterpolate library of Robert Izzard
 """
 
-from .main import Rinterpolate
+from .main import (
+    Rinterpolate,
+    RinterpolateGrid,
+    set_simd,
+    set_tracked_allocation,
+    simd_level,
+)
 
 # from . import _py_rinterpolate
@@ -18,12 +18,118 @@ For a good description of the requirements and workings of the rinterpolate, see
 """
 
 import numpy as np
+import os
+import sys
+import time
 import uuid
 import random
 import string
+import threading
+import warnings
+
+try:
+    from pickle import PickleBuffer  # python >= 3.8
+except ImportError:
+    PickleBuffer = None
 
 from py_rinterpolate import _py_rinterpolate  # Import the c-module
 
+# Evaluation modes, see librinterpolate's RINTERPOLATE_MODE_* macros
+EVALUATION_MODES = {
+    "linear": 0,  # Multilinear interpolation on the hypercube
+    "nearest": 1,  # Data of the nearest grid node
+    "floor": 2,  # Data of the grid node at or below the coordinates
+    "simplex": 3,  # Linear interpolation on the n+1 vertices of the simplex around the coordinates
+}
+
+# Levels of the SIMD kernels, see librinterpolate's RINTERPOLATE_SIMD_* macros
+SIMD_LEVELS = {
+    "generic": 0,  # Plain C loops
+    "sse2": 1,  # 2 doubles per instruction
+    "avx2": 2,  # 4 doubles per instruction, with fused multiply-adds
+    "avx512": 3,  # 8 doubles per instruction, with fused multiply-adds
+}
+
+# Search algorithms of the parameter axes, see librinterpolate's RINTERPOLATE_SEARCH_* macros
+SEARCH_METHODS = {
+    "binary": 0,  # Bisection
+    "branchless": 1,  # Bisection with conditional moves instead of branches
+    "linear": 2,  # Scan from the lowest grid value, for short axes
+    "hunt": 3,  # Gallop from the grid value found last time, for coordinates that change slowly
+    "indexed": 4,  # Start from an index of uniform buckets of the axis, for uniform grids
+}
+
+def set_simd(level=None):
+    """
+    Function to choose the SIMD kernels used in the inner loops of librinterpolate.
+
+    At import, the highest level supported by the CPU is chosen, unless the environment
+    variable RINTERPOLATE_SIMD sets the level. A lower level can be forced, e.g. for
+    benchmarking. The avx2 and avx512 kernels use fused multiply-adds, so their results
+    may differ from the others in the last bit.
+
+    Args:
+        level: one of the keys of SIMD_LEVELS, or None for the highest level supported by the CPU
+
+    Returns:
+        the name of the level in use
+    """
+
+    if level is None:
+        level_number = -1
+    elif level in SIMD_LEVELS:
+        level_number = SIMD_LEVELS[level]
+    else:
+        raise ValueError(
+            "set_simd: unknown SIMD level {}, choose one of {}".format(
+                level, list(SIMD_LEVELS.keys())
+            )
+        )
+
+    _py_rinterpolate._rinterpolate_set_simd(level_number)  # api call
+
+    return simd_level()
+
+def simd_level():
+    """
+    Function to get the name of the level of the SIMD kernels in use
+    """
+
+    level_number, _ = _py_rinterpolate._rinterpolate_simd_level()  # api call
+
+    return {number: name for name, number in SIMD_LEVELS.items()}[level_number]
+
+# A bad RINTERPOLATE_SIMD should not break the import: fall back to the highest level
+try:
+    set_simd(os.environ.get("RINTERPOLATE_SIMD", None))
+except ValueError as error:
+    warnings.warn(
+        "RINTERPOLATE_SIMD={} is ignored ({}), using the highest level supported by the CPU".format(
+            os.environ["RINTERPOLATE_SIMD"], error
+        )
+    )
+    set_simd(None)
+
+def set_tracked_allocation(tracked=True):
+    """
+    Function to allocate the memory of librinterpolate and the C_tables through
+    python's raw allocator, so that tracemalloc and other memory profilers see it,
+    or (tracked=False) through the standard malloc again.
+
+    The allocator can only be changed while no interpolator holds C memory, i.e.
+    before the first interpolator is made or after all of them are destroyed.
+
+    Args:
+        tracked: whether to allocate through python's raw allocator
+    """
+
+    try:
+        _py_rinterpolate._rinterpolate_set_tracked_allocation(tracked)  # api call
+    except RuntimeError as e:
+        raise RuntimeError(
+            "set_tracked_allocation: {}. Destroy all interpolators first".format(e)
+        )
+
 def id_generator(size=8, chars=string.ascii_uppercase + string.digits):
     return "".join(random.choice(chars) for _ in range(size))
 
@@ -44,11 +150,134 @@ def verbose_print(message: str, verbosity: int, minimal_verbosity: int) -> None:
         print(message)
 
 
+def _decimate_axis(values, data, tolerance):
+    """
+    Function to choose the grid values of one axis that are kept when the axis is
+    decimated: a grid value is removed if the linear interpolation between the kept
+    values on either side reproduces its slice of the data within the tolerance.
+
+    Args:
+        values: the grid values of the axis
+        data: the data, of shape (len(values), ..., ndata)
+        tolerance: the largest error allowed in each data column, of shape (ndata,)
+
+    Returns the indices of the kept grid values, which include the first and the last.
+    """
+
+    kept = [0]
+    start = 0
+    end = start + 2
+    while end < len(values):
+        # the slices strictly between start and end, interpolated from them
+        weights = (values[start + 1 : end] - values[start]) / (values[end] - values[start])
+        weights = weights.reshape((-1,) + (1,) * (data.ndim - 1))
+        interpolated = data[start] * (1.0 - weights) + data[end] * weights
+        if np.all(np.abs(interpolated - data[start + 1 : end]) <= tolerance):
+            end += 1
+        else:
+            start = end - 1
+            kept.append(start)
+            end = start + 2
+    if len(values) > 1:
+        kept.append(len(values) - 1)
+
+    return kept
+
+
+def _rebuild_rinterpolate(cls, table, state):
+    """
+    Function to rebuild a pickled Rinterpolate object. See Rinterpolate.__reduce_ex__
+
+    The table is wrapped as a flat numpy array without copying it (unless the buffer
+    is read-only), and only a new dataspace is allocated. The C_table is set up at
+    the first interpolation.
+    """
+
+    rinterpolator = cls.__new__(cls)
+    rinterpolator.__dict__.update(state)
+
+    table = np.frombuffer(table, dtype=np.float64)
+    if not table.flags.writeable:
+        table = table.copy()
+    rinterpolator._table = table
+
+    rinterpolator._setup_lock = threading.RLock()
+    rinterpolator._localcache = {"C_table": None, "C_size": -1}
+    rinterpolator._dataspace = _py_rinterpolate._rinterpolate_alloc_dataspace_wrapper()
+
+    verbose_print(
+        "{}: rebuilt from pickle".format(rinterpolator.name),
+        rinterpolator.verbosity,
+        1,
+    )
+
+    return rinterpolator
+
+
 class Rinterpolate(object):
     """
     Class to interpolate on parameters given a certain input table. 
 
     The input _should_ be a multidimensional array. For now it doesnt work with dictionaries.
+
+    With tile_size > 1 the data of the C-side copy of the table are also stored in blocks
+    of tile_size grid points along each axis, so that the corners of a grid cell are close
+    together in memory. This can speed up uncached interpolation on high-dimensional
+    tables, at the cost of the tiled copy of the data columns (nlines * ndata floats,
+    reported as layout by memory_usage). The results do not change.
+
+    With ragged=True the table only has to contain the nodes of the parameter grid that
+    exist, instead of a fully filled grid. The lines should still be sorted as in the
+    full table. Interpolation in a cell of which a corner is missing returns nan.
+
+    With cellcache > 0 the hypercubes of the last cellcache grid cells that were
+    interpolated in are kept (each takes 2^nparams * ndata floats). Interpolating at
+    any coordinates in one of these cells then skips the search and the gathering of the
+    2^nparams lines, which helps e.g. integrators that make many small steps. The cache
+    (usecache) only matches coordinates that are exactly the same. The results do not
+    change.
+
+    usecache is the number of results that are cached, or "auto" to let librinterpolate
+    choose it for the table: it counts the hits (and how old the matching lines are)
+    and times some lookups and interpolations over windows of 4096 lookups, and after
+    each window grows, shrinks or turns off the cache to save the most time, keeping
+    the cached results. See cache_info for the size it chose.
+
+    The cache (usecache > 0) matches coordinates bit for bit. With cache_atol or
+    cache_rtol (a tolerance for all parameters, or a sequence of one per parameter)
+    the coordinates are first quantized: on each parameter j they are moved to the
+    centre of a bucket of width 2*cache_atol[j], or else by rounding off mantissa bits,
+    by at most cache_rtol[j]*|x[j]|. Coordinates that differ by less than this then hit
+    the same cache line, and the result is that at the quantized coordinates, so it
+    differs from the exact one by at most sum_j L_j*tol_j, where tol_j is the tolerance
+    of parameter j and L_j the largest slope of the data along it over a grid cell.
+    The quantization is only applied where the cache is used (not in the grouped batch
+    path).
+
+    categorical is a sequence of the numbers of the parameters that are labels or flags
+    (exact-match axes) rather than continuous: on them the coordinate selects the nearest
+    grid value (the lower one at exactly half way) instead of interpolating between two.
+    Each of these axes then halves the number of table lines an interpolation reads.
+
+    search chooses how the grid values of each parameter are searched for the cell
+    around the coordinates: one of the SEARCH_METHODS (binary, branchless, linear, hunt
+    or indexed) for all parameters, or a sequence of one per parameter. The results do
+    not change. See autotune to choose them by timing them on a sample of coordinates.
+
+    With validate=True the table is checked to be a regular, sorted grid when it is
+    loaded in C (see check_table). The time it took to load the table is stored in
+    self.build_time.
+
+    The flattened table is stored in self._table, which is a list of floats or, for
+    an unpickled object, a flat float64 numpy array.
+
+    The interpolation methods can be called from several threads at once. The GIL is
+    released during the batch, grid, fused and locate calls, so threads using different
+    interpolators run in parallel, while the calls on the same interpolator take turns:
+    its C state (the cache, cell cache, search state and the table set up at the first
+    call) is locked while it is used. Changing the table (set_table, update_data,
+    update_column, append, multiply_table_column, destroy) while another thread uses
+    the interpolator is not safe.
     """
 
     def __init__(
@@ -57,14 +286,32 @@ class Rinterpolate(object):
         nparams=-1,
         ndata=-1,
         usecache=0,
+        cellcache=0,
+        cache_atol=None,
+        cache_rtol=None,
+        search="binary",
+        categorical=(),
         _dataspace=None,
         _localcache=None,
         verbosity=0,
+        tile_size=0,
+        ragged=False,
+        validate=False,
         **kwargs
     ):
         self.nparams = nparams  # Amount of parameters contained in the table
         self.ndata = ndata  # Amount of datapoints contained in a table row
-        self.usecache = usecache  # Whether to use cache
+        self.usecache = usecache  # Number of cached results, or "auto"
+        self.cellcache = cellcache  # Number of grid cells whose hypercubes are cached
+        self.cache_atol = cache_atol  # Absolute tolerances of the cache keys
+        self.cache_rtol = cache_rtol  # Relative tolerances of the cache keys
+        self.search = search  # Search algorithm of each parameter axis
+        self.categorical = categorical  # Numbers of the parameters that are exact-match axes
+        self.tile_size = tile_size  # Tile edge length of the C-side table layout (0 = row-major)
+        self.ragged = ragged  # Whether the table only contains the existing nodes of the grid
+        self.validate = validate  # Whether to check the table when it is loaded in C
+        self.build_time = None  # Time (s) it took to load the table in C
+        self._setup_lock = threading.RLock()  # Lock of the loading of the table in C
         self._dataspace = _dataspace  # Dataspace memory capsule
         self.nlines = None  # Set to empty now.
         self.verbosity = verbosity  # set verbosity
@@ -73,7 +320,7 @@ class Rinterpolate(object):
         verbose_print("Rinterpolate: creating {}".format(self.name), self.verbosity, 0)
 
         # Handle table. self.table holds the table, which upon input gets flattened. See module description
-        if not table:
+        if table is None or len(table) == 0:
             self._table = []
         else:
             self._table = self._handle_table_setting(table)
@@ -130,6 +377,12 @@ class Rinterpolate(object):
             )
             raise ValueError(msg)
 
+        # numpy arrays are flattened without going through python floats. They are always
+        # copied, as update_data(), update_column() and multiply_table_column() write to
+        # the table in place
+        if isinstance(table, np.ndarray):
+            return np.array(table, dtype=np.float64, copy=True).reshape(-1)
+
         flattened_table = self._flatten(table)
 
         # if numpy
@@ -214,7 +467,7 @@ class Rinterpolate(object):
             )
 
             _py_rinterpolate._rinterpolate_free_C_table(
-                self._localcache["C_table"]
+                self._localcache["C_table"], self._dataspace
             )  # API call
 
             self._localcache["C_table"] = None
@@ -349,6 +602,163 @@ class Rinterpolate(object):
         for i in range(nlines):
             self._table[i * nl + column] *= factor
 
+    def _data_view(self):
+        """
+        Function to get a (nlines, nparams + ndata) view of the table, converting the
+        flattened table to a numpy array if it is still a list
+        """
+
+        if not isinstance(self._table, np.ndarray):
+            self._table = np.array(self._table, dtype=np.float64)
+
+        return self._table.reshape(self.calc_nlines(), self.nparams + self.ndata)
+
+    def update_data(self, new_values):
+        """
+        Function to overwrite all the data of the table, keeping the parameters.
+
+        new_values should be an array of shape (nlines, ndata). The C_table is updated
+        in place, so the structures that are set up to search the parameter grid are
+        kept, and only the cache of results is cleared.
+        """
+
+        table = self._data_view()
+        new_values = np.ascontiguousarray(new_values, dtype=np.float64)
+
+        if not new_values.size == len(table) * self.ndata:
+            msg = "Error: {}: new data should have shape (nlines={}, ndata={}), got {}".format(
+                self.name, len(table), self.ndata, new_values.shape
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        verbose_print("{}: updating data".format(self.name), self.verbosity, 1)
+
+        table[:, self.nparams :] = new_values.reshape(len(table), self.ndata)
+        self._update_C_table(-1, new_values)
+
+    def update_column(self, column, values):
+        """
+        Function to overwrite one data column (0 = first data column) of the table.
+
+        values should be an array of nlines values. See update_data.
+        """
+
+        table = self._data_view()
+        values = np.ascontiguousarray(values, dtype=np.float64)
+
+        if not (0 <= column < self.ndata and values.size == len(table)):
+            msg = "Error: {}: cannot set data column {} of {} to {} values".format(
+                self.name, column, self.ndata, values.size
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        verbose_print(
+            "{}: updating data column {}".format(self.name, column), self.verbosity, 1
+        )
+
+        table[:, self.nparams + column] = values.reshape(-1)
+        self._update_C_table(column, values)
+
+    def _update_C_table(self, column, values):
+        """
+        Function to pass updated data to the C_table, if that is loaded
+        """
+
+        if self._localcache["C_table"]:
+            _py_rinterpolate._rinterpolate_update_C_table(
+                self._localcache["C_table"],
+                self._dataspace,
+                self.nparams,
+                self.ndata,
+                self.calc_nlines(),
+                column,
+                values,
+            )  # API call
+
+    def append(self, lines):
+        """
+        Function to extend the table along its first parameter.
+
+        lines should be an array of shape (m, nparams + ndata) with one or more slices of
+        the grid along the first parameter, i.e. with the same grid of the other parameters
+        as the table, and values of the first parameter above those in the table.
+
+        The C_table, if loaded, is extended rather than rebuilt: its memory grows
+        geometrically, and only the new lines are checked and added to the structures
+        used to search the grid. A ragged table is rebuilt. If the lines are rejected,
+        a ValueError is raised and the interpolator is unchanged.
+
+        A numpy table is kept at the start of a buffer that also grows geometrically
+        (self._table is a view of the used part), so the cost of an append is
+        proportional to the number of new lines.
+        """
+
+        lines = np.ascontiguousarray(lines, dtype=np.float64)
+        line_length = self.nparams + self.ndata
+
+        if not (lines.size > 0 and lines.size % line_length == 0):
+            msg = "Error: {}: lines to append should have shape (m, nparams + ndata = {}), got {}".format(
+                self.name, line_length, lines.shape
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        verbose_print(
+            "{}: appending {} lines".format(self.name, lines.size // line_length),
+            self.verbosity,
+            1,
+        )
+
+        localcache = self._localcache
+        if localcache["C_table"] and self.ragged:
+            self.clear_localcache()
+        elif localcache["C_table"]:
+            nlines = self.calc_nlines()
+            try:
+                capacity = _py_rinterpolate._rinterpolate_append_C_table(
+                    localcache["C_table"],
+                    self._dataspace,
+                    self.nparams,
+                    self.ndata,
+                    nlines,
+                    localcache.get("C_capacity", nlines),
+                    lines,
+                )  # api call
+            except ValueError as e:
+                msg = "{}: {}".format(self.name, e)
+                verbose_print(msg, self.verbosity, 0)
+                raise ValueError(msg)
+            localcache["C_size"] += lines.size
+            localcache["C_capacity"] = capacity
+
+        if isinstance(self._table, np.ndarray):
+            self._append_to_buffer(lines.reshape(-1))
+        else:
+            self._table.extend(lines.reshape(-1).tolist())
+        self.nlines = None
+
+    def _append_to_buffer(self, items):
+        """
+        Function to append items to a numpy table. The table is a view of the start of
+        self._table_buffer, which is grown to at least twice its size when it is full.
+        """
+
+        used = len(self._table)
+        buffer = getattr(self, "_table_buffer", None)
+        if buffer is None or self._table.base is not buffer:
+            buffer = self._table  # the table is not (or no longer) in the buffer
+
+        if used + len(items) > len(buffer):
+            new_buffer = np.empty(max(used + len(items), 2 * len(buffer)), dtype=np.float64)
+            new_buffer[:used] = self._table
+            buffer = new_buffer
+
+        buffer[used : used + len(items)] = items
+        self._table_buffer = buffer
+        self._table = buffer[: used + len(items)]
+
     def set_table(self, new_table):
         """
         Sets new table data and flattens it.
@@ -394,20 +804,24 @@ class Rinterpolate(object):
             else:
                 yield x
 
-    def interpolate(self, x):
+    def _setup_C_table(self):
         """
-        Actual interpolation function. 
-
-        Passes the C_table and _dataspace memory locations to the interpolate wrapper, along with info about the table.
+        Function to check the table settings and to make sure the C_table is loaded
+        and up to date. Threads that call this at the same time take turns, so that the
+        table is only loaded once.
 
-        the array X gets passed to the interpolator, containing the coordinates we are interested in. 
+        Returns the number of lines in the table.
+        """
 
-        The function returns an array r, as the result.
+        with self._setup_lock:
+            return self._load_C_table()
 
-        Flag usecache determines whether the 
+    def _load_C_table(self):
+        """
+        Function that does the work of _setup_C_table
         """
 
-        if not self._table:
+        if len(self._table) == 0:
             msg = "{}: Table not set or empty. Aborting".format(self.name)
             verbose_print(
                 msg,
@@ -430,9 +844,6 @@ class Rinterpolate(object):
             )
             raise ValueError(msg)
 
-        # put input in correct type
-        input_x = [float(el) for el in x]
-
         # Set data, nparams, ndata:
         nlines = self.calc_nlines()
 
@@ -449,7 +860,9 @@ class Rinterpolate(object):
                 "{}: Table changed. freeing table".format(self.name), self.verbosity, 1
             )
 
-            _py_rinterpolate._rinterpolate_free_C_table(localcache["C_table"])
+            _py_rinterpolate._rinterpolate_free_C_table(
+                localcache["C_table"], self._dataspace
+            )
 
             localcache["C_table"] = None
             localcache["C_size"] = -1
@@ -462,12 +875,498 @@ class Rinterpolate(object):
                 self.verbosity,
                 1,
             )
+            start_time = time.perf_counter()
 
             localcache["C_table"] = _py_rinterpolate._rinterpolate_set_C_table(
                 self._table, self.nparams, self.ndata, nlines
             )
             # api call
             localcache["C_size"] = n
+            localcache["C_capacity"] = nlines  # Number of lines that fit in the C_table memory
+
+            # Set up the table as a ragged table
+            if self.ragged:
+                try:
+                    nnodes = _py_rinterpolate._rinterpolate_set_ragged_wrapper(
+                        localcache["C_table"],
+                        self._dataspace,
+                        self.nparams,
+                        self.ndata,
+                        nlines,
+                        self._cache_length,
+                    )  # api call
+                except ValueError as e:
+                    self.clear_localcache()
+                    msg = "{}: {}".format(self.name, e)
+                    verbose_print(msg, self.verbosity, 0)
+                    raise ValueError(msg)
+                verbose_print(
+                    "{}: ragged table contains {} of {} grid nodes".format(
+                        self.name, nlines, nnodes
+                    ),
+                    self.verbosity,
+                    1,
+                )
+
+            # Re-layout the table in tiles
+            if self.tile_size:
+                tile_size = _py_rinterpolate._rinterpolate_set_layout_wrapper(
+                    localcache["C_table"],
+                    self._dataspace,
+                    self.nparams,
+                    self.ndata,
+                    nlines,
+                    self._cache_length,
+                    self.tile_size,
+                )  # api call
+                verbose_print(
+                    "{}: stored table in tiles of size {}".format(self.name, tile_size),
+                    self.verbosity,
+                    1,
+                )
+
+            # Keep the hypercubes of recent cells
+            if self.cellcache:
+                _py_rinterpolate._rinterpolate_set_cell_cache_wrapper(
+                    localcache["C_table"],
+                    self._dataspace,
+                    self.nparams,
+                    self.ndata,
+                    nlines,
+                    self._cache_length,
+                    self.cellcache,
+                )  # api call
+
+            # Quantize the cache keys
+            if self.cache_atol is not None or self.cache_rtol is not None:
+                try:
+                    atol, rtol = self._cache_tolerances()
+                except ValueError:
+                    self.clear_localcache()
+                    raise
+                _py_rinterpolate._rinterpolate_set_cache_tolerance_wrapper(
+                    localcache["C_table"],
+                    self._dataspace,
+                    self.nparams,
+                    self.ndata,
+                    nlines,
+                    self._cache_length,
+                    atol,
+                    rtol,
+                )  # api call
+
+            # Make the categorical parameters exact-match axes
+            if len(self.categorical):
+                try:
+                    _py_rinterpolate._rinterpolate_set_categorical_wrapper(
+                        localcache["C_table"],
+                        self._dataspace,
+                        self.nparams,
+                        self.ndata,
+                        nlines,
+                        self._cache_length,
+                        list(self.categorical),
+                    )  # api call
+                except (TypeError, ValueError) as e:
+                    self.clear_localcache()
+                    msg = "{}: categorical should be a sequence of parameter numbers below nparams={}: {}".format(
+                        self.name, self.nparams, e
+                    )
+                    verbose_print(msg, self.verbosity, 0)
+                    raise ValueError(msg)
+
+            # Choose the search algorithms of the axes
+            if self.search != "binary":
+                try:
+                    methods = self._search_methods()
+                except ValueError:
+                    self.clear_localcache()
+                    raise
+                _py_rinterpolate._rinterpolate_set_search_wrapper(
+                    localcache["C_table"],
+                    self._dataspace,
+                    self.nparams,
+                    self.ndata,
+                    nlines,
+                    self._cache_length,
+                    methods,
+                )  # api call
+
+            # Check the table
+            if self.validate:
+                try:
+                    self.check_table()
+                except ValueError:
+                    self.clear_localcache()
+                    raise
+
+            self.build_time = time.perf_counter() - start_time
+            verbose_print(
+                "{}: loaded table in C in {:.3g} s".format(self.name, self.build_time),
+                self.verbosity,
+                1,
+            )
+
+        return nlines
+
+    def check_table(self, threads=None):
+        """
+        Function to check that the table is a regular grid: that the lines are sorted with
+        the first parameter varying slowest, that the grid values of each parameter increase,
+        and that every line is on the grid spanned by them. Raises a ValueError if not.
+
+        The lines are checked in parallel in threads (by default one per cpu).
+        Ragged tables are checked when they are loaded.
+        """
+
+        nlines = self._setup_C_table()
+        threads = threads or os.cpu_count() or 1
+
+        def check(start, end):
+            _py_rinterpolate._rinterpolate_check_table_wrapper(
+                self._localcache["C_table"],
+                self._dataspace,
+                self.nparams,
+                self.ndata,
+                nlines,
+                self._cache_length,
+                start,
+                end,
+            )  # api call
+
+        # The first call sets up the table in the dataspace and checks the grid values
+        chunk = -(-nlines // threads)
+        try:
+            check(0, min(chunk, nlines))
+            if threads > 1 and nlines > chunk:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(max_workers=threads - 1) as executor:
+                    futures = [
+                        executor.submit(check, start, min(start + chunk, nlines))
+                        for start in range(chunk, nlines, chunk)
+                    ]
+                    for future in futures:
+                        future.result()
+        except ValueError as e:
+            msg = "{}: Table is not a regular grid: {}".format(self.name, e)
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        verbose_print("{}: table checked".format(self.name), self.verbosity, 1)
+
+    def decimate(self, atol, retries=8):
+        """
+        Function to make a smaller interpolator, on a grid from which the grid values that
+        are not needed to interpolate the data within atol are removed.
+
+        Along each parameter (except the categorical ones), a grid value is removed if
+        interpolating linearly between the grid values that are kept on either side of it
+        reproduces all its data within atol/k, where k is the number of parameters that
+        can be decimated. Because the interpolation only takes weighted means, these errors
+        add up to at most atol. The new interpolator is then evaluated at every node of
+        the original grid: the difference between the two interpolators is multilinear
+        within each cell of the original grid, so the largest difference at the nodes is
+        the largest anywhere. If rounding pushes it over atol, the decimation is redone
+        with half the tolerance (at most retries times, after which the grid is kept).
+
+        The table should be a full regular grid (not ragged).
+
+        Args:
+            atol: the largest error allowed, for all data columns or a sequence of one per
+                column
+            retries: the number of times the tolerance may be halved
+
+        Returns a tuple of the new interpolator, with the same settings as this one, and a
+        dict with:
+            grid_size: the number of grid values of each parameter after decimation
+            original_grid_size: the number before
+            nlines: the number of lines of the new table
+            original_nlines: the number of lines of this table
+            compression: original_nlines / nlines
+            max_error: the largest error of each data column over the whole grid
+        """
+
+        if self.ragged:
+            msg = "{}: Only full regular grids can be decimated".format(self.name)
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        try:
+            atol = np.broadcast_to(np.asarray(atol, dtype=np.float64), (self.ndata,))
+        except ValueError:
+            atol = None
+        if atol is None or not np.all(atol >= 0):
+            msg = "{}: atol should be a non-negative number or a sequence of ndata={} of them".format(
+                self.name, self.ndata
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        nlines = self.calc_nlines()
+        table = np.asarray(self._table, dtype=np.float64)[: nlines * (self.nparams + self.ndata)]
+        table = table.reshape(nlines, self.nparams + self.ndata)
+        coordinates = table[:, : self.nparams]
+
+        # the grid values of each parameter, and the data on the grid
+        axes = [np.unique(coordinates[:, j]) for j in range(self.nparams)]
+        shape = tuple(len(axis) for axis in axes)
+        grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, self.nparams)
+        if np.prod(shape) != nlines or not np.array_equal(grid, coordinates):
+            msg = "{}: Only full regular grids can be decimated".format(self.name)
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+        data = table[:, self.nparams :].reshape(shape + (self.ndata,))
+
+        categorical = set(self.categorical)
+        decimated_axes = [j for j in range(self.nparams) if len(axes[j]) > 2 and not j in categorical]
+        tolerance = atol / max(len(decimated_axes), 1)
+
+        for attempt in range(retries + 1):
+            kept = [list(range(len(axis))) for axis in axes]
+            if attempt == retries:
+                # give up decimating
+                decimated_axes = []
+            for j in decimated_axes:
+                kept[j] = _decimate_axis(axes[j], np.moveaxis(data, j, 0), tolerance)
+
+            new_data = data[np.ix_(*kept)]
+            new_grid = np.stack(
+                np.meshgrid(*[axis[k] for axis, k in zip(axes, kept)], indexing="ij"), axis=-1
+            ).reshape(-1, self.nparams)
+            new_table = np.hstack([new_grid, new_data.reshape(-1, self.ndata)])
+
+            decimated = Rinterpolate(
+                table=new_table, nparams=self.nparams, ndata=self.ndata, **self._settings()
+            )
+
+            # the error at the nodes of the original grid
+            result = decimated.interpolate_batch(coordinates)
+            error = np.abs(result - table[:, self.nparams :])
+            error[np.isnan(result) & np.isnan(table[:, self.nparams :])] = 0.0
+            max_error = error.max(axis=0)
+            if np.all(max_error <= atol):
+                break
+            verbose_print(
+                "{}: decimation error {} exceeds atol, retrying with half the tolerance".format(
+                    self.name, max_error
+                ),
+                self.verbosity,
+                1,
+            )
+            tolerance = tolerance / 2
+
+        report = {
+            "grid_size": [len(k) for k in kept],
+            "original_grid_size": list(shape),
+            "nlines": len(new_table),
+            "original_nlines": nlines,
+            "compression": nlines / len(new_table),
+            "max_error": max_error.tolist(),
+        }
+        verbose_print(
+            "{}: decimated grid {} to {} ({:.3g} times fewer lines), largest error {}".format(
+                self.name, report["original_grid_size"], report["grid_size"],
+                report["compression"], report["max_error"],
+            ),
+            self.verbosity,
+            1,
+        )
+
+        return decimated, report
+
+    def _settings(self):
+        """
+        Function to get the settings of the interpolator, to make another one like it
+        on a different table: all the options of the constructor except the table, nparams
+        and ndata
+        """
+
+        return {
+            key: getattr(self, key)
+            for key in (
+                "usecache", "cellcache", "cache_atol", "cache_rtol", "search",
+                "categorical", "tile_size", "ragged", "validate", "verbosity",
+            )
+        }
+
+    @property
+    def _cache_length(self):
+        """
+        The cache length passed to librinterpolate: usecache, or -1 for "auto"
+        """
+
+        if isinstance(self.usecache, str):
+            if self.usecache != "auto":
+                msg = '{}: usecache should be a number or "auto", got {}'.format(
+                    self.name, self.usecache
+                )
+                verbose_print(msg, self.verbosity, 0)
+                raise ValueError(msg)
+            return -1
+        return self.usecache
+
+    def cache_info(self):
+        """
+        Function to get the state of the cache of results of the table.
+
+        Returns a dict with:
+            cache_length: the number of results that are cached
+            auto: whether the length is chosen automatically (usecache="auto")
+            hit_rate: the fraction of the lookups that hit in the last window of the
+                automatic sizing, or None
+
+        The cache is set up at the first interpolation, before which cache_length is 0.
+        """
+
+        info = {"cache_length": 0, "auto": self.usecache == "auto", "hit_rate": None}
+        if self._localcache["C_table"] and self._dataspace:
+            info.update(
+                _py_rinterpolate._rinterpolate_cache_info_wrapper(
+                    self._localcache["C_table"], self._dataspace
+                )
+            )  # api call
+
+        return info
+
+    def _cache_tolerances(self):
+        """
+        Function to convert cache_atol and cache_rtol to lists of one tolerance per
+        parameter (or None)
+        """
+
+        tolerances = []
+        for name, tolerance in [("cache_atol", self.cache_atol), ("cache_rtol", self.cache_rtol)]:
+            if tolerance is not None:
+                try:
+                    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), (self.nparams,))
+                except ValueError:
+                    msg = "{}: {} should be a number or a sequence of nparams={} numbers".format(
+                        self.name, name, self.nparams
+                    )
+                    verbose_print(msg, self.verbosity, 0)
+                    raise ValueError(msg)
+                if not np.all(tolerance >= 0):
+                    msg = "{}: {} should not be negative".format(self.name, name)
+                    verbose_print(msg, self.verbosity, 0)
+                    raise ValueError(msg)
+                tolerance = tolerance.tolist()
+            tolerances.append(tolerance)
+
+        atol, rtol = tolerances
+        if atol is not None and rtol is not None and any(a > 0 and r > 0 for a, r in zip(atol, rtol)):
+            msg = "{}: set either cache_atol or cache_rtol for each parameter".format(self.name)
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        return atol, rtol
+
+    def _search_methods(self):
+        """
+        Function to convert search to a list of the numbers librinterpolate uses for
+        the search algorithm of each parameter
+        """
+
+        search = [self.search] * self.nparams if isinstance(self.search, str) else list(self.search)
+
+        if len(search) != self.nparams or not all(method in SEARCH_METHODS for method in search):
+            msg = "{}: search should be one of {} or a sequence of nparams={} of them, got {}".format(
+                self.name, list(SEARCH_METHODS.keys()), self.nparams, self.search
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        return [SEARCH_METHODS[method] for method in search]
+
+    def autotune(self, sample):
+        """
+        Function to choose the search algorithm of each parameter by timing all of them
+        on a sample of the coordinates that will be interpolated.
+
+        The sample, of shape (k, nparams), is searched in order, so it should be
+        representative of the calls to come: e.g. a few thousand coordinates from a
+        run, in the order in which they were asked for. Each parameter is then set to
+        its fastest algorithm, and search is set to the list of them, so the choice is
+        kept when the table is reloaded or the interpolator is pickled.
+
+        Returns a dict with:
+            search: the name of the algorithm chosen for each parameter
+            times: for each parameter, a dict of the time (ns) per search of each algorithm
+        """
+
+        nlines = self._setup_C_table()
+        sample = self._check_batch_input(sample)
+
+        methods, times = _py_rinterpolate._rinterpolate_autotune_search_wrapper(
+            self._localcache["C_table"],
+            self._dataspace,
+            self.nparams,
+            self.ndata,
+            nlines,
+            self._cache_length,
+            sample,
+        )  # api call
+
+        names = {number: name for name, number in SEARCH_METHODS.items()}
+        self.search = [names[method] for method in methods]
+        result = {
+            "search": self.search,
+            "times": [
+                {name: axis_times[number] for name, number in SEARCH_METHODS.items()}
+                for axis_times in times
+            ],
+        }
+
+        verbose_print(
+            "{}: search algorithms chosen by autotune: {}".format(self.name, self.search),
+            self.verbosity,
+            1,
+        )
+
+        return result
+
+    def _mode_number(self, mode):
+        """
+        Function to convert the name of an evaluation mode to the number librinterpolate uses
+        """
+
+        if not mode in EVALUATION_MODES:
+            msg = "{}: Unknown mode {}. Choose one of {}".format(
+                self.name, mode, list(EVALUATION_MODES.keys())
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        return EVALUATION_MODES[mode]
+
+    def interpolate(self, x, mode="linear", out=None):
+        """
+        Actual interpolation function. 
+
+        Passes the C_table and _dataspace memory locations to the interpolate wrapper, along with info about the table.
+
+        the array X gets passed to the interpolator, containing the coordinates we are interested in. 
+
+        The function returns an array r, as the result.
+
+        Flag usecache determines whether the 
+
+        mode sets how the table is evaluated:
+            "linear": multilinear interpolation (default)
+            "nearest": the data of the nearest grid node, without interpolation
+            "floor": the data of the grid node at or below x on every axis
+            "simplex": linear interpolation over the n+1 vertices of the simplex (Kuhn
+                triangulation) around x, instead of the 2^n corners of the hypercube
+
+        If out is given, a writable float64 buffer of ndata items (e.g. a numpy array),
+        the results are written into it and it is returned instead of a new list.
+        """
+
+        mode_number = self._mode_number(mode)
+        nlines = self._setup_C_table()
+
+        # put input in correct type
+        input_x = [float(el) for el in x]
 
         verbose_print(
             "{}: interpolate table with {}".format(self.name, x), self.verbosity, 2
@@ -483,17 +1382,465 @@ class Rinterpolate(object):
 
         # do the interpolation through librinterpolate
         result = _py_rinterpolate._rinterpolate_wrapper(
-            localcache["C_table"],
+            self._localcache["C_table"],
             self._dataspace,
             self.nparams,
             self.ndata,
             nlines,
             input_x,
-            self.usecache,
+            self._cache_length,
+            mode_number,
+            out,
+        )
+
+        return result
+
+    def prepare(self, mode="linear"):
+        """
+        Function to get a prepared interpolator: a callable that interpolates one set
+        of coordinates, given as a tuple, list or float64 numpy array, and returns a tuple
+        with the results.
+
+        The checks and conversions that interpolate does at each call are done once here,
+        so the prepared interpolator has a much lower overhead per call, which matters for
+        small tables. update_data and append keep it valid. After the table is changed
+        otherwise (e.g. set_table or multiply_table_column) it raises a RuntimeError, and
+        has to be prepared again.
+
+        See interpolate for the modes.
+        """
+
+        mode_number = self._mode_number(mode)
+        nlines = self._setup_C_table()
+
+        return _py_rinterpolate._PreparedInterpolator(
+            self._localcache["C_table"],
+            self._dataspace,
+            self.nparams,
+            self.ndata,
+            nlines,
+            self._cache_length,
+            mode_number,
+        )
+
+    def _check_batch_input(self, x):
+        """
+        Function to convert a batch of coordinates to a C-contiguous float64 array
+        of shape (k, nparams)
+        """
+
+        x = np.ascontiguousarray(x, dtype=np.float64)
+
+        if not (x.ndim == 2 and x.shape[1] == self.nparams):
+            msg = "Error: {}: Batch input should have shape (k, nparams={}), got {}".format(
+                self.name, self.nparams, x.shape
+            )
+            verbose_print(
+                msg, self.verbosity, 0
+            )
+            raise ValueError(msg)
+
+        return x
+
+    def _interpolate_batch_into(self, x, out, nlines, mode_number=0, grouped=True):
+        """
+        Function to interpolate the (k, nparams) array x into the (k, ndata) array out
+        through the native batch path
+        """
+
+        _py_rinterpolate._rinterpolate_batch_wrapper(
+            self._localcache["C_table"],
+            self._dataspace,
+            self.nparams,
+            self.ndata,
+            nlines,
+            x,
+            out,
+            self._cache_length,
+            mode_number,
+            grouped,
+        )
+
+    def interpolate_batch(self, x, mode="linear", out=None, grouped=True):
+        """
+        Function to interpolate a batch of coordinates in one call.
+
+        x should be an array (or nested list) of shape (k, nparams). Returns a numpy
+        array of shape (k, ndata) with the results. See interpolate for the modes.
+
+        If out is given, a writable C-contiguous float64 buffer of k*ndata items, the
+        results are written into it and it is returned.
+
+        With grouped=True (the default) the linear interpolation groups the coordinates
+        by grid cell: the hypercube of each cell is built once and identical coordinates
+        are interpolated once, so batches with many coordinates per cell are faster. The
+        results are the same, but the cache is not used.
+        """
+
+        mode_number = self._mode_number(mode)
+        nlines = self._setup_C_table()
+        x = self._check_batch_input(x)
+
+        verbose_print(
+            "{}: interpolate table with batch of {} coordinates".format(self.name, len(x)),
+            self.verbosity,
+            2,
         )
 
+        if out is None:
+            out = np.empty((len(x), self.ndata), dtype=np.float64)
+        self._interpolate_batch_into(x, out, nlines, mode_number, grouped)
+
+        return out
+
+    def interpolate_grid(self, axes, out=None, as_interpolator=False):
+        """
+        Function to interpolate on the Cartesian product of one 1-D array of coordinates
+        per parameter, e.g. to resample the table on a new grid.
+
+        Rather than interpolating at each of the prod(k_j) combinations of coordinates,
+        each array is searched once and the table is reduced along one parameter at a
+        time, which costs about sum_j k_j searches and prod(k_j) * ndata blends. The
+        results are exactly those of interpolate at each combination.
+
+        Args:
+            axes: a sequence of nparams 1-D arrays, of lengths k_0 ... k_(nparams-1)
+            out: optional writable C-contiguous float64 buffer of prod(k_j)*ndata items
+            as_interpolator: whether to return a new interpolator on the grid spanned
+                by axes (which must then be increasing), with the same settings
+
+        Returns a numpy array of shape (k_0, ..., k_(nparams-1), ndata), out if it was
+        given, or the new interpolator.
+        """
+
+        nlines = self._setup_C_table()
+
+        axes = tuple(np.ascontiguousarray(axis, dtype=np.float64) for axis in axes)
+        if len(axes) != self.nparams or any(axis.ndim != 1 for axis in axes):
+            msg = "{}: axes should be a sequence of nparams={} 1-D arrays".format(
+                self.name, self.nparams
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        if as_interpolator and not all(np.all(np.diff(axis) > 0) for axis in axes):
+            msg = "{}: the axes of a new interpolator should be increasing".format(self.name)
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        shape = tuple(len(axis) for axis in axes) + (self.ndata,)
+        result = np.empty(shape, dtype=np.float64) if out is None else out
+
+        _py_rinterpolate._rinterpolate_grid_wrapper(
+            self._localcache["C_table"],
+            self._dataspace,
+            self.nparams,
+            self.ndata,
+            nlines,
+            self._cache_length,
+            axes,
+            result,
+        )  # api call
+
+        if as_interpolator:
+            grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, self.nparams)
+            table = np.hstack([grid, np.asarray(result, dtype=np.float64).reshape(-1, self.ndata)])
+            return Rinterpolate(table=table, nparams=self.nparams, ndata=self.ndata, **self._settings())
+
         return result
 
+    def locate(self, x):
+        """
+        Function to locate a batch of coordinates, an array of shape (k, nparams), in
+        the table without evaluating it.
+
+        Returns the tuple (corners, weights) of arrays of shape (k, 2^nparams): the
+        lines of the table at the corners of the grid cell around each coordinate
+        (-1 for a missing node of a ragged table) and their interpolation weights.
+        These can be passed to evaluate_weights to evaluate the table, or another
+        table on the same grid, at the same coordinates without searching again.
+        """
+
+        nlines = self._setup_C_table()
+        x = self._check_batch_input(x)
+
+        corners = np.empty((len(x), 2 ** self.nparams), dtype=np.int64)
+        weights = np.empty((len(x), 2 ** self.nparams), dtype=np.float64)
+
+        _py_rinterpolate._rinterpolate_locate_wrapper(
+            self._localcache["C_table"],
+            self._dataspace,
+            self.nparams,
+            self.ndata,
+            nlines,
+            self._cache_length,
+            x,
+            corners,
+            weights,
+        )
+
+        return corners, weights
+
+    def _weights_table(self, table, columns, offset):
+        """
+        Function to get the table to evaluate with precomputed weights: the C_table if
+        table is None, otherwise a C-contiguous float64 array of shape (nlines, line_length).
+
+        Returns the table, nlines, line_length and the columns to evaluate, as an int64
+        array of indices in the lines of the table. The columns are counted from offset.
+        """
+
+        if table is None:
+            nlines = self._setup_C_table()
+            table = self._localcache["C_table"]
+            line_length = self.nparams + self.ndata
+            offset = self.nparams
+        else:
+            table = np.ascontiguousarray(table, dtype=np.float64)
+            if table.ndim == 1 and offset == 0:
+                table = table.reshape(-1, 1)
+            elif not table.ndim == 2:
+                table = table.reshape(self.return_nlines(), -1)
+            nlines, line_length = table.shape
+
+        if columns is None:
+            columns = range(line_length - offset)
+        columns = np.asarray(columns, dtype=np.int64) + offset
+
+        return table, nlines, line_length, columns
+
+    def evaluate_weights(self, corners, weights, columns=None, table=None, out=None):
+        """
+        Function to evaluate the table at coordinates that were located with locate.
+
+        columns selects the data columns (0 = first data column) to evaluate, by
+        default all of them. table can be another table (parameters and data, as
+        the input table) with the same lines, i.e. on the same grid, to evaluate
+        instead.
+
+        Returns a numpy array of shape (k, len(columns)), or out if that is given
+        (a writable float64 buffer of k*len(columns) items).
+        """
+
+        corners = np.ascontiguousarray(corners, dtype=np.int64)
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+
+        if not corners.shape == weights.shape or not corners.ndim == 2:
+            msg = "Error: {}: corners and weights should be arrays of the same shape (k, 2^nparams), got {} and {}".format(
+                self.name, corners.shape, weights.shape
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        table, nlines, line_length, columns = self._weights_table(table, columns, self.nparams)
+        if out is None:
+            out = np.empty((len(corners), len(columns)), dtype=np.float64)
+
+        _py_rinterpolate._rinterpolate_apply_weights_wrapper(
+            table,
+            nlines,
+            line_length,
+            columns,
+            corners,
+            weights,
+            out,
+        )
+
+        return out
+
+    def interpolation_matrix(self, x):
+        """
+        Function to build the sparse interpolation matrix for a batch of coordinates,
+        an array of shape (k, nparams).
+
+        Returns the tuple (indptr, indices, weights) of the matrix of shape (k, nlines)
+        in compressed sparse row (CSR) format, e.g. for scipy.sparse.csr_matrix((weights,
+        indices, indptr)), with at most 2^nparams entries per row. Multiplying it by
+        the data columns of the table gives the interpolated data, see
+        apply_interpolation_matrix. This stays valid as long as the parameter grid
+        does not change, so only the data can be updated without searching again.
+
+        For a ragged table, an index of -1 marks a missing node that is needed.
+        """
+
+        corners, weights = self.locate(x)
+
+        nonzero = weights != 0
+        indptr = np.zeros(len(weights) + 1, dtype=np.int64)
+        np.cumsum(np.count_nonzero(nonzero, axis=1), out=indptr[1:])
+
+        return indptr, corners[nonzero], weights[nonzero]
+
+    def apply_interpolation_matrix(self, matrix, data=None, columns=None, out=None):
+        """
+        Function to multiply the interpolation matrix (indptr, indices, weights) made by
+        interpolation_matrix by the data.
+
+        data is an array of shape (nlines, d) with the data columns of a table on the same
+        grid, by default the data of this table. columns selects the data columns
+        (0 = first data column) to use, by default all of them.
+
+        Returns a numpy array of shape (k, len(columns)), or out if that is given
+        (a writable float64 buffer of k*len(columns) items).
+        """
+
+        indptr, indices, weights = matrix
+        indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        indices = np.ascontiguousarray(indices, dtype=np.int64)
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+
+        table, nlines, line_length, columns = self._weights_table(data, columns, 0)
+        if out is None:
+            out = np.empty((len(indptr) - 1, len(columns)), dtype=np.float64)
+
+        _py_rinterpolate._rinterpolate_sparse_apply_wrapper(
+            table,
+            nlines,
+            line_length,
+            columns,
+            indptr,
+            indices,
+            weights,
+            out,
+        )
+
+        return out
+
+    def stream(self, chunks, prefetch=False, mode="linear", grouped=True):
+        """
+        Generator to interpolate query sets that are too large to hold in memory.
+
+        Consumes an iterable of (k, nparams) arrays and yields (k, ndata) arrays with
+        the results. The chunks can differ in size.
+
+        The results are written into one output buffer which is reused for every
+        chunk, so the memory use is bounded by the largest chunk. The yielded array
+        is only valid until the next chunk is requested: copy it if you need to keep it.
+
+        If prefetch is True, the next chunk is read in a separate thread while the
+        current one is interpolated (the interpolation releases the GIL).
+
+        See interpolate for the modes, and interpolate_batch for grouped.
+        """
+
+        mode_number = self._mode_number(mode)
+        nlines = self._setup_C_table()
+
+        iterator = iter(chunks)
+        buffer = np.empty((0, self.ndata), dtype=np.float64)
+
+        executor = None
+        if prefetch:
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=1)
+            future = executor.submit(next, iterator, None)
+
+        try:
+            while True:
+                if executor:
+                    chunk = future.result()
+                    if chunk is None:
+                        break
+                    # Start reading the next chunk while this one is interpolated
+                    future = executor.submit(next, iterator, None)
+                else:
+                    chunk = next(iterator, None)
+                    if chunk is None:
+                        break
+
+                chunk = self._check_batch_input(chunk)
+
+                # Only grow the output buffer if this chunk doesn't fit
+                if len(chunk) > len(buffer):
+                    buffer = np.empty((len(chunk), self.ndata), dtype=np.float64)
+                out = buffer[: len(chunk)]
+
+                self._interpolate_batch_into(chunk, out, nlines, mode_number, grouped)
+
+                yield out
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+    def memory_usage(self):
+        """
+        Function to get the memory used by the interpolator, in bytes.
+
+        Returns a dict with:
+            python_table: the table held in python (self._table), including room reserved for appends
+            C_table: the C copy of the table, including room reserved for appends
+            table: librinterpolate's table struct, steps and varcount
+            cache: the cache of results (line_length * cache_length)
+            cell_cache: the hypercubes in the cell cache (see cellcache)
+            presearch: the arrays of grid values of each parameter, and the search indexes (see search)
+            hypertable: the 2^nparams hypercube and its work space
+            layout: the tiled copy of the table (see tile_size)
+            mask: the mask of present grid nodes of a ragged table
+            total: the sum of the above
+            dataspace: librinterpolate's memory for all the tables in the dataspace,
+                which may be shared with other interpolators (not in total)
+
+        librinterpolate's structures are set up at the first interpolation, and are zero before.
+        """
+
+        if isinstance(self._table, np.ndarray):
+            buffer = getattr(self, "_table_buffer", None)
+            if buffer is not None and self._table.base is buffer:
+                python_table = buffer.nbytes  # including the room reserved for appends
+            else:
+                python_table = self._table.nbytes
+        else:
+            python_table = sys.getsizeof(self._table) + sum(
+                sys.getsizeof(el) for el in self._table
+            )
+
+        usage = {"python_table": python_table, "C_table": 0}
+        C_structures = ("table", "cache", "cell_cache", "presearch", "hypertable", "layout", "mask")
+        usage.update({key: 0 for key in C_structures})
+        usage["dataspace"] = 0
+
+        if self._localcache["C_table"]:
+            line_length = self.nparams + self.ndata
+            usage["C_table"] = (
+                max(self._localcache["C_size"], self._localcache.get("C_capacity", 0) * line_length)
+                * np.dtype(np.float64).itemsize
+            )
+            if self._dataspace:
+                usage.update(
+                    _py_rinterpolate._rinterpolate_memory_usage_wrapper(
+                        self._localcache["C_table"], self._dataspace
+                    )
+                )  # api call
+
+        usage["total"] = sum(
+            usage[key] for key in ("python_table", "C_table") + C_structures
+        )
+
+        return usage
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickle support, e.g. to send the interpolator to a multiprocessing worker.
+
+        The C_table and dataspace capsules are not pickled. The table is passed as
+        one contiguous float64 buffer, which with protocol 5 can be sent out-of-band
+        (see pickle.PickleBuffer). The C state is rebuilt lazily in the worker at
+        the first call to interpolate.
+        """
+
+        state = {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in ("_table", "_table_buffer", "_dataspace", "_localcache", "_setup_lock")
+        }
+
+        table = np.ascontiguousarray(self._table, dtype=np.float64)
+        if protocol >= 5 and PickleBuffer is not None:
+            table = PickleBuffer(table)
+
+        return (_rebuild_rinterpolate, (self.__class__, table, state))
+
     def __str__(self):
         return self.name
 
@@ -508,3 +1855,111 @@ class Rinterpolate(object):
             1,
         )
         self.destroy()
+
+
+class RinterpolateGrid(Rinterpolate):
+    """
+    Interpolator for several data blocks that share one parameter grid.
+
+    The table only contains the parameter columns (ndata=0). Data blocks of shape
+    (nlines, d) are attached with attach(); line i of every block belongs to line i
+    of the table. interpolate() and interpolate_batch() search the grid once and
+    interpolate all attached blocks in one call, returning one result per block.
+
+    This saves the repeated search, and the separate steps/varcount/presearch arrays,
+    of using one Rinterpolate per block. Only linear interpolation is supported.
+    """
+
+    def __init__(self, table=None, nparams=-1, **kwargs):
+        kwargs.pop("ndata", None)
+        super().__init__(table=table, nparams=nparams, ndata=0, **kwargs)
+
+        self._blocks = []  # Attached data blocks, C-contiguous float64 arrays
+
+    def attach(self, data):
+        """
+        Attach a data block, an array (or nested list) of shape (nlines, d) with the
+        data of each line of the table. Returns the index of the block in the results.
+        """
+
+        nlines = self._setup_C_table()
+        data = np.ascontiguousarray(data, dtype=np.float64)
+
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+
+        if not (data.ndim == 2 and len(data) == nlines):
+            msg = "Error: {}: Data block should have shape (nlines={}, d), got {}".format(
+                self.name, nlines, data.shape
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        verbose_print(
+            "{}: attached data block {} with {} columns".format(
+                self.name, len(self._blocks), data.shape[1]
+            ),
+            self.verbosity,
+            1,
+        )
+
+        self._blocks.append(data)
+        return len(self._blocks) - 1
+
+    def _interpolate_fused_into(self, x, outs, nlines):
+        """
+        Function to interpolate the (k, nparams) array x into the (k, d) arrays in outs,
+        one for each attached block, through the native fused path
+        """
+
+        _py_rinterpolate._rinterpolate_fused_wrapper(
+            self._localcache["C_table"],
+            self._dataspace,
+            self.nparams,
+            self.ndata,
+            nlines,
+            self._cache_length,
+            tuple(self._blocks),
+            x,
+            tuple(outs),
+        )
+
+    def interpolate(self, x, mode="linear", out=None):
+        """
+        Function to interpolate all attached data blocks at the coordinates x.
+
+        Returns a list with, for each block, the list of interpolated data. If out is
+        given, a list with a writable float64 buffer of d items for each block, the
+        results are written into it and it is returned.
+        """
+
+        if out is not None:
+            return self.interpolate_batch([x], mode=mode, out=out)
+
+        return [list(r[0]) for r in self.interpolate_batch([x], mode=mode)]
+
+    def interpolate_batch(self, x, mode="linear", out=None):
+        """
+        Function to interpolate all attached data blocks on a batch of coordinates,
+        an array of shape (k, nparams).
+
+        Returns a list with, for each block, a numpy array of shape (k, d). If out is
+        given, a list with a writable float64 buffer of k*d items for each block, the
+        results are written into it and it is returned.
+        """
+
+        if not mode == "linear":
+            msg = "{}: Fused interpolation only supports the linear mode, got {}".format(
+                self.name, mode
+            )
+            verbose_print(msg, self.verbosity, 0)
+            raise ValueError(msg)
+
+        nlines = self._setup_C_table()
+        x = self._check_batch_input(x)
+
+        if out is None:
+            out = [np.empty((len(x), block.shape[1]), dtype=np.float64) for block in self._blocks]
+        self._interpolate_fused_into(x, out, nlines)
+
+        return out
@@ -1,7 +1,21 @@
+import gc
+import importlib
+import itertools
+import os
 import unittest
+import pickle
+import tracemalloc
 import numpy as np
 
-from py_rinterpolate import Rinterpolate
+from py_rinterpolate import (
+    Rinterpolate,
+    RinterpolateGrid,
+    set_simd,
+    set_tracked_allocation,
+    simd_level,
+)
+from py_rinterpolate import _py_rinterpolate, main
+from py_rinterpolate.main import SEARCH_METHODS
 
 import test_data
 
@@ -23,6 +37,19 @@ class TestClass(unittest.TestCase):
         self.NPARAMS = 2
         self.NDATA = 1
 
+    def _make_grid_table(self, axes, ndata, seed=0):
+        """
+        Function to make a table on the (row-major) grid spanned by the axes, with random data
+        """
+
+        rng = np.random.default_rng(seed)
+        grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(
+            -1, len(axes)
+        )
+        data = rng.random((len(grid), ndata))
+
+        return np.hstack([grid, data])
+
     def test_flatten(self):
         """
         Unit test for flattening the table
@@ -134,5 +161,1306 @@ class TestClass(unittest.TestCase):
 
         assert rinterpolator._table == list(flattened_compare_table)
 
+    def test_pickle(self):
+        """
+        Unit test to check that a pickled interpolator gives the same results
+        """
+
+        rinterpolator = Rinterpolate(
+            table=test_data.test_table, nparams=3, ndata=10, verbosity=1
+        )
+        input_list = [float(el) for el in test_data.test_coeffs[0]]
+        result = rinterpolator.interpolate(input_list)
+
+        # Protocol 5 with out-of-band buffers
+        buffers = []
+        pickled = pickle.dumps(
+            rinterpolator, protocol=5, buffer_callback=buffers.append
+        )
+        assert len(buffers) == 1, "Table not sent out-of-band"
+
+        unpickled = pickle.loads(pickled, buffers=buffers)
+        assert unpickled.name == rinterpolator.name
+        assert (
+            unpickled._localcache["C_table"] is None
+        ), "C_table should be rebuilt lazily"
+        assert unpickled.interpolate(input_list) == result
+
+        # Older protocols send the table in-band
+        unpickled = pickle.loads(pickle.dumps(rinterpolator, protocol=2))
+        assert unpickled.interpolate(input_list) == result
+
+    def test_interpolate_batch(self):
+        """
+        Unit test to check that the batch interpolation and the stream give the same results as interpolate
+        """
+
+        rinterpolator = Rinterpolate(
+            table=test_data.test_table, nparams=3, ndata=10, verbosity=1
+        )
+        coeffs = np.array(test_data.test_coeffs, dtype=np.float64)
+        expected = np.array([rinterpolator.interpolate(list(el)) for el in coeffs])
+
+        result = rinterpolator.interpolate_batch(coeffs)
+        assert result.shape == (len(coeffs), 10)
+        assert np.array_equal(result, expected)
+
+        # Stream over chunks of different sizes
+        for prefetch in [False, True]:
+            chunks = (coeffs[i : i + 7] for i in range(0, len(coeffs), 7))
+            streamed = np.concatenate(
+                [out.copy() for out in rinterpolator.stream(chunks, prefetch=prefetch)]
+            )
+            assert np.array_equal(streamed, expected)
+
+        with self.assertRaises(ValueError):
+            rinterpolator.interpolate_batch(coeffs[:, :2])
+
+    def test_tiled_layout(self):
+        """
+        Unit test to check that the tiled table layout gives the same results as the row-major one
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0, 1.7]),
+            np.array([-100.0, -50.0, -20.0, 0.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 4)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [2, 10, 35], size=(200, 3)
+        )
+
+        rinterpolator = Rinterpolate(table=table.tolist(), nparams=3, ndata=4)
+        expected = rinterpolator.interpolate_batch(coeffs)
+
+        for tile_size in [2, 3, 4]:
+            tiled_rinterpolator = Rinterpolate(
+                table=table.tolist(), nparams=3, ndata=4, tile_size=tile_size
+            )
+            assert np.array_equal(
+                tiled_rinterpolator.interpolate_batch(coeffs), expected
+            )
+            for mode in ["nearest", "simplex"]:
+                assert np.array_equal(
+                    tiled_rinterpolator.interpolate_batch(coeffs, mode=mode),
+                    rinterpolator.interpolate_batch(coeffs, mode=mode),
+                )
+
+            # the tiled copy only holds the data columns
+            assert tiled_rinterpolator.memory_usage()["layout"] == len(table) * 4 * 8
+            assert tiled_rinterpolator.interpolate(list(coeffs[0])) == list(expected[0])
+
+    def test_ragged(self):
+        """
+        Unit test to check interpolation on a table with missing grid nodes
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+
+        # remove the nodes with p0 = 1.0 and p1 = -20
+        missing = (table[:, 0] == 1.0) & (table[:, 1] == -20.0)
+        rinterpolator = Rinterpolate(table=table.tolist(), nparams=3, ndata=3)
+        ragged_rinterpolator = Rinterpolate(
+            table=table[~missing].tolist(), nparams=3, ndata=3, ragged=True
+        )
+
+        coeffs = np.random.default_rng(1).uniform(
+            [0.1, -100, 10], [1.0, -20, 30], size=(200, 3)
+        )
+        complete = (coeffs[:, 0] <= 0.9) | (coeffs[:, 1] <= -50.0)
+
+        result = ragged_rinterpolator.interpolate_batch(coeffs)
+        assert np.array_equal(
+            result[complete], rinterpolator.interpolate_batch(coeffs[complete])
+        )
+        assert np.all(np.isnan(result[~complete]))
+
+        # a missing node does not matter if we are on the other side of the cell
+        assert ragged_rinterpolator.interpolate(
+            [1.0, -50.0, 12.0]
+        ) == rinterpolator.interpolate([1.0, -50.0, 12.0])
+
+        # the lines have to be sorted
+        unsorted_rinterpolator = Rinterpolate(
+            table=table[::-1].tolist(), nparams=3, ndata=3, ragged=True
+        )
+        with self.assertRaises(ValueError):
+            unsorted_rinterpolator.interpolate([0.5, -60.0, 20.0])
+
+    def test_nearest_and_floor(self):
+        """
+        Unit test for the nearest and floor evaluation modes
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        rinterpolator = Rinterpolate(table=table.tolist(), nparams=3, ndata=3)
+
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [1.1, -10, 35], size=(100, 3)
+        )
+        coeffs[:10] = table[:10, :3]  # exactly on nodes
+
+        for mode in ["nearest", "floor"]:
+            expected = []
+            for x in coeffs:
+                node = []
+                for axis, value in zip(
+                    axes, np.clip(x, [ax[0] for ax in axes], [ax[-1] for ax in axes])
+                ):
+                    if mode == "nearest":
+                        node.append(axis[np.argmin(np.abs(axis - value))])
+                    else:
+                        node.append(axis[axis <= value][-1])
+                line = np.all(table[:, :3] == node, axis=1)
+                expected.append(table[line, 3:][0])
+
+            assert np.array_equal(
+                rinterpolator.interpolate_batch(coeffs, mode=mode), expected
+            )
+            assert rinterpolator.interpolate(list(coeffs[20]), mode=mode) == list(
+                expected[20]
+            )
+
+        with self.assertRaises(ValueError):
+            rinterpolator.interpolate(list(coeffs[0]), mode="cubic")
+
+    def test_simplex(self):
+        """
+        Unit test for the simplex evaluation mode
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+            np.array([0.0, 1.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        rinterpolator = Rinterpolate(table=table, nparams=4, ndata=3)
+
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5, -0.5], [1.1, -10, 35, 1.5], size=(100, 4)
+        )
+        coeffs[:10] = table[:10, :4]  # exactly on nodes
+
+        data = table[:, 4:].reshape(4, 3, 3, 2, 3)
+        expected = []
+        for x in coeffs:
+            index, f = [], []
+            for axis, value in zip(axes, x):
+                value = np.clip(value, axis[0], axis[-1])
+                i = min(max(np.searchsorted(axis, value) - 1, 0), len(axis) - 2)
+                index.append(i)
+                f.append((value - axis[i]) / (axis[i + 1] - axis[i]))
+            order = sorted(range(4), key=lambda j: -f[j])
+            vertex, previous, r = list(index), 1.0, 0.0
+            for k in range(5):
+                following = f[order[k]] if k < 4 else 0.0
+                r = r + (previous - following) * data[tuple(vertex)]
+                if k < 4:
+                    vertex[order[k]] += 1
+                    previous = following
+            expected.append(r)
+
+        result = rinterpolator.interpolate_batch(coeffs, mode="simplex")
+        assert np.allclose(result, expected, rtol=1e-12, atol=1e-12)
+        assert np.allclose(result[:10], table[:10, 4:], rtol=0, atol=1e-12)
+        assert rinterpolator.interpolate(list(coeffs[20]), mode="simplex") == list(
+            result[20]
+        )
+        assert rinterpolator.prepare(mode="simplex")(coeffs[20]) == tuple(result[20])
+
+        # both are exact for data linear in the parameters
+        table[:, 4] = table[:, :4] @ np.array([1.0, 0.01, -0.2, 3.0])
+        rinterpolator = Rinterpolate(table=table, nparams=4, ndata=3)
+        assert np.allclose(
+            rinterpolator.interpolate_batch(coeffs, mode="simplex")[:, 0],
+            rinterpolator.interpolate_batch(coeffs)[:, 0],
+        )
+
+    def test_on_node_axes(self):
+        """
+        Unit test for coordinates that are on a grid node on some or all axes, for which
+        the hypercube only spans the other axes
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+            np.array([0.0, 0.5, 1.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        rng = np.random.default_rng(1)
+
+        # snap a random subset of the coordinates to grid values
+        coeffs = rng.uniform([0.1, -100, 10, 0], [1.0, -20, 30, 1], size=(200, 4))
+        nodes = table[rng.integers(0, len(table), size=200), :4]
+        snap = rng.random((200, 4)) < 0.6
+        coeffs[snap] = nodes[snap]
+        coeffs[:20] = nodes[:20]
+
+        # the fused grid interpolation always builds the full hypercube
+        grid = RinterpolateGrid(table=table[:, :4], nparams=4)
+        grid.attach(table[:, 4:])
+        expected = grid.interpolate_batch(coeffs)[0]
+
+        for kwargs in [{}, {"tile_size": 2}, {"usecache": 4}]:
+            rinterpolator = Rinterpolate(table=table, nparams=4, ndata=3, **kwargs)
+            result = rinterpolator.interpolate_batch(coeffs)
+            assert np.array_equal(result, expected)
+            assert np.array_equal(
+                result[:20],
+                table[
+                    np.all(table[:, None, :4] == nodes[:20], axis=2).argmax(axis=0), 4:
+                ],
+            )
+
+        # on a node next to a missing node of a ragged table
+        missing = (table[:, 0] == 1.0) & (table[:, 1] == -20.0)
+        ragged_rinterpolator = Rinterpolate(
+            table=table[~missing], nparams=4, ndata=3, ragged=True
+        )
+        assert ragged_rinterpolator.interpolate([0.9, -20.0, 12.0, 0.25]) == list(
+            grid.interpolate([0.9, -20.0, 12.0, 0.25])[0]
+        )
+
+    def test_simd_levels(self):
+        """
+        Unit test to check that all the SIMD kernels supported by the CPU give the same results
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+            np.array([0.0, 1.0]),
+        ]
+        table = self._make_grid_table(axes, 13)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5, -0.5], [1.1, -10, 35, 1.5], size=(100, 4)
+        )
+        rinterpolator = Rinterpolate(table=table, nparams=4, ndata=13)
+
+        best = set_simd(None)
+        try:
+            set_simd("generic")
+            assert simd_level() == "generic"
+            expected = {
+                mode: rinterpolator.interpolate_batch(coeffs, mode=mode)
+                for mode in ["linear", "simplex"]
+            }
+
+            for level in ["sse2", "avx2", "avx512"]:
+                try:
+                    assert set_simd(level) == level
+                except ValueError:
+                    continue
+                for mode in ["linear", "simplex"]:
+                    assert np.allclose(
+                        rinterpolator.interpolate_batch(coeffs, mode=mode),
+                        expected[mode],
+                        rtol=1e-14,
+                        atol=1e-15,
+                    )
+
+            with self.assertRaises(ValueError):
+                set_simd("neon")
+
+            # a bad RINTERPOLATE_SIMD only warns at import, and the highest level is used
+            saved = dict(main.__dict__)
+            os.environ["RINTERPOLATE_SIMD"] = "bogus"
+            try:
+                set_simd("generic")
+                with self.assertWarns(UserWarning):
+                    importlib.reload(main)
+                assert main.simd_level() == best
+            finally:
+                del os.environ["RINTERPOLATE_SIMD"]
+                main.__dict__.update(saved)
+        finally:
+            set_simd(best)
+
+    def test_fused_grid(self):
+        """
+        Unit test to check that the fused interpolation of several data blocks on one grid
+        gives the same results as separate interpolators
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 6)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [1.1, -10, 35], size=(100, 3)
+        )
+
+        grid = RinterpolateGrid(table=table[:, :3].tolist(), nparams=3)
+        assert grid.attach(table[:, 3:5]) == 0
+        assert grid.attach(table[:, 5]) == 1
+
+        results = grid.interpolate_batch(coeffs)
+        for index, columns in enumerate([[3, 4], [5]]):
+            rinterpolator = Rinterpolate(
+                table=np.hstack([table[:, :3], table[:, columns]]).tolist(),
+                nparams=3,
+                ndata=len(columns),
+            )
+            assert np.array_equal(
+                results[index], rinterpolator.interpolate_batch(coeffs)
+            )
+            assert grid.interpolate(list(coeffs[0]))[index] == list(results[index][0])
+
+        with self.assertRaises(ValueError):
+            grid.attach(table[:-1, 3:])
+
+    def test_locate_and_evaluate_weights(self):
+        """
+        Unit test to check that evaluating the table from the located corners and weights
+        gives the same results as interpolating
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        other_table = self._make_grid_table(axes, 2, seed=1)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [1.1, -10, 35], size=(100, 3)
+        )
+        coeffs[:10] = table[:10, :3]  # exactly on nodes
+
+        rinterpolator = Rinterpolate(table=table.tolist(), nparams=3, ndata=3)
+        corners, weights = rinterpolator.locate(coeffs)
+        assert corners.shape == weights.shape == (100, 8)
+        assert np.allclose(weights.sum(axis=1), 1.0)
+
+        expected = rinterpolator.interpolate_batch(coeffs)
+        assert np.allclose(rinterpolator.evaluate_weights(corners, weights), expected)
+        assert np.allclose(
+            rinterpolator.evaluate_weights(corners, weights, columns=[2, 0]),
+            expected[:, [2, 0]],
+        )
+
+        other_rinterpolator = Rinterpolate(
+            table=other_table.tolist(), nparams=3, ndata=2
+        )
+        assert np.allclose(
+            rinterpolator.evaluate_weights(corners, weights, table=other_table),
+            other_rinterpolator.interpolate_batch(coeffs),
+        )
+
+        with self.assertRaises(IndexError):
+            rinterpolator.evaluate_weights(corners, weights, columns=[3])
+
+    def test_interpolation_matrix(self):
+        """
+        Unit test to check that applying the sparse interpolation matrix gives the same
+        results as interpolating, also after the data changed
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [1.1, -10, 35], size=(100, 3)
+        )
+
+        rinterpolator = Rinterpolate(table=table.tolist(), nparams=3, ndata=3)
+        indptr, indices, weights = rinterpolator.interpolation_matrix(coeffs)
+        assert len(indptr) == 101 and indptr[-1] == len(indices) == len(weights)
+        assert np.all(np.diff(indptr) <= 8)
+
+        matrix = (indptr, indices, weights)
+        expected = rinterpolator.interpolate_batch(coeffs)
+        assert np.allclose(rinterpolator.apply_interpolation_matrix(matrix), expected)
+
+        new_data = np.random.default_rng(2).random((len(table), 2))
+        new_rinterpolator = Rinterpolate(
+            table=np.hstack([table[:, :3], new_data]).tolist(), nparams=3, ndata=2
+        )
+        assert np.allclose(
+            rinterpolator.apply_interpolation_matrix(matrix, data=new_data),
+            new_rinterpolator.interpolate_batch(coeffs),
+        )
+        assert np.allclose(
+            rinterpolator.apply_interpolation_matrix(matrix, data=new_data[:, 1]),
+            new_rinterpolator.interpolate_batch(coeffs)[:, 1:],
+        )
+
+    def test_update_data(self):
+        """
+        Unit test to check that updating the data in place gives the same results as a new
+        interpolator, also with the cache and the tiled layout
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        new_data = np.random.default_rng(2).random((len(table), 3))
+        new_table = np.hstack([table[:, :3], new_data])
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [1.1, -10, 35], size=(20, 3)
+        )
+
+        expected = Rinterpolate(
+            table=new_table.tolist(), nparams=3, ndata=3
+        ).interpolate_batch(coeffs)
+
+        for tile_size in [0, 2]:
+            rinterpolator = Rinterpolate(
+                table=table.tolist(),
+                nparams=3,
+                ndata=3,
+                usecache=10,
+                tile_size=tile_size,
+            )
+            rinterpolator.interpolate_batch(coeffs)
+            C_table = rinterpolator._localcache["C_table"]
+
+            rinterpolator.update_data(new_data)
+            assert rinterpolator._localcache["C_table"] is C_table
+            assert np.array_equal(rinterpolator.interpolate_batch(coeffs), expected)
+
+            rinterpolator.update_column(1, table[:, 4])
+            new_table[:, 4] = table[:, 4]
+            assert np.array_equal(
+                rinterpolator.interpolate_batch(coeffs),
+                Rinterpolate(
+                    table=new_table.tolist(), nparams=3, ndata=3
+                ).interpolate_batch(coeffs),
+            )
+            new_table[:, 4] = new_data[:, 1]
+
+        with self.assertRaises(ValueError):
+            rinterpolator.update_column(3, table[:, 4])
+
+        # the caller's array is copied, not written to
+        original = table.copy()
+        rinterpolator = Rinterpolate(table=table, nparams=3, ndata=3)
+        rinterpolator.update_data(new_data)
+        rinterpolator.update_column(1, new_data[:, 0])
+        rinterpolator.multiply_table_column(4, 2.0)
+        assert np.array_equal(table, original)
+
+    def test_append(self):
+        """
+        Unit test to check that a table extended along its first parameter gives the same
+        results as the full table
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0, 1.7, 2.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [2.1, -10, 35], size=(100, 3)
+        )
+        expected = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=3
+        ).interpolate_batch(coeffs)
+
+        for tile_size, as_list in itertools.product([0, 2, 4], [True, False]):
+            rinterpolator = Rinterpolate(
+                table=table[:9].tolist() if as_list else table[:9].copy(),
+                nparams=3,
+                ndata=3,
+                usecache=10,
+                tile_size=tile_size,
+            )
+            rinterpolator.interpolate_batch(coeffs)
+
+            for start, end in [(9, 18), (18, 27), (27, 45), (45, 54)]:
+                rinterpolator.append(table[start:end])
+                assert np.array_equal(
+                    rinterpolator.interpolate_batch(coeffs),
+                    Rinterpolate(
+                        table=table[:end].tolist(), nparams=3, ndata=3
+                    ).interpolate_batch(coeffs),
+                )
+
+                # rejected lines leave the interpolator unchanged
+                bad = table[end - 9 : end].copy()
+                bad[:, 0] += 10.0
+                bad[4, 1] += 1.0
+                for lines in [table[start : start + 5], table[:9], bad]:
+                    with self.assertRaises(ValueError):
+                        rinterpolator.append(lines)
+                    assert len(rinterpolator._table) == end * 6
+                    assert np.array_equal(
+                        rinterpolator.interpolate_batch(coeffs),
+                        Rinterpolate(
+                            table=table[:end].tolist(), nparams=3, ndata=3
+                        ).interpolate_batch(coeffs),
+                    )
+            assert np.array_equal(rinterpolator.interpolate_batch(coeffs), expected)
+
+            if not as_list:
+                # the numpy table is a view of a buffer that grows geometrically
+                buffer = rinterpolator._table_buffer
+                assert rinterpolator._table.base is buffer
+                assert len(buffer) == 72 * 6
+                assert rinterpolator.memory_usage()["python_table"] == buffer.nbytes
+
+    def test_prepare(self):
+        """
+        Unit test for the prepared interpolator
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [1.1, -10, 35], size=(20, 3)
+        )
+
+        rinterpolator = Rinterpolate(table=table.tolist(), nparams=3, ndata=3)
+        expected = rinterpolator.interpolate_batch(coeffs)
+        interpolate = rinterpolator.prepare()
+        nearest = rinterpolator.prepare(mode="nearest")
+
+        for x, result in zip(coeffs, expected):
+            assert interpolate(tuple(x)) == tuple(result)
+            assert interpolate(list(x)) == tuple(result)
+            assert interpolate(x) == tuple(result)
+            assert nearest(x) == tuple(
+                rinterpolator.interpolate(list(x), mode="nearest")
+            )
+
+        with self.assertRaises(ValueError):
+            interpolate(coeffs[0, :2])
+
+        # stays valid after appending, not after setting a new table
+        rinterpolator.append(self._make_grid_table([np.array([1.5])] + axes[1:], 3))
+        assert interpolate([1.2, -60.0, 20.0]) == tuple(
+            rinterpolator.interpolate([1.2, -60.0, 20.0])
+        )
+
+        rinterpolator.set_table(table.tolist())
+        with self.assertRaises(RuntimeError):
+            interpolate(coeffs[0])
+
+    def test_out(self):
+        """
+        Unit test to check that the results can be written into a given buffer
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        coeffs = np.random.default_rng(1).uniform(
+            [0, -110, 5], [1.1, -10, 35], size=(20, 3)
+        )
+
+        rinterpolator = Rinterpolate(table=table.tolist(), nparams=3, ndata=3)
+        expected = rinterpolator.interpolate_batch(coeffs)
+
+        out = np.empty((20, 3))
+        assert rinterpolator.interpolate_batch(coeffs, out=out) is out
+        assert np.array_equal(out, expected)
+
+        row = np.empty(3)
+        interpolate = rinterpolator.prepare()
+        for x, result in zip(coeffs, expected):
+            assert rinterpolator.interpolate(list(x), out=row) is row
+            assert np.array_equal(row, result)
+            row[:] = 0
+            assert interpolate(x, out=row) is row
+            assert np.array_equal(row, result)
+
+        corners, weights = rinterpolator.locate(coeffs)
+        assert rinterpolator.evaluate_weights(corners, weights, out=out) is out
+        matrix = rinterpolator.interpolation_matrix(coeffs)
+        assert (
+            rinterpolator.apply_interpolation_matrix(matrix, out=memoryview(out))
+            is not None
+        )
+        assert np.allclose(out, expected)
+
+        with self.assertRaises(ValueError):
+            interpolate(coeffs[0], out=np.empty(2))
+        with self.assertRaises(ValueError):
+            rinterpolator.interpolate_batch(coeffs, out=np.empty((20, 2)))
+        with self.assertRaises(TypeError):
+            rinterpolator.interpolate_batch(
+                coeffs, out=np.empty((20, 3), dtype=np.float32)
+            )
+
+        # a failed call releases the output buffer, so it can be resized
+        row = np.empty(3)
+        with self.assertRaises(TypeError):
+            _py_rinterpolate._rinterpolate_wrapper(
+                rinterpolator._localcache["C_table"],
+                rinterpolator._dataspace,
+                3,
+                3,
+                rinterpolator.calc_nlines(),
+                [0.5, -50, "30"],
+                0,
+                0,
+                row,
+            )
+        row.resize(4)
+
+    def test_check_table(self):
+        """
+        Unit test for the check of the table grid
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+
+        rinterpolator = Rinterpolate(table=table, nparams=3, ndata=3, validate=True)
+        rinterpolator.interpolate([0.5, -60.0, 20.0])
+        assert rinterpolator.build_time is not None
+        for threads in [1, 2, 5, 100]:
+            rinterpolator.check_table(threads=threads)
+
+        # a line off the grid, a line swapped with the next one, and a missing line
+        broken_tables = [table.copy(), table.copy(), table[:-1]]
+        broken_tables[0][20, 1] = -40.0
+        broken_tables[1][[20, 21]] = broken_tables[1][[21, 20]]
+        for broken_table in broken_tables:
+            with self.assertRaises(ValueError):
+                Rinterpolate(table=broken_table, nparams=3, ndata=3).check_table(
+                    threads=3
+                )
+            with self.assertRaises(ValueError):
+                Rinterpolate(
+                    table=broken_table, nparams=3, ndata=3, validate=True
+                ).interpolate([0.5, -60.0, 20.0])
+
+    def test_memory_usage(self):
+        """
+        Unit test for the memory usage and the tracked allocation of the C memory
+        """
+
+        axes = [
+            np.linspace(0.0, 1.0, 20),
+            np.linspace(-1.0, 1.0, 30),
+            np.linspace(2.0, 3.0, 10),
+        ]
+        table = self._make_grid_table(axes, 4)
+
+        gc.collect()
+        set_tracked_allocation(True)
+        tracemalloc.start()
+        rinterpolator = Rinterpolate(table=table, nparams=3, ndata=4, usecache=8)
+        try:
+            assert rinterpolator.memory_usage()["cache"] == 0
+            rinterpolator.interpolate([0.5, 0.1, 2.5])
+            traced, _ = tracemalloc.get_traced_memory()
+
+            usage = rinterpolator.memory_usage()
+            assert usage["python_table"] == table.nbytes
+            assert usage["C_table"] == table.nbytes
+            assert usage["cache"] == 8 * 7 * 8
+            assert usage["presearch"] >= (20 + 30 + 10) * 8
+            assert usage["hypertable"] >= 2**3 * 7 * 8
+            assert (
+                usage["dataspace"]
+                >= usage["total"] - usage["python_table"] - usage["C_table"]
+            )
+            assert traced >= usage["total"] - usage["python_table"]
+
+            # the allocator cannot change while C memory is allocated
+            with self.assertRaises(RuntimeError):
+                set_tracked_allocation(False)
+        finally:
+            rinterpolator.destroy()
+            tracemalloc.stop()
+            set_tracked_allocation(False)
+
+    def test_grouped_batch(self):
+        """
+        Unit test to check that grouping a batch by grid cell gives the same results as interpolating each point
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0, 1.7]),
+            np.array([-100.0, -50.0, -20.0, 0.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 4)
+        rng = np.random.default_rng(3)
+
+        spread = rng.uniform([0, -110, 5], [2, 10, 35], size=(300, 3))
+        dense = rng.uniform([0.31, -49, 11], [0.89, -21, 24], size=(300, 3))
+        repeated = np.repeat(dense[:20], 15, axis=0)
+        on_nodes = self._make_grid_table(axes, 0)[::3]
+        coeffs = np.concatenate([spread, dense, repeated, on_nodes])[
+            rng.permutation(900 + len(on_nodes))
+        ]
+
+        for kwargs in [{}, {"tile_size": 2}]:
+            rinterpolator = Rinterpolate(
+                table=table.tolist(), nparams=3, ndata=4, **kwargs
+            )
+            expected = rinterpolator.interpolate_batch(coeffs, grouped=False)
+            assert np.array_equal(rinterpolator.interpolate_batch(coeffs), expected)
+            assert np.array_equal(
+                rinterpolator.interpolate_batch(coeffs[:1]), expected[:1]
+            )
+            assert rinterpolator.interpolate_batch(coeffs[:0]).shape == (0, 4)
+
+        # ragged tables give NaN for the same points
+        missing = (table[:, 0] == 1.0) & (table[:, 1] == -20.0)
+        ragged_rinterpolator = Rinterpolate(
+            table=table[~missing].tolist(), nparams=3, ndata=4, ragged=True
+        )
+        expected = ragged_rinterpolator.interpolate_batch(coeffs, grouped=False)
+        assert np.array_equal(
+            ragged_rinterpolator.interpolate_batch(coeffs), expected, equal_nan=True
+        )
+
+    def test_cell_cache(self):
+        """
+        Unit test to check that the cell cache gives the same results as interpolating without it,
+        also at the edges of the grid, on nodes, after updating the data and on ragged and tiled tables
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0, 1.7]),
+            np.array([-100.0, -50.0, -20.0, 0.0]),
+            np.array([10.0]),
+        ]
+        table = self._make_grid_table(axes, 4)
+        rng = np.random.default_rng(4)
+
+        # a random walk with small steps, which leaves the grid, and some nodes
+        walk = np.cumsum(rng.normal(0, [0.05, 5.0, 1.0], size=(400, 3)), axis=0) + [
+            0.5,
+            -60.0,
+            10.0,
+        ]
+        nodes = table[rng.choice(len(table), 20), :3]
+        coeffs = np.concatenate([walk, nodes, walk[::-1]])
+
+        missing = (table[:, 0] == 1.0) & (table[:, 1] == -20.0)
+        for table_kwargs in [
+            {"table": table.tolist()},
+            {"table": table.tolist(), "tile_size": 2},
+            {"table": table[~missing].tolist(), "ragged": True},
+        ]:
+            expected = Rinterpolate(
+                nparams=3, ndata=4, **table_kwargs
+            ).interpolate_batch(coeffs, grouped=False)
+            for cellcache in [1, 3]:
+                rinterpolator = Rinterpolate(
+                    nparams=3, ndata=4, cellcache=cellcache, **table_kwargs
+                )
+                result = np.array(
+                    [rinterpolator.interpolate(list(el)) for el in coeffs]
+                )
+                assert np.array_equal(result, expected, equal_nan=True)
+                assert np.array_equal(
+                    rinterpolator.interpolate_batch(coeffs, grouped=False),
+                    expected,
+                    equal_nan=True,
+                )
+                assert rinterpolator.memory_usage()["cell_cache"] == 8 * (
+                    cellcache * (4 * 3 + 2**3 * 4) + 2**2 * 4
+                )
+
+        # the cell cache is cleared when the data change
+        rinterpolator = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=4, cellcache=2
+        )
+        rinterpolator.interpolate_batch(coeffs, grouped=False)
+        new_data = rng.random((len(table), 4))
+        rinterpolator.update_data(new_data)
+        assert np.array_equal(
+            rinterpolator.interpolate_batch(coeffs, grouped=False),
+            Rinterpolate(
+                table=np.hstack([table[:, :3], new_data]).tolist(), nparams=3, ndata=4
+            ).interpolate_batch(coeffs, grouped=False),
+        )
+
+    def test_cache_tolerance(self):
+        """
+        Unit test to check that coordinates that differ by less than the cache tolerances hit the same
+        cache line, with results within the error bound
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        coeffs = np.random.default_rng(5).uniform(
+            [0.1, -100, 10], [1.0, -20, 30], size=(50, 3)
+        )
+        exact = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=3
+        ).interpolate_batch(coeffs)
+
+        # largest slope of the data along each parameter
+        data = table[:, 3:].reshape(4, 3, 3, 3)
+        slopes = [
+            np.max(
+                np.abs(np.diff(data, axis=j))
+                / np.diff(axis).reshape([-1 if i == j else 1 for i in range(4)])
+            )
+            for j, axis in enumerate(axes)
+        ]
+
+        for kwargs, tolerances in [
+            ({"cache_atol": 1e-6}, lambda x: np.full(3, 1e-6)),
+            ({"cache_atol": [1e-6, 0.0, 1e-4]}, lambda x: np.array([1e-6, 0.0, 1e-4])),
+            ({"cache_rtol": 1e-9}, lambda x: 1e-9 * np.abs(x)),
+        ]:
+            rinterpolator = Rinterpolate(
+                table=table.tolist(), nparams=3, ndata=3, usecache=4, **kwargs
+            )
+            reverse = Rinterpolate(
+                table=table.tolist(), nparams=3, ndata=3, usecache=4, **kwargs
+            )
+            for x, expected in zip(coeffs, exact):
+                nearby = np.where(tolerances(x) > 0, x * (1 + 1e-14), x)
+                result = rinterpolator.interpolate(list(x))
+                assert rinterpolator.interpolate(list(nearby)) == result
+                assert reverse.interpolate(list(nearby)) == result
+                bound = np.dot(slopes, tolerances(x))
+                assert np.all(
+                    np.abs(np.array(result) - expected) <= bound * (1 + 1e-9) + 1e-15
+                )
+
+        # without the cache nothing is quantized
+        rinterpolator = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=3, cache_atol=0.1
+        )
+        assert np.array_equal(
+            rinterpolator.interpolate_batch(coeffs, grouped=False), exact
+        )
+
+        # nor once the automatic cache has turned itself off, after the first window
+        # of 4096 lookups in which nothing repeats
+        distinct = np.random.default_rng(6).uniform(
+            [0.1, -100, 10], [1.0, -20, 30], size=(10000, 3)
+        )
+        rinterpolator = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=3, usecache="auto", cache_atol=0.1
+        )
+        results = rinterpolator.interpolate_batch(distinct, grouped=False)
+        assert rinterpolator.cache_info()["cache_length"] == 0
+        assert np.array_equal(
+            results[4096:],
+            Rinterpolate(table=table.tolist(), nparams=3, ndata=3).interpolate_batch(
+                distinct[4096:]
+            ),
+        )
+
+        for kwargs in [
+            {"cache_atol": -1.0},
+            {"cache_atol": [1e-6, 1e-6]},
+            {"cache_atol": 1e-6, "cache_rtol": 1e-6},
+        ]:
+            with self.assertRaises(ValueError):
+                Rinterpolate(
+                    table=table.tolist(), nparams=3, ndata=3, usecache=4, **kwargs
+                ).interpolate(list(coeffs[0]))
+
+    def test_auto_cache(self):
+        """
+        Unit test for the automatic sizing of the cache (usecache="auto")
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0]),
+            np.array([-100.0, -50.0, -20.0]),
+            np.array([10.0, 25.0, 30.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        rng = np.random.default_rng(6)
+        distinct = rng.uniform([0.1, -100, 10], [1.0, -20, 30], size=(20000, 3))
+        repeated = distinct[rng.integers(0, 3, 20000)]
+
+        for coeffs, used in [(repeated, True), (distinct, False)]:
+            expected = Rinterpolate(
+                table=table.tolist(), nparams=3, ndata=3
+            ).interpolate_batch(coeffs)
+            rinterpolator = Rinterpolate(
+                table=table.tolist(), nparams=3, ndata=3, usecache="auto"
+            )
+            assert rinterpolator.cache_info() == {
+                "cache_length": 0,
+                "auto": True,
+                "hit_rate": None,
+            }
+
+            assert np.array_equal(
+                rinterpolator.interpolate_batch(coeffs, grouped=False), expected
+            )
+            info = rinterpolator.cache_info()
+            assert info["auto"]
+            if used:
+                assert 3 <= info["cache_length"] <= 8
+                assert info["hit_rate"] > 0.99
+            else:
+                assert info["cache_length"] == 0
+                assert info["hit_rate"] == 0.0
+
+        # a fixed length turns the automatic sizing off
+        rinterpolator.usecache = 5
+        rinterpolator.interpolate(list(distinct[0]))
+        assert rinterpolator.cache_info() == {
+            "cache_length": 5,
+            "auto": False,
+            "hit_rate": None,
+        }
+
+        with self.assertRaises(ValueError):
+            Rinterpolate(
+                table=table.tolist(), nparams=3, ndata=3, usecache="always"
+            ).interpolate(list(distinct[0]))
+
+    def test_search_methods(self):
+        """
+        Unit test to check that every search algorithm, and those chosen by autotune,
+        give the same results as the binary search, also off the grid, on nodes and
+        on a ragged table
+        """
+
+        axes = [
+            np.linspace(0.0, 1.0, 41),
+            np.array([-100.0, -50.0, -20.0, -19.5, 0.0, 3.0]),
+            np.array([1.0, 2.0]),
+            np.array([10.0]),
+        ]
+        table = self._make_grid_table(axes, 3)
+        rng = np.random.default_rng(7)
+
+        # a random walk which leaves the grid, random coordinates, nodes and nan
+        walk = np.cumsum(
+            rng.normal(0, [0.02, 4.0, 0.1, 1.0], size=(300, 4)), axis=0
+        ) + [0.5, -40.0, 1.5, 10.0]
+        spread = rng.uniform(
+            [-0.2, -120.0, 0.5, 9.0], [1.2, 10.0, 2.5, 11.0], size=(300, 4)
+        )
+        nodes = table[rng.choice(len(table), 30), :4]
+        coeffs = np.concatenate(
+            [walk, spread, nodes, [[np.nan, -30.0, 1.5, 10.0]], walk[::-1]]
+        )
+
+        missing = (table[:, 0] == 0.5) & (table[:, 1] == -20.0)
+        for table_kwargs in [
+            {"table": table.tolist()},
+            {"table": table[~missing].tolist(), "ragged": True},
+        ]:
+            expected = Rinterpolate(
+                nparams=4, ndata=3, **table_kwargs
+            ).interpolate_batch(coeffs)
+            for search in list(SEARCH_METHODS) + [
+                ["hunt", "linear", "indexed", "branchless"]
+            ]:
+                rinterpolator = Rinterpolate(
+                    nparams=4, ndata=3, search=search, **table_kwargs
+                )
+                result = np.array(
+                    [rinterpolator.interpolate(list(el)) for el in coeffs]
+                )
+                assert np.array_equal(result, expected, equal_nan=True)
+                for grouped in [True, False]:
+                    assert np.array_equal(
+                        rinterpolator.interpolate_batch(coeffs, grouped=grouped),
+                        expected,
+                        equal_nan=True,
+                    )
+
+            rinterpolator = Rinterpolate(nparams=4, ndata=3, **table_kwargs)
+            tuned = rinterpolator.autotune(walk)
+            assert rinterpolator.search == tuned["search"]
+            assert all(method in SEARCH_METHODS for method in tuned["search"])
+            assert all(set(times) == set(SEARCH_METHODS) for times in tuned["times"])
+            assert np.array_equal(
+                rinterpolator.interpolate_batch(coeffs), expected, equal_nan=True
+            )
+
+            # the choice is kept when the interpolator is pickled
+            clone = pickle.loads(pickle.dumps(rinterpolator))
+            assert clone.search == tuned["search"]
+            assert np.array_equal(
+                clone.interpolate_batch(coeffs), expected, equal_nan=True
+            )
+
+        with self.assertRaises(ValueError):
+            Rinterpolate(
+                table=table.tolist(), nparams=4, ndata=3, search="fibonacci"
+            ).interpolate([0.5, -30.0, 1.5, 10.0])
+        with self.assertRaises(ValueError):
+            Rinterpolate(
+                table=table.tolist(), nparams=4, ndata=3, search=["hunt"]
+            ).interpolate([0.5, -30.0, 1.5, 10.0])
+
+    def test_categorical(self):
+        """
+        Unit test to check that categorical parameters select the nearest grid value
+        instead of interpolating, with the same results on every path
+        """
+
+        axes = [
+            np.array([0.0, 0.5, 2.0, 3.0]),
+            np.array([0.0, 1.0, 2.0, 5.0]),
+            np.array([0.0, 1.0]),
+            np.array([-1.0, 1.0, 4.0]),
+        ]
+        table = self._make_grid_table(axes, 2)
+        rng = np.random.default_rng(8)
+
+        coeffs = rng.uniform(
+            [-0.5, -1.0, -0.5, -2.0], [3.5, 6.0, 1.5, 5.0], size=(200, 4)
+        )
+        coeffs[:20, 1] = rng.choice([0.5, 1.5, 3.5, 3.6, 2.0, 5.0], 20)
+        coeffs[20:40] = coeffs[:20] + [0.0, 0.0, 0.0, 1e-3]
+
+        # the slice of the table at the nearest category and flag
+        expected = []
+        for x in coeffs:
+            category = axes[1][
+                np.argmin(np.abs(axes[1] - x[1]) - 1e-9 * (axes[1] < x[1]))
+            ]
+            flag = 1.0 if x[2] > 0.5 else 0.0
+            rows = table[(table[:, 1] == category) & (table[:, 2] == flag)][
+                :, [0, 3, 4, 5]
+            ]
+            expected.append(
+                Rinterpolate(table=rows.tolist(), nparams=2, ndata=2).interpolate(
+                    [x[0], x[3]]
+                )
+            )
+        expected = np.array(expected)
+
+        for kwargs in [{}, {"usecache": 4}, {"cellcache": 2}]:
+            rinterpolator = Rinterpolate(
+                table=table.tolist(), nparams=4, ndata=2, categorical=[1, 2], **kwargs
+            )
+            result = np.array([rinterpolator.interpolate(list(x)) for x in coeffs])
+            assert np.array_equal(result, expected)
+            for grouped in [True, False]:
+                assert np.array_equal(
+                    rinterpolator.interpolate_batch(coeffs, grouped=grouped), expected
+                )
+
+        with self.assertRaises(ValueError):
+            Rinterpolate(
+                table=table.tolist(), nparams=4, ndata=2, categorical=[4]
+            ).interpolate([0.0, 0.0, 0.0, 0.0])
+
+    def test_decimate(self):
+        """
+        Unit test to check that decimating a table removes the grid values that are not
+        needed, keeps the error within atol everywhere, and keeps categorical parameters
+        """
+
+        axes = [
+            np.linspace(0.0, 2.0, 61),
+            np.linspace(-1.0, 1.0, 21),
+            np.array([0.0, 1.0, 2.0]),
+        ]
+        grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+        data = np.stack(
+            [
+                np.sin(grid[:, 0]) + grid[:, 1],
+                3.0 * grid[:, 1] - grid[:, 2],
+                grid[:, 0] * grid[:, 2],
+            ],
+            axis=-1,
+        )
+        table = np.hstack([grid, data])
+        rinterpolator = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=3, usecache=2, validate=True
+        )
+
+        coeffs = np.random.default_rng(9).uniform(
+            [-0.1, -1.1, -0.1], [2.1, 1.1, 2.1], size=(2000, 3)
+        )
+        expected = rinterpolator.interpolate_batch(coeffs)
+        for atol in [1e-2, [1e-4, 1e-6, 1e-6]]:
+            decimated, report = rinterpolator.decimate(atol)
+            assert report["original_grid_size"] == [61, 21, 3]
+            assert report["grid_size"][0] < 61 and report["grid_size"][1:] == [2, 2]
+            assert (
+                report["nlines"]
+                == np.prod(report["grid_size"])
+                == decimated.calc_nlines()
+            )
+            assert report["compression"] == 61 * 21 * 3 / report["nlines"]
+            assert np.all(np.array(report["max_error"]) <= atol)
+            assert np.all(
+                np.abs(decimated.interpolate_batch(coeffs) - expected)
+                <= np.array(report["max_error"]) + 1e-12
+            )
+            assert decimated.usecache == 2 and decimated.validate
+
+        # categorical parameters are not decimated
+        decimated, report = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=3, categorical=[2]
+        ).decimate(1e-2)
+        assert report["grid_size"][2] == 3
+
+        with self.assertRaises(ValueError):
+            rinterpolator.decimate(-1.0)
+        with self.assertRaises(ValueError):
+            Rinterpolate(table=table[1:].tolist(), nparams=3, ndata=3).decimate(1e-2)
+
+    def test_interpolate_grid(self):
+        """
+        Unit test to check that interpolating on a Cartesian product of axes gives the same
+        results as interpolating at every combination, and can make a new interpolator
+        """
+
+        axes = [
+            np.array([0.1, 0.3, 0.9, 1.0, 1.7]),
+            np.array([-100.0, -50.0, -20.0, 0.0]),
+            np.linspace(0.0, 1.0, 6),
+        ]
+        table = self._make_grid_table(axes, 3)
+        query = [
+            np.array([1.7, 0.0, 0.3, 0.65, 2.0]),
+            np.array([-60.0, -50.0, -10.0]),
+            np.array([0.5, 0.2, np.nan, 1.2]),
+        ]
+        combinations = np.stack(np.meshgrid(*query, indexing="ij"), axis=-1).reshape(
+            -1, 3
+        )
+
+        missing = (table[:, 0] == 0.3) & (table[:, 1] == -50.0)
+        for kwargs in [
+            {"table": table.tolist()},
+            {"table": table.tolist(), "tile_size": 2},
+            {"table": table[~missing].tolist(), "ragged": True},
+            {"table": table.tolist(), "categorical": [1]},
+        ]:
+            rinterpolator = Rinterpolate(nparams=3, ndata=3, **kwargs)
+            expected = rinterpolator.interpolate_batch(combinations, grouped=False)
+            result = rinterpolator.interpolate_grid(query)
+            assert result.shape == (5, 3, 4, 3)
+            assert np.array_equal(result.reshape(-1, 3), expected, equal_nan=True)
+
+        out = np.empty(5 * 3 * 4 * 3)
+        assert rinterpolator.interpolate_grid(query, out=out) is out
+        assert np.array_equal(out.reshape(-1, 3), expected, equal_nan=True)
+
+        # resample on a new grid
+        rinterpolator = Rinterpolate(
+            table=table.tolist(), nparams=3, ndata=3, usecache=3
+        )
+        new_axes = [
+            np.linspace(0.1, 1.7, 9),
+            np.array([-100.0, -30.0, 0.0]),
+            np.linspace(0.0, 1.0, 3),
+        ]
+        resampled = rinterpolator.interpolate_grid(new_axes, as_interpolator=True)
+        assert resampled.usecache == 3 and resampled.calc_nlines() == 9 * 3 * 3
+        new_combinations = np.stack(
+            np.meshgrid(*new_axes, indexing="ij"), axis=-1
+        ).reshape(-1, 3)
+        assert np.array_equal(
+            resampled.interpolate_batch(new_combinations),
+            rinterpolator.interpolate_batch(new_combinations),
+        )
+
+        # all the settings are kept
+        rinterpolator = Rinterpolate(
+            table=table[~missing].tolist(),
+            nparams=3,
+            ndata=3,
+            ragged=True,
+            validate=True,
+            tile_size=2,
+        )
+        resampled = rinterpolator.interpolate_grid(new_axes, as_interpolator=True)
+        assert resampled._settings() == rinterpolator._settings()
+        assert resampled.ragged and resampled.validate
+        assert np.array_equal(
+            resampled.interpolate_batch(new_combinations),
+            rinterpolator.interpolate_batch(new_combinations),
+            equal_nan=True,
+        )
+
+        with self.assertRaises(ValueError):
+            rinterpolator.interpolate_grid(query[:2])
+        with self.assertRaises(ValueError):
+            rinterpolator.interpolate_grid(query, as_interpolator=True)
+
+    def test_threads(self):
+        """
+        Unit test to check that calls on the same interpolator from several threads give
+        the same results as calls from one thread
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        axes = [
+            np.linspace(0.0, 1.0, 9),
+            np.linspace(-1.0, 1.0, 7),
+            np.linspace(0.0, 3.0, 5),
+        ]
+        table = self._make_grid_table(axes, 4)
+        rng = np.random.default_rng(1)
+        coeffs = [
+            rng.random((2000, 3)) * [1.2, 2.4, 3.6] - [0.1, 1.2, 0.3] for _ in range(32)
+        ]
+        coeffs = [np.round(chunk, 1) for chunk in coeffs]  # so that the cache hits
+
+        reference = Rinterpolate(table=table, nparams=3, ndata=4)
+        expected = [
+            reference.interpolate_batch(chunk, grouped=False) for chunk in coeffs
+        ]
+
+        rinterpolator = Rinterpolate(
+            table=table, nparams=3, ndata=4, usecache=8, cellcache=4, search="hunt"
+        )
+        prepared = rinterpolator.prepare()
+
+        def work(i):
+            chunk = coeffs[i]
+            results = [
+                rinterpolator.interpolate_batch(chunk, grouped=False),
+                rinterpolator.interpolate_batch(chunk),
+                np.array([prepared(el) for el in chunk]),
+                np.array([rinterpolator.interpolate(list(el)) for el in chunk[:50]]),
+            ]
+            return i, results
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for i, results in executor.map(work, range(len(coeffs))):
+                for result in results:
+                    assert np.array_equal(result, expected[i][: len(result)])
+
 if __name__ == "__main__":
     unittest.main()
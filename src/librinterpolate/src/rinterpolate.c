@@ -59,6 +59,9 @@
  * Note that the table is assumed to be sorted from SMALLEST
  * to LARGEST parameter values. It is also assumed to be regular and filled.
  * So no missing data please, just put some dummy values in the table.
+ * Alternatively, set the table up with rinterpolate_make_ragged, in which
+ * case only the nodes that exist have to be in the table. Interpolation
+ * in a cell of which a corner is missing then gives NaN.
  *
  * In order to interpolate data, n parameters are passed into this
  * routine in the array x. The result of the interpolation is put
@@ -74,6 +77,15 @@
  * the cache_length variable exists: if this is false then the cache is skipped.
  * Of course only *you* know if you are likely to call the interpolate routine
  * repeated with the same values... I cannot possibly know this in advance!
+ * Or, pass cache_length RINTERPOLATE_CACHE_AUTO and the cache length is
+ * chosen (and changed) from the hit rate and timings, see
+ * rinterpolate_adapt_cache.
+ *
+ * There is also a cell cache (see rinterpolate_resize_cell_cache),
+ * which keeps the hypercubes of the last few cells of the grid that
+ * were interpolated in. Any x in one of these cells, not only the
+ * same x, then skips the search and the construction of the hypercube,
+ * which helps e.g. integrators that take many small steps.
  *
  * The interpolation process involved finding the lines of the data table
  * which span each parameter x. This makes a hypercube of length 2^n (e.g.
@@ -176,8 +188,6 @@ struct rinterpolate_data_t * rinterpolate(
     }
     else
     {
-        rinterpolate_signed_counter_t table_id;
-
         /*
          * First time through:
          * set up memory space if not already done
@@ -185,50 +195,19 @@ struct rinterpolate_data_t * rinterpolate(
         if(unlikely(rinterpolate_data==NULL))
         {
             rinterpolate_alloc_dataspace(&rinterpolate_data);
-            table_id = -1;
-        }
-        else
-        {
-            /*
-             * Get the table id
-             */
-            table_id =
-                rinterpolate_id_table(rinterpolate_data,
-                                      datatable);
-        }
-
-        Rinterpolate_print("Table ID %d\n",table_id);
-
-        if(table_id == -1)
-        {
-            /*
-             * Table not found, so add a new table
-             */
-            table_id = rinterpolate_add_new_table(rinterpolate_data,
-                                                  datatable,
-                                                  n,
-                                                  d,
-                                                  l,
-                                                  cache_length);
-            Rinterpolate_print("New table ID %d\n",table_id);
         }
 
         /*
-         * Pointer to the table
+         * Pointer to the table (which is set up if this
+         * is the first time we see it)
          */
         struct rinterpolate_table_t * RESTRICT table =
-            rinterpolate_data->tables[table_id];
-
-#ifdef RINTERPOLATE_CACHE
-        /*
-         * Check for cache resize (if it is resized,
-         * it is wiped)
-         */
-        if(cache_length != table->cache_length)
-        {
-            rinterpolate_resize_cache(table,cache_length);
-        }
-#endif // RINTERPOLATE_CACHE
+            rinterpolate_find_table(rinterpolate_data,
+                                    datatable,
+                                    n,
+                                    d,
+                                    l,
+                                    cache_length);
 
 #ifdef RINTERPOLATE_DEBUG
 #ifdef RINTERPOLATE_DEBUG_SHOW_TABLE
@@ -252,52 +231,87 @@ struct rinterpolate_data_t * rinterpolate(
 
 
 #ifdef RINTERPOLATE_CACHE
+        /*
+         * With cache tolerances, look up and interpolate at
+         * x quantized (see rinterpolate_quantize). This checks the
+         * current cache length, not the argument, because the
+         * automatic cache can be turned off.
+         */
+        const rinterpolate_float_t * RESTRICT const xc =
+            table->cache_length && table->cache_quantum != NULL ?
+            rinterpolate_quantize(table,x) : x;
+#else
+        const rinterpolate_float_t * RESTRICT const xc = x;
+#endif // RINTERPOLATE_CACHE
+
+#ifdef RINTERPOLATE_CACHE
+        /*
+         * With automatic sizing (see rinterpolate_adapt_cache),
+         * count the lookups and time some of them
+         */
+        struct rinterpolate_cache_stats_t * const stats = table->cache_stats;
+        const rinterpolate_Boolean_t timed =
+            (stats != NULL &&
+             (stats->lookups++ & (RINTERPOLATE_CACHE_AUTO_SAMPLE-1)) == 0) ? TRUE : FALSE;
+        double t0 = 0.0, t1 = 0.0;
+        if(unlikely(timed == TRUE))
+        {
+            t0 = rinterpolate_clock();
+        }
+
         /* check for cache match */
-        if(cache_length &&
-           rinterpolate_check_cache(table,x,r) == TRUE)
+        if(table->cache_length &&
+           rinterpolate_check_cache(table,xc,r) == TRUE)
         {
+            if(stats != NULL)
+            {
+                /* count the hit by the age of the line */
+                rinterpolate_counter_t age =
+                    (table->cache_spin_line + table->cache_length - table->cache_match_line) %
+                    table->cache_length;
+                rinterpolate_counter_t range = 0;
+                while(age)
+                {
+                    range++;
+                    age >>= 1;
+                }
+                stats->hits++;
+                stats->age_hits[Min(range,RINTERPOLATE_CACHE_AUTO_AGES-1)]++;
+            }
             goto cache_match;
         }
+
+        if(unlikely(timed == TRUE))
+        {
+            t1 = rinterpolate_clock();
+        }
 #endif // RINTERPOLATE_CACHE
 
         /*
          * Result is not cached, or we did not want to search the cache,
          * we must calculate the interpolation.
-         *
-         * First, search the table to find the spanning indices.
          */
-        rinterpolate_search_table(table,x);
-
-#ifdef RINTERPOLATE_DEBUG
-        if(rinterpolate_debug==TRUE)
+#ifdef RINTERPOLATE_CACHE
+        if(table->cell_cache_length)
         {
-            rinterpolate_counter_t j;
-            Rinterpolate_print("Parameter (x) values: ");
-            for(j=0;j<table->n;j++)
-            {
-                Rinterpolate_print("% 3.3e ",x[j]);
-            }
-            Rinterpolate_print("\n");
-
-            Rinterpolate_print("Interpolation (f) factors: ");
-            for(j=0;j<table->n;j++)
+            /*
+             * If x is in a cell of the cell cache, only reduce its
+             * hypercube, otherwise make the hypercube of the whole
+             * cell, store it and reduce it
+             */
+            if(rinterpolate_check_cell_cache(table,xc,r) == FALSE)
             {
-                Rinterpolate_print("% 3.3e ",table->hypertable->f[j]);
+                rinterpolate_search_table(table,xc);
+                rinterpolate_construct_hypercube(table);
+                rinterpolate_store_cell_cache(table);
+                rinterpolate_interpolate(table,xc,r);
             }
-            Rinterpolate_print("\n");
-            Rinterpolate_print("Interpolation hypertable:\n");
         }
-#endif
-
-        /*
-         * construct hypercube
-         */
-        rinterpolate_construct_hypercube(table);
-
-        /*
-         * Do interpolation on hypercube
-         */
-        rinterpolate_interpolate(table,x,r);
+        else
+#endif // RINTERPOLATE_CACHE
+        {
+            rinterpolate_evaluate(table,xc,r);
+        }
 
 #ifdef RINTERPOLATE_DEBUG
         {
@@ -322,13 +336,28 @@ struct rinterpolate_data_t * rinterpolate(
          *
          * Save the results of the interpolation into the cache
          */
-        if(cache_length)
+        if(unlikely(timed == TRUE))
+        {
+            const double t2 = rinterpolate_clock();
+            stats->lookup_time += t1 - t0 - stats->clock_cost;
+            stats->lookup_lines += table->cache_length;
+            stats->miss_time += t2 - t1 - stats->clock_cost;
+            stats->misses_timed++;
+        }
+
+        if(table->cache_length)
         {
-            rinterpolate_store_cache(table,x,r);
+            rinterpolate_store_cache(table,xc,r);
         }
 
     cache_match:
 
+        if(stats != NULL &&
+           stats->lookups >= RINTERPOLATE_CACHE_AUTO_WINDOW)
+        {
+            rinterpolate_adapt_cache(table);
+        }
+
 #endif // RINTERPOLATE_CACHE
 
         return rinterpolate_data;
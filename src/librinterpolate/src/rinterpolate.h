@@ -14,6 +14,18 @@
 #include <math.h>
 #include <float.h>
 #include <stdio.h>
+#include <stdint.h>
+#include <limits.h>
+
+/*
+ * Free through the current allocator (see below)
+ */
+#define Safe_free(PTR)                                                  \
+    if(likely((PTR)!=NULL))                                             \
+    {                                                                   \
+        Rinterpolate_free(PTR);                                         \
+        (PTR)=NULL;                                                     \
+    };
 #include "rinterpolate_compiler.h"
 
 /************************************************************
@@ -38,6 +50,10 @@ typedef unsigned int rinterpolate_Boolean_t;
 #define RINTERPOLATE_NO_ERROR 0
 #define RINTERPOLATE_CALLOC_FAILED 1
 #define RINTERPOLATE_ALLOCATE_OVER 2
+#define RINTERPOLATE_TABLE_NOT_SORTED 3
+#define RINTERPOLATE_TABLE_TOO_LARGE 4
+#define RINTERPOLATE_APPEND_MISMATCH 5
+#define RINTERPOLATE_TABLE_NOT_REGULAR 6
 
 /* enable malloc/calloc checks : done once, should be fast */
 #define RINTERPOLATE_ALLOC_CHECKS
@@ -58,11 +74,14 @@ typedef unsigned int rinterpolate_Boolean_t;
 #define RINTERPOLATE_USE_REALLOC
 
 /*
- * Use standard *alloc
+ * Allocate through rinterpolate_allocator: this is the standard *alloc
+ * unless changed with rinterpolate_set_allocator, e.g. so that a host
+ * program can trace librinterpolate's memory.
  */
-#define Rinterpolate_malloc(A) malloc(A)
-#define Rinterpolate_calloc(A,B) calloc((A),(B))
-#define Rinterpolate_realloc(A,B) realloc((A),(B))
+#define Rinterpolate_malloc(A) rinterpolate_allocator.malloc_function(A)
+#define Rinterpolate_calloc(A,B) rinterpolate_allocator.calloc_function((A),(B))
+#define Rinterpolate_realloc(A,B) rinterpolate_allocator.realloc_function((A),(B))
+#define Rinterpolate_free(A) rinterpolate_allocator.free_function(A)
 
 /*
  * In some places I have different algorithms based on either
@@ -91,6 +110,15 @@ typedef unsigned int rinterpolate_Boolean_t;
 /* pointer to the location of cache result A */
 #define RINTERPOLATE_CACHE_RESULT(A) (table->cache+RINTERPOLATE_CACHE_LINE*(A)+table->n)
 
+/*
+ * length of a line (cell) in the cell cache: the lower and upper grid
+ * values, and the limits of x, on each axis, then the hypercube
+ */
+#define RINTERPOLATE_CELL_CACHE_LINE (4*table->n+table->hypertable_length*table->d)
+
+/* pointer to cell A of the cell cache */
+#define Rinterpolate_cell_cache_line(A) (table->cell_cache+RINTERPOLATE_CELL_CACHE_LINE*(A))
+
 /* memcpy is usually faster for copying interpolation results to the cache */
 #define RINTERPOLATE_CACHE_USE_MEMCPY
 
@@ -101,6 +129,55 @@ typedef unsigned int rinterpolate_Boolean_t;
  */
 #define RINTERPOLATE_PRESEARCH
 
+/* evaluation modes */
+#define RINTERPOLATE_MODE_LINEAR 0
+#define RINTERPOLATE_MODE_NEAREST 1
+#define RINTERPOLATE_MODE_FLOOR 2
+#define RINTERPOLATE_MODE_SIMPLEX 3
+
+/* levels of SIMD kernels, see rinterpolate_simd.c */
+#define RINTERPOLATE_SIMD_AUTO -1
+#define RINTERPOLATE_SIMD_GENERIC 0
+#define RINTERPOLATE_SIMD_SSE2 1
+#define RINTERPOLATE_SIMD_AVX2 2
+#define RINTERPOLATE_SIMD_AVX512 3
+
+/*
+ * search algorithms of each axis, see rinterpolate_search_axis.c
+ * (RINTERPOLATE_SEARCH_AUTO is only used by rinterpolate_autotune_search)
+ */
+#define RINTERPOLATE_SEARCH_BINARY 0
+#define RINTERPOLATE_SEARCH_BRANCHLESS 1
+#define RINTERPOLATE_SEARCH_LINEAR 2
+#define RINTERPOLATE_SEARCH_HUNT 3
+#define RINTERPOLATE_SEARCH_INDEXED 4
+#define RINTERPOLATE_SEARCH_NUMBER 5
+
+/* buckets of the RINTERPOLATE_SEARCH_INDEXED index per grid interval */
+#define RINTERPOLATE_SEARCH_BUCKETS 2
+
+/*
+ * cache_length that asks for the cache to be sized automatically,
+ * see rinterpolate_adapt_cache
+ */
+#define RINTERPOLATE_CACHE_AUTO UINT_MAX
+
+/* lookups per window of the automatic cache sizing */
+#define RINTERPOLATE_CACHE_AUTO_WINDOW 4096
+
+/* one in this many lookups is timed (must be a power of two) */
+#define RINTERPOLATE_CACHE_AUTO_SAMPLE 64
+
+/* initial and largest automatic cache lengths (powers of two) */
+#define RINTERPOLATE_CACHE_AUTO_START 8
+#define RINTERPOLATE_CACHE_AUTO_MAX 1024
+
+/* windows after which a disabled automatic cache is tried again */
+#define RINTERPOLATE_CACHE_AUTO_RETRY 16
+
+/* number of ranges of age of the cache lines: 0, 1, 2-3, 4-7 ... */
+#define RINTERPOLATE_CACHE_AUTO_AGES 12
+
 /* use interpolation cache? should speed up interpolation in many cases */
 #define RINTERPOLATE_CACHE
 
@@ -121,24 +198,69 @@ struct rinterpolate_hypertable_t {
     rinterpolate_float_t * data;
     rinterpolate_float_t * f;
     rinterpolate_counter_t  * sum;
+    rinterpolate_counter_t  * index;
+    rinterpolate_counter_t n_active; /* number of axes spanned by the hypercube */
+    rinterpolate_counter_t active_length; /* 2^n_active lines in the hypercube */
 #ifdef RINTERPOLATE_USE_REALLOC
     size_t RINTERPOLATE_ALLOCD;
 #endif
 };
 
+/* statistics of the cache of a table in automatic mode */
+struct rinterpolate_cache_stats_t {
+    size_t lookups; /* in this window */
+    size_t hits;
+    size_t age_hits[RINTERPOLATE_CACHE_AUTO_AGES]; /* hits by age of the line */
+    double lookup_time; /* ns spent on timed lookups that missed */
+    double lookup_lines; /* lines compared in them */
+    double miss_time; /* ns spent on timed interpolations */
+    size_t misses_timed;
+    double clock_cost; /* ns taken by rinterpolate_clock itself */
+    double line_cost; /* estimated ns to compare one line */
+    double miss_cost; /* estimated ns to interpolate */
+    double hit_rate; /* of the last window */
+    rinterpolate_counter_t idle_windows; /* since the cache was disabled */
+    rinterpolate_counter_t retry_length; /* length of the next try of a disabled cache */
+    rinterpolate_counter_t retry_windows; /* windows to wait before it */
+};
+
+/* the search algorithm of one axis, see rinterpolate_set_search */
+struct rinterpolate_search_t {
+    rinterpolate_counter_t method;
+    rinterpolate_counter_t last; /* HUNT: the index found last time */
+    rinterpolate_counter_t * guess; /* INDEXED: the index at the start of each bucket */
+    rinterpolate_counter_t nbuckets;
+    rinterpolate_float_t scale; /* INDEXED: buckets per unit of the axis */
+};
+
 struct rinterpolate_table_t {
     struct rinterpolate_data_t * parent;
     struct rinterpolate_hypertable_t * hypertable;
     rinterpolate_float_t  * data;
+    rinterpolate_float_t  * layout_data; /* tiled copy of the data items (l*d), or NULL for row-major */
+    uint64_t * mask; /* ragged tables: bit set for each grid node present in data */
+    rinterpolate_counter_t * mask_rank; /* number of bits set before each mask word */
+    rinterpolate_Boolean_t * categorical; /* exact-match axes, or NULL, see rinterpolate_set_categorical */
 #ifdef RINTERPOLATE_CACHE
     rinterpolate_float_t * RESTRICT cache;
     rinterpolate_counter_t cache_match_line;
     rinterpolate_signed_counter_t cache_spin_line;
+    struct rinterpolate_cache_stats_t * cache_stats; /* automatic cache sizing, or NULL */
+    rinterpolate_float_t * cell_cache; /* hypercubes of recent cells, see rinterpolate_store_cell_cache */
+    rinterpolate_float_t * cell_cache_work;
+    rinterpolate_counter_t cell_cache_length;
+    rinterpolate_counter_t cell_cache_used;
+    rinterpolate_counter_t cell_cache_next;
+    rinterpolate_counter_t cell_cache_match_line;
+    rinterpolate_float_t * cache_quantum; /* quantization of x for the cache, see rinterpolate_set_cache_tolerance */
+    rinterpolate_counter_t * cache_round_bits;
+    rinterpolate_float_t * cache_x;
 #endif
     rinterpolate_counter_t * RESTRICT steps;
 #ifdef RINTERPOLATE_PRESEARCH
     rinterpolate_float_t ** RESTRICT presearch;
     rinterpolate_counter_t  presearch_n;
+    struct rinterpolate_search_t * search; /* per axis, or NULL for binary searches */
 #endif
     size_t d_float_sizeof;
     size_t n_float_sizeof;
@@ -148,6 +270,7 @@ struct rinterpolate_table_t {
     rinterpolate_counter_t n;
     rinterpolate_counter_t d;
     rinterpolate_counter_t l;
+    rinterpolate_counter_t nnodes; /* number of nodes of the parameter grid (l unless ragged) */
 #ifndef RINTERPOLATE_PRESEARCH
     rinterpolate_counter_t g;
 #endif
@@ -157,6 +280,7 @@ struct rinterpolate_table_t {
 #endif
     rinterpolate_counter_t hypertable_length;
     rinterpolate_counter_t table_number;
+    rinterpolate_counter_t tile; /* tile edge length of layout_data */
 };
 
 
@@ -165,6 +289,48 @@ struct rinterpolate_data_t {
     rinterpolate_counter_t number_of_interpolation_tables;
 };
 
+struct rinterpolate_allocator_t {
+    void * (*malloc_function)(size_t);
+    void * (*calloc_function)(size_t,size_t);
+    void * (*realloc_function)(void *,size_t);
+    void (*free_function)(void *);
+};
+
+/* bytes allocated by librinterpolate for one table */
+struct rinterpolate_memory_t {
+    size_t table; /* the table struct, steps and varcount */
+    size_t cache;
+    size_t cell_cache;
+    size_t presearch;
+    size_t hypertable;
+    size_t layout;
+    size_t mask;
+};
+
+/* the kernels of the inner loops, chosen by rinterpolate_set_simd */
+struct rinterpolate_simd_t {
+    void (*reduce_step)(rinterpolate_float_t * RESTRICT const data,
+                        const rinterpolate_counter_t g,
+                        const rinterpolate_counter_t line_length,
+                        const rinterpolate_counter_t d,
+                        const rinterpolate_float_t u,
+                        const rinterpolate_float_t v);
+    void (*axpy)(rinterpolate_float_t * RESTRICT const r,
+                 const rinterpolate_float_t * RESTRICT const x,
+                 const rinterpolate_float_t w,
+                 const rinterpolate_counter_t d);
+    void (*blend)(rinterpolate_float_t * RESTRICT const r,
+                  const rinterpolate_float_t * RESTRICT const a,
+                  const rinterpolate_float_t * RESTRICT const b,
+                  const rinterpolate_counter_t d,
+                  const rinterpolate_float_t u,
+                  const rinterpolate_float_t v);
+    rinterpolate_signed_counter_t level;
+};
+
+extern struct rinterpolate_allocator_t rinterpolate_allocator;
+extern struct rinterpolate_simd_t rinterpolate_simd;
+
 /************************************************************
  * rinterpolate's prototypes
  ************************************************************/
@@ -0,0 +1,117 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+
+/*
+ * Choose the length of the cache of a table in automatic mode,
+ * at the end of a window of RINTERPOLATE_CACHE_AUTO_WINDOW lookups.
+ *
+ * During the window, rinterpolate counts the hits by the age of the
+ * matching line (0 for the newest, in ranges 0, 1, 2-3, 4-7 ...), so
+ * the hits a cache of any smaller power-of-two length would have had
+ * are known. A cache twice as long is assumed to gain as many hits
+ * as the oldest half of the lines had. One in
+ * RINTERPOLATE_CACHE_AUTO_SAMPLE lookups that miss is timed, which
+ * gives the cost of comparing a line and of an interpolation.
+ *
+ * The length L (0, a power of two up to twice the current, at most
+ * RINTERPOLATE_CACHE_AUTO_MAX) is the one that saves the most time:
+ *
+ *     hits(L) * interpolation cost - misses(L) * L * line cost
+ *
+ * which is 0 without a cache. The cache is resized to it, keeping
+ * its newest lines. A cache that is turned off is tried again
+ * after RINTERPOLATE_CACHE_AUTO_RETRY windows, eight times longer
+ * each time (up to RINTERPOLATE_CACHE_AUTO_MAX, then starting again),
+ * so that repeats further apart than the current length are found.
+ * Each try that does not help doubles the wait before the next
+ * (up to 64 times), so the tries cost little when nothing repeats.
+ */
+
+void rinterpolate_adapt_cache(struct rinterpolate_table_t * RESTRICT const table)
+{
+    struct rinterpolate_cache_stats_t * RESTRICT const stats = table->cache_stats;
+    const rinterpolate_counter_t length = table->cache_length;
+    const double lookups = (double)stats->lookups;
+
+    stats->hit_rate = lookups > 0 ? stats->hits / lookups : 0.0;
+    if(stats->lookup_lines > 0)
+    {
+        stats->line_cost = Max(stats->lookup_time,0.0) / stats->lookup_lines;
+    }
+    if(stats->misses_timed > 0)
+    {
+        stats->miss_cost = Max(stats->miss_time,0.0) / stats->misses_timed;
+    }
+
+    if(length == 0)
+    {
+        stats->idle_windows++;
+        if(stats->idle_windows >= stats->retry_windows)
+        {
+            stats->idle_windows = 0;
+            rinterpolate_resize_cache(table,stats->retry_length);
+            stats->retry_length =
+                stats->retry_length >= RINTERPOLATE_CACHE_AUTO_MAX ?
+                RINTERPOLATE_CACHE_AUTO_START :
+                Min(8*stats->retry_length,RINTERPOLATE_CACHE_AUTO_MAX);
+        }
+    }
+    else if(stats->miss_cost > 0.0)
+    {
+        rinterpolate_counter_t best = 0;
+        double best_saving = 0.0;
+        double hits = 0.0;
+        rinterpolate_counter_t k;
+
+        for(k=0;
+            k<RINTERPOLATE_CACHE_AUTO_AGES &&
+                (1u<<k) <= Min(2*length,RINTERPOLATE_CACHE_AUTO_MAX);
+            k++)
+        {
+            const rinterpolate_counter_t try_length = 1u<<k;
+            double try_hits;
+            if(try_length <= length)
+            {
+                hits += stats->age_hits[k];
+                try_hits = hits;
+            }
+            else
+            {
+                /* at most all the misses become hits */
+                try_hits = hits + Min((double)stats->age_hits[k-1],lookups - hits);
+            }
+
+            const double saving =
+                try_hits * stats->miss_cost -
+                (lookups - try_hits) * try_length * stats->line_cost;
+            if(saving > best_saving)
+            {
+                best = try_length;
+                best_saving = saving;
+            }
+        }
+
+        if(best != length)
+        {
+            stats->idle_windows = 0;
+            rinterpolate_resize_cache(table,best);
+        }
+
+        /* wait longer before trying again if the cache did not help */
+        stats->retry_windows = best == 0 ?
+            Min(2*stats->retry_windows,64*RINTERPOLATE_CACHE_AUTO_RETRY) :
+            RINTERPOLATE_CACHE_AUTO_RETRY;
+    }
+
+    /* start a new window */
+    stats->lookups = 0;
+    stats->hits = 0;
+    memset(stats->age_hits,0,sizeof(stats->age_hits));
+    stats->lookup_time = 0.0;
+    stats->lookup_lines = 0.0;
+    stats->miss_time = 0.0;
+    stats->misses_timed = 0;
+}
+#endif // RINTERPOLATE_CACHE
@@ -32,6 +32,11 @@ rinterpolate_counter_t rinterpolate_add_new_table(
      */
     table->parent = rinterpolate_data;
     table->data = (rinterpolate_float_t *) data;
+    table->layout_data = NULL;
+    table->tile = 0;
+    table->mask = NULL;
+    table->mask_rank = NULL;
+    table->categorical = NULL;
     table->table_number = table_number;
 
     /*
@@ -40,12 +45,25 @@ rinterpolate_counter_t rinterpolate_add_new_table(
     table->n = n;
     table->d = d;
     table->l = l;
+    table->nnodes = l;
     table->line_length = n + d;
     table->hypertable_length = Intger_power_of_two(n);
 #ifdef RINTERPOLATE_CACHE
     table->cache_length = cache_length;
+    table->cache_stats = NULL;
+    table->cell_cache = NULL;
+    table->cell_cache_work = NULL;
+    table->cell_cache_length = 0;
+    table->cell_cache_used = 0;
+    table->cell_cache_next = 0;
+    table->cell_cache_match_line = 0;
+    table->cache_quantum = NULL;
+    table->cache_round_bits = NULL;
+    table->cache_x = NULL;
 #endif
-#ifndef RINTERPOLATE_PRESEARCH
+#ifdef RINTERPOLATE_PRESEARCH
+    table->search = NULL;
+#else
     table->g = table->line_length*(table->l-1); // start of the final line of the table
 #endif
     
@@ -19,6 +19,15 @@ rinterpolate_counter_t rinterpolate_alloc_dataspace(struct rinterpolate_data_t *
     }
     else
     {
+        /*
+         * Choose the SIMD kernels for this CPU, unless
+         * this has been done already
+         */
+        if(rinterpolate_simd.level == -1)
+        {
+            rinterpolate_set_simd(RINTERPOLATE_SIMD_AUTO);
+        }
+
         /*
          * Allocate space
          */
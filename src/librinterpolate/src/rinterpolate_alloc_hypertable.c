@@ -10,9 +10,12 @@ void rinterpolate_alloc_hypertable(struct rinterpolate_table_t * RESTRICT const
     Rinterpolate_print("Interpolate: memory allocation\n");FLUSH;
 #endif
     table->hypertable->table = table;
+    table->hypertable->n_active = table->n;
+    table->hypertable->active_length = table->hypertable_length;
     table->hypertable->data = Rinterpolate_malloc(table->hypertable_length*table->line_length_sizeof);
     table->hypertable->f = Rinterpolate_malloc(table->n_float_sizeof);
     table->hypertable->sum = Rinterpolate_calloc(1,table->sum_sizeof);
+    table->hypertable->index = Rinterpolate_calloc(Max(table->n,1),sizeof(rinterpolate_counter_t));
 
 #ifdef RINTERPOLATE_DEBUG
     Rinterpolate_print("MALLOC data at %p size %zu, f at %p size %zu, sum at %p size %zu\n",
@@ -23,7 +26,8 @@ void rinterpolate_alloc_hypertable(struct rinterpolate_table_t * RESTRICT const
 #ifdef RINTERPOLATE_ALLOC_CHECKS
     if(unlikely((table->hypertable->data==NULL)||
                 (table->hypertable->f==NULL)||
-                (table->hypertable->sum==NULL)))
+                (table->hypertable->sum==NULL)||
+                (table->hypertable->index==NULL)))
     {
         rinterpolate_error(RINTERPOLATE_CALLOC_FAILED,
                            "Error allocating f or sum in rinterpolate_alloc_hypertable\n",
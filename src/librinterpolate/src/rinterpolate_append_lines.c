@@ -0,0 +1,84 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Lines have been appended to the data of a table, which now has
+ * l lines and may have moved to datatable (e.g. after a realloc). The new lines should be whole slices of the
+ * grid along the first (slowest varying) parameter, i.e. blocks of
+ * steps[0] lines with the same grid on the other parameters as
+ * the existing slices, and increasing values of the first parameter.
+ *
+ * Only the new lines are checked (see rinterpolate_check_append,
+ * which can be called before the lines are added to the data) and
+ * only the structures of the first parameter (varcount, presearch)
+ * are extended, so the cost is proportional to the number of new
+ * lines. The cache of results
+ * is cleared and the new lines are added to the tiled copy of the
+ * data, if any (with the lines of the old last tile along the first
+ * parameter, which grows, see rinterpolate_update_layout).
+ *
+ * Returns RINTERPOLATE_NO_ERROR, or RINTERPOLATE_APPEND_MISMATCH if
+ * the new lines are not slices of the grid, in which case the table
+ * keeps its old lines (at the new address). Ragged tables cannot be
+ * extended like this.
+ */
+
+rinterpolate_counter_t rinterpolate_append_lines(struct rinterpolate_table_t * RESTRICT const table,
+                                                const rinterpolate_float_t * const datatable,
+                                                const rinterpolate_counter_t l)
+{
+    const rinterpolate_counter_t slice = table->steps[0];
+    const size_t line_length = table->line_length;
+    rinterpolate_counter_t i;
+
+    table->data = (rinterpolate_float_t *) datatable;
+
+    if(l < table->l ||
+       rinterpolate_check_append(table,
+                                 table->data + (size_t)table->l*line_length,
+                                 l - table->l) != RINTERPOLATE_NO_ERROR)
+    {
+        return RINTERPOLATE_APPEND_MISMATCH;
+    }
+
+    /*
+     * Extend the first parameter
+     */
+    const rinterpolate_counter_t old_varcount = table->varcount[0];
+    table->l = l;
+    table->nnodes = l;
+    table->varcount[0] = l / slice;
+#ifndef RINTERPOLATE_PRESEARCH
+    table->g = table->line_length*(table->l-1);
+#endif
+
+#ifdef RINTERPOLATE_PRESEARCH
+    table->presearch[0] =
+        Rinterpolate_realloc(table->presearch[0],
+                             table->varcount[0]*sizeof(rinterpolate_float_t));
+#ifdef RINTERPOLATE_ALLOC_CHECKS
+    if(unlikely(table->presearch[0]==NULL))
+    {
+        rinterpolate_error(RINTERPOLATE_CALLOC_FAILED,
+                           "realloc failed in rinterpolate_append_lines : presearch\n",
+                           table->parent);
+    }
+#endif
+    for(i=old_varcount;i<table->varcount[0];i++)
+    {
+        table->presearch[0][i] = table->data[(size_t)i*slice*line_length];
+    }
+#endif
+
+#ifdef RINTERPOLATE_CACHE
+    rinterpolate_clear_cache(table);
+#endif
+
+    if(table->layout_data != NULL)
+    {
+        rinterpolate_update_layout(table,
+                                   (old_varcount / table->tile) * table->tile * slice);
+    }
+
+    return RINTERPOLATE_NO_ERROR;
+}
@@ -0,0 +1,64 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Evaluate the table data at k points of which the corners and
+ * weights were found by rinterpolate_locate, each with ncorners
+ * corners.
+ *
+ * data is a table of lines of line_length items, of which the
+ * ncolumns items at columns[] are interpolated. The results of
+ * point p are put in r[p*ncolumns ... (p+1)*ncolumns-1].
+ *
+ * Corners with zero weight are skipped, so missing corners (-1)
+ * only give NaN if they are required.
+ */
+
+void rinterpolate_apply_weights(const rinterpolate_float_t * RESTRICT const data,
+                                const size_t line_length,
+                                const size_t ncolumns,
+                                const int64_t * RESTRICT const columns,
+                                const size_t k,
+                                const size_t ncorners,
+                                const int64_t * RESTRICT const corners,
+                                const rinterpolate_float_t * RESTRICT const weights,
+                                rinterpolate_float_t * RESTRICT const r)
+{
+    size_t p,c,i;
+
+    for(p=0;p<k;p++)
+    {
+        const int64_t * const pcorners = corners + p*ncorners;
+        const rinterpolate_float_t * const pweights = weights + p*ncorners;
+        rinterpolate_float_t * const pr = r + p*ncolumns;
+
+        for(i=0;i<ncolumns;i++)
+        {
+            pr[i] = 0.0;
+        }
+
+        for(c=0;c<ncorners;c++)
+        {
+            const rinterpolate_float_t w = pweights[c];
+            if(w != 0.0)
+            {
+                if(likely(pcorners[c] >= 0))
+                {
+                    const rinterpolate_float_t * const line =
+                        data + (size_t)pcorners[c]*line_length;
+                    for(i=0;i<ncolumns;i++)
+                    {
+                        pr[i] += w * line[columns[i]];
+                    }
+                }
+                else
+                {
+                    for(i=0;i<ncolumns;i++)
+                    {
+                        pr[i] = NAN;
+                    }
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,108 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Time each search algorithm (see rinterpolate_search_axis) on each
+ * axis of the table with k sets of parameters, x (k*n items), which
+ * should be a sample of those that will be interpolated, then set
+ * each axis to its fastest algorithm with rinterpolate_set_search.
+ *
+ * The sets are searched in order, once per repeat, so that the hunt
+ * sees the same sequence it will in use. Each time is the best of
+ * RINTERPOLATE_AUTOTUNE_REPEATS.
+ *
+ * If times is not NULL, it is set to the time (ns) per search
+ * of each axis j and method m, in times[j*RINTERPOLATE_SEARCH_NUMBER+m].
+ *
+ * Returns the return value of rinterpolate_set_search.
+ */
+
+#define RINTERPOLATE_AUTOTUNE_REPEATS 3
+
+rinterpolate_counter_t rinterpolate_autotune_search(struct rinterpolate_table_t * RESTRICT const table,
+                                                    const rinterpolate_float_t * RESTRICT const x,
+                                                    const size_t k,
+                                                    double * RESTRICT const times)
+{
+    const rinterpolate_counter_t n = table->n;
+    rinterpolate_counter_t * const methods = Rinterpolate_calloc(Max(n,1),sizeof(rinterpolate_counter_t));
+    rinterpolate_counter_t * const fastest = Rinterpolate_calloc(Max(n,1),sizeof(rinterpolate_counter_t));
+    double * const best = Rinterpolate_malloc(sizeof(double) * Max(n,1));
+    rinterpolate_counter_t j,m,repeat,status;
+    volatile rinterpolate_counter_t sink = 0;
+    size_t p;
+
+    if(unlikely(methods == NULL || fastest == NULL || best == NULL))
+    {
+        Rinterpolate_free(methods);
+        Rinterpolate_free(fastest);
+        Rinterpolate_free(best);
+        return RINTERPOLATE_CALLOC_FAILED;
+    }
+
+    for(m=0;m<RINTERPOLATE_SEARCH_NUMBER;m++)
+    {
+        struct rinterpolate_search_t binary_search = {0};
+
+        for(j=0;j<n;j++)
+        {
+            methods[j] = m;
+        }
+        status = rinterpolate_set_search(table,methods);
+        if(unlikely(status != 0))
+        {
+            Rinterpolate_free(methods);
+            Rinterpolate_free(fastest);
+            Rinterpolate_free(best);
+            return status;
+        }
+
+        for(j=0;j<n;j++)
+        {
+            struct rinterpolate_search_t * const search =
+                table->search != NULL ? table->search + j : &binary_search;
+            const rinterpolate_float_t * const tpre = table->presearch[j];
+            const rinterpolate_counter_t b = table->varcount[j];
+            double t = 0.0;
+
+            if(b > 1)
+            {
+                for(repeat=0;repeat<RINTERPOLATE_AUTOTUNE_REPEATS;repeat++)
+                {
+                    rinterpolate_counter_t sum = 0;
+                    double start;
+                    search->last = 0;
+                    start = rinterpolate_clock();
+                    for(p=0;p<k;p++)
+                    {
+                        const rinterpolate_float_t v = Max(tpre[0],Min(tpre[b-1],x[p*n+j]));
+                        sum += rinterpolate_search_axis(search,tpre,b,v);
+                    }
+                    const double dt = rinterpolate_clock() - start;
+                    t = repeat == 0 ? dt : Min(t,dt);
+                    sink += sum;
+                }
+                t /= (double)Max(k,1);
+            }
+
+            if(times != NULL)
+            {
+                times[j*RINTERPOLATE_SEARCH_NUMBER+m] = t;
+            }
+
+            /* binary is first, so it is kept unless another is faster */
+            if(m == RINTERPOLATE_SEARCH_BINARY || t < best[j])
+            {
+                best[j] = t;
+                fastest[j] = m;
+            }
+        }
+    }
+    (void)sink;
+
+    status = rinterpolate_set_search(table,fastest);
+    Rinterpolate_free(methods);
+    Rinterpolate_free(fastest);
+    Rinterpolate_free(best);
+    return status;
+}
@@ -0,0 +1,219 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Interpolate the table at k sets of parameters, x (k*n items),
+ * putting the results in r (k*d items), grouping the sets of
+ * parameters by the cell of the grid they are in.
+ *
+ * Identical sets of parameters are first found with a hash table,
+ * and are interpolated only once. The other sets are searched for
+ * their cell and interpolation factors, then sorted by cell (with a
+ * stable radix sort, so they stay in order within each cell) so that
+ * the hypercube of each cell is constructed only once. Each set in
+ * the cell then only needs its own reduction, which reads the
+ * hypercube rather than a copy of it (see rinterpolate_reduce_from).
+ * A set that is alone in its cell is interpolated as usual.
+ *
+ * The results are exactly those of rinterpolate (the cache is not
+ * used), in the original order. The searching and gathering then
+ * scale with the number of different cells rather than the number
+ * of sets.
+ *
+ * Returns 0, or RINTERPOLATE_CALLOC_FAILED if the work space could
+ * not be allocated (r is then not set).
+ */
+
+/*
+ * A set of parameters: key is its cell, or its hash in the
+ * hash table, and i is the number of the set (plus one in the
+ * hash table, so that 0 is an empty slot).
+ */
+struct rinterpolate_query_t {
+    uint64_t key;
+    size_t i;
+};
+
+/* hash of n parameters */
+static uint64_t hash_parameters(const rinterpolate_float_t * const x,
+                                const rinterpolate_counter_t n)
+{
+    uint64_t h = 0;
+    rinterpolate_counter_t j;
+    for(j=0;j<n;j++)
+    {
+        uint64_t bits;
+        memcpy(&bits,x+j,sizeof(uint64_t));
+        h = (h ^ bits) * UINT64_C(0x9E3779B97F4A7C15);
+    }
+    return h ^ (h >> 32);
+}
+
+/*
+ * Sort the queries by key: a stable least-significant-byte radix
+ * sort, which skips bytes that are the same for all keys.
+ * tmp should have space for k queries.
+ */
+static void sort_queries(struct rinterpolate_query_t * RESTRICT queries,
+                         struct rinterpolate_query_t * RESTRICT tmp,
+                         const size_t k)
+{
+    unsigned int shift;
+    size_t p;
+    for(shift=0;shift<64;shift+=8)
+    {
+        size_t count[257] = {0};
+        for(p=0;p<k;p++)
+        {
+            count[((queries[p].key >> shift) & 0xff) + 1]++;
+        }
+        if(count[((queries[0].key >> shift) & 0xff) + 1] == k)
+        {
+            continue;
+        }
+        for(p=1;p<257;p++)
+        {
+            count[p] += count[p-1];
+        }
+        for(p=0;p<k;p++)
+        {
+            tmp[count[(queries[p].key >> shift) & 0xff]++] = queries[p];
+        }
+        memcpy(queries,tmp,k*sizeof(struct rinterpolate_query_t));
+    }
+}
+
+rinterpolate_counter_t rinterpolate_batch_grouped(struct rinterpolate_table_t * RESTRICT const table,
+                                                  const rinterpolate_float_t * RESTRICT const x,
+                                                  rinterpolate_float_t * RESTRICT const r,
+                                                  const size_t k)
+{
+    struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+    const rinterpolate_counter_t n = table->n;
+    const rinterpolate_counter_t d = table->d;
+    size_t p,q,m,nunique = 0,nslots = 2;
+    rinterpolate_counter_t j;
+
+    while(nslots < 2*k)
+    {
+        nslots *= 2;
+    }
+
+    struct rinterpolate_query_t * const queries =
+        Rinterpolate_malloc(sizeof(struct rinterpolate_query_t) * Max(k,1) * 2);
+    struct rinterpolate_query_t * const slots =
+        Rinterpolate_calloc(nslots,sizeof(struct rinterpolate_query_t));
+    size_t * const first = Rinterpolate_malloc(sizeof(size_t) * Max(k,1));
+    rinterpolate_float_t * const f =
+        Rinterpolate_malloc(table->n_float_sizeof * Max(k,1));
+    rinterpolate_float_t * const work =
+        Rinterpolate_malloc(table->d_float_sizeof * Max(table->hypertable_length/2,1));
+
+    if(unlikely(queries == NULL || slots == NULL || first == NULL ||
+                f == NULL || work == NULL))
+    {
+        Rinterpolate_free(queries);
+        Rinterpolate_free(slots);
+        Rinterpolate_free(first);
+        Rinterpolate_free(f);
+        Rinterpolate_free(work);
+        return RINTERPOLATE_CALLOC_FAILED;
+    }
+
+    /*
+     * Find the first set identical to each set, and the cell (its
+     * lowest node) and factors of each set that is the first
+     */
+    for(p=0;p<k;p++)
+    {
+        const rinterpolate_float_t * const xp = x + p*n;
+        const uint64_t h = hash_parameters(xp,n);
+        size_t s = (size_t)h & (nslots - 1);
+
+        first[p] = p;
+        while(slots[s].i != 0)
+        {
+            if(slots[s].key == h &&
+               memcmp(x + (slots[s].i-1)*n,xp,table->n_float_sizeof) == 0)
+            {
+                first[p] = slots[s].i - 1;
+                break;
+            }
+            s = (s + 1) & (nslots - 1);
+        }
+
+        if(first[p] == p)
+        {
+            rinterpolate_counter_t cell = 0;
+            slots[s].key = h;
+            slots[s].i = p + 1;
+
+            rinterpolate_search_brackets(table,xp);
+            for(j=0;j<n;j++)
+            {
+                cell += hypertable->index[j] * table->steps[j];
+            }
+            memcpy(f + p*n,hypertable->f,table->n_float_sizeof);
+            queries[nunique].key = cell;
+            queries[nunique].i = p;
+            nunique++;
+        }
+    }
+    Rinterpolate_free(slots);
+
+    if(nunique > 0)
+    {
+        sort_queries(queries,queries + nunique,nunique);
+    }
+
+    for(p=0;p<nunique;p=q)
+    {
+        /* the sets [p,q) are in the same cell */
+        q = p + 1;
+        while(q < nunique && queries[q].key == queries[p].key)
+        {
+            q++;
+        }
+
+        if(q == p + 1)
+        {
+            rinterpolate_evaluate(table,x + queries[p].i*n,r + queries[p].i*d);
+        }
+        else
+        {
+            /*
+             * Construct the whole hypercube of the cell, then
+             * reduce it for each set
+             */
+            rinterpolate_search_table(table,x + queries[p].i*n);
+            rinterpolate_construct_hypercube(table);
+
+            for(m=p;m<q;m++)
+            {
+                rinterpolate_reduce_from(hypertable->data + n,
+                                         f + queries[m].i*n,
+                                         n,
+                                         table->line_length,
+                                         d,
+                                         work,
+                                         r + queries[m].i*d);
+            }
+        }
+    }
+
+    /* copy the results of the identical sets */
+    for(p=0;p<k;p++)
+    {
+        if(first[p] != p)
+        {
+            memcpy(r + p*d,r + first[p]*d,table->d_float_sizeof);
+        }
+    }
+
+    Rinterpolate_free(queries);
+    Rinterpolate_free(first);
+    Rinterpolate_free(f);
+    Rinterpolate_free(work);
+
+    return 0;
+}
@@ -0,0 +1,57 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Check that nnew lines, which are not (yet) part of the table,
+ * could be appended to it by rinterpolate_append_lines: that they
+ * are whole slices of the grid along the first (slowest varying)
+ * parameter, i.e. blocks of steps[0] lines with the same grid on
+ * the other parameters as the last slice of the table, and
+ * increasing values of the first parameter.
+ *
+ * Each line is compared with the line one slice back, in the table
+ * or among the new lines, so nothing is changed and the check can
+ * be made before the table memory is grown.
+ *
+ * Returns RINTERPOLATE_NO_ERROR, or RINTERPOLATE_APPEND_MISMATCH if
+ * the lines cannot be appended (always for a ragged table).
+ */
+
+rinterpolate_counter_t rinterpolate_check_append(const struct rinterpolate_table_t * RESTRICT const table,
+                                                 const rinterpolate_float_t * const lines,
+                                                 const rinterpolate_counter_t nnew)
+{
+    const rinterpolate_counter_t slice = table->steps[0];
+    const size_t line_length = table->line_length;
+    rinterpolate_counter_t i,j;
+
+    if(table->mask != NULL ||
+       nnew % slice != 0)
+    {
+        return RINTERPOLATE_APPEND_MISMATCH;
+    }
+
+    for(i=0;i<nnew;i++)
+    {
+        const rinterpolate_float_t * const line = lines + (size_t)i*line_length;
+        const rinterpolate_float_t * const prev = i < slice ?
+            table->data + ((size_t)table->l - slice + i)*line_length :
+            line - (size_t)slice*line_length;
+
+        if(i % slice == 0 ?
+           !(line[0] > prev[0]) :
+           !Fequal(line[0], (line - line_length)[0]))
+        {
+            return RINTERPOLATE_APPEND_MISMATCH;
+        }
+        for(j=1;j<table->n;j++)
+        {
+            if(!Fequal(line[j],prev[j]))
+            {
+                return RINTERPOLATE_APPEND_MISMATCH;
+            }
+        }
+    }
+
+    return RINTERPOLATE_NO_ERROR;
+}
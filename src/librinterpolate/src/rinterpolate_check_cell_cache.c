@@ -0,0 +1,64 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+
+/*
+ * Check whether x is in one of the cells in the cell cache of
+ * the table (see rinterpolate_store_cell_cache). If it is, the
+ * interpolation factors are calculated as in
+ * rinterpolate_search_brackets and the stored hypercube is reduced
+ * with them (without being overwritten), putting the result in r,
+ * which is exactly that of rinterpolate, and TRUE is returned.
+ *
+ * The search starts at the cell of the last match.
+ */
+
+rinterpolate_Boolean_t rinterpolate_check_cell_cache(struct rinterpolate_table_t * RESTRICT const table,
+                                                     const rinterpolate_float_t * RESTRICT const x,
+                                                     rinterpolate_float_t * RESTRICT const r)
+{
+    const rinterpolate_counter_t n = table->n;
+    rinterpolate_float_t * RESTRICT const f = table->hypertable->f;
+    rinterpolate_counter_t iloop;
+
+    for(iloop=0;iloop<table->cell_cache_used;iloop++)
+    {
+        const rinterpolate_counter_t iline =
+            (table->cell_cache_match_line + iloop) % table->cell_cache_used;
+        const rinterpolate_float_t * const line = Rinterpolate_cell_cache_line(iline);
+        const rinterpolate_float_t * const lower = line;
+        const rinterpolate_float_t * const upper = line + n;
+        const rinterpolate_float_t * const above = line + 2*n;
+        const rinterpolate_float_t * const below = line + 3*n;
+        rinterpolate_counter_t j;
+
+        for(j=0;j<n;j++)
+        {
+            if(!(x[j] > above[j] && x[j] <= below[j]))
+            {
+                break;
+            }
+            else
+            {
+                const rinterpolate_float_t v = Max(lower[j],Min(upper[j],x[j]));
+                f[j] = upper[j] > lower[j] ? (v - lower[j])/(upper[j] - lower[j]) : 0.0;
+            }
+        }
+
+        if(j == n)
+        {
+            rinterpolate_reduce_from(line + 4*n,
+                                     f,
+                                     n,
+                                     table->d,
+                                     table->d,
+                                     table->cell_cache_work,
+                                     r);
+            table->cell_cache_match_line = iline;
+            return TRUE;
+        }
+    }
+    return FALSE;
+}
+#endif // RINTERPOLATE_CACHE
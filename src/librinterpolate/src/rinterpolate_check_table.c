@@ -0,0 +1,89 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Check that the lines start to end-1 of a table are on the regular
+ * grid described by its steps and varcount, i.e. that parameter j of
+ * line i is the ((i/steps[j]) % varcount[j])th grid value of that
+ * parameter, and that the grid values increase along each axis.
+ *
+ * Only lines in the range are read, so the table can be checked in
+ * parallel by calling this for separate ranges, and the global checks
+ * (increasing grid values, the number of nodes) are done by the call
+ * with start = 0.
+ *
+ * Returns RINTERPOLATE_NO_ERROR, RINTERPOLATE_TABLE_NOT_SORTED if the
+ * grid values of an axis do not increase, or RINTERPOLATE_TABLE_NOT_REGULAR
+ * if a line is not on the grid (or the grid does not have l nodes), in
+ * which case *bad_line is set to the line (or l).
+ *
+ * Ragged tables are checked when they are set up, see
+ * rinterpolate_make_ragged, so are not checked here.
+ */
+
+rinterpolate_counter_t rinterpolate_check_table(const struct rinterpolate_table_t * RESTRICT const table,
+                                               const rinterpolate_counter_t start,
+                                               const rinterpolate_counter_t end,
+                                               rinterpolate_counter_t * RESTRICT const bad_line)
+{
+    const size_t line_length = table->line_length;
+    rinterpolate_counter_t i,j;
+
+    if(table->mask != NULL)
+    {
+        return RINTERPOLATE_NO_ERROR;
+    }
+
+    if(start == 0)
+    {
+        size_t nnodes = 1;
+        for(j=0;j<table->n;j++)
+        {
+            const size_t stride = (size_t)table->steps[j] * line_length;
+            for(i=1;i<table->varcount[j];i++)
+            {
+                if(!(table->data[i*stride + j] > table->data[(i-1)*stride + j]))
+                {
+                    *bad_line = i*table->steps[j];
+                    return RINTERPOLATE_TABLE_NOT_SORTED;
+                }
+            }
+            nnodes *= table->varcount[j];
+        }
+        if(nnodes != table->l)
+        {
+            *bad_line = table->l;
+            return RINTERPOLATE_TABLE_NOT_REGULAR;
+        }
+    }
+
+    for(j=0;j<table->n;j++)
+    {
+        /*
+         * Loop over the lines in runs of constant grid value,
+         * which are steps[j] lines long
+         */
+        const rinterpolate_counter_t step = table->steps[j];
+        const size_t stride = (size_t)step * line_length;
+        i = start;
+        while(i < end)
+        {
+            const rinterpolate_counter_t node = (i / step) % table->varcount[j];
+            const rinterpolate_float_t value = table->data[node*stride + j];
+            const rinterpolate_counter_t run_end = Min(end, (i / step + 1) * step);
+            const rinterpolate_float_t * p = table->data + (size_t)i*line_length + j;
+
+            for(;i<run_end;i++)
+            {
+                if(!Fequal(*p,value))
+                {
+                    *bad_line = i;
+                    return RINTERPOLATE_TABLE_NOT_REGULAR;
+                }
+                p += line_length;
+            }
+        }
+    }
+
+    return RINTERPOLATE_NO_ERROR;
+}
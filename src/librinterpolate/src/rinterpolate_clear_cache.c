@@ -0,0 +1,27 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+/*
+ * Clear the cache of results, and the cell cache, of the table,
+ * e.g. because its data have changed, so that stale results
+ * cannot be matched.
+ */
+
+void rinterpolate_clear_cache(struct rinterpolate_table_t * RESTRICT const table)
+{
+    if(table->cache != NULL)
+    {
+        size_t i;
+        for(i=0;i<(size_t)table->line_length*table->cache_length;i++)
+        {
+            table->cache[i] = NAN;
+        }
+    }
+    table->cache_spin_line = -1;
+    table->cache_match_line = 0;
+    table->cell_cache_used = 0;
+    table->cell_cache_next = 0;
+    table->cell_cache_match_line = 0;
+}
+#endif // RINTERPOLATE_CACHE
@@ -0,0 +1,15 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+#include <time.h>
+
+/*
+ * Return a monotonic time in nanoseconds, used to time the
+ * cache in automatic mode (see rinterpolate_adapt_cache).
+ */
+
+double rinterpolate_clock(void)
+{
+    struct timespec t;
+    clock_gettime(CLOCK_MONOTONIC,&t);
+    return 1e9 * (double)t.tv_sec + (double)t.tv_nsec;
+}
@@ -8,10 +8,59 @@ void rinterpolate_construct_hypercube(struct rinterpolate_table_t * RESTRICT con
      */
 
     struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+    const rinterpolate_float_t * const data = table->data;
 
-    /* easily vectorized loop */
     rinterpolate_counter_t i;
-    for(i=0;i<table->hypertable_length;i++)
+
+    /* the number of lines, 2^n or fewer if the search was pruned */
+    const rinterpolate_counter_t length = hypertable->active_length;
+
+    if(table->mask != NULL)
+    {
+        /*
+         * Ragged table: sum contains nodes of the full grid, which
+         * we have to look up in the mask. Missing nodes are set to NaN.
+         */
+        for(i=0;i<length;i++)
+        {
+            const rinterpolate_signed_counter_t line =
+                rinterpolate_ragged_line(table,hypertable->sum[i]);
+            rinterpolate_float_t * const p = hypertable->data + i*table->line_length;
+            if(likely(line >= 0))
+            {
+                memcpy(p,
+                       table->data + (size_t)line*table->line_length,
+                       table->line_length_sizeof);
+            }
+            else
+            {
+                rinterpolate_counter_t j;
+                for(j=0;j<table->line_length;j++)
+                {
+                    p[j] = NAN;
+                }
+            }
+        }
+        return;
+    }
+
+    if(table->layout_data != NULL)
+    {
+        /*
+         * The tiled copy only has the data of each line, which is
+         * all the reduction reads: map row-major line numbers to it
+         */
+        for(i=0;i<length;i++)
+        {
+            memcpy(hypertable->data + (size_t)i*table->line_length + table->n,
+                   table->layout_data + rinterpolate_tiled_line(table,hypertable->sum[i]) * table->d,
+                   table->d_float_sizeof);
+        }
+        return;
+    }
+
+    /* easily vectorized loop */
+    for(i=0;i<length;i++)
     {
         Rinterpolate_print("SUM %u was %u now ",i,hypertable->sum[i]);
         hypertable->sum[i] *= table->line_length;
@@ -19,7 +68,7 @@ void rinterpolate_construct_hypercube(struct rinterpolate_table_t * RESTRICT con
     }
 
     rinterpolate_counter_t k = 0;
-    for(i=0;i<table->hypertable_length;i++)
+    for(i=0;i<length;i++)
     {
 #ifdef RINTERPOLATE_DEBUG
         if(rinterpolate_debug==TRUE)
@@ -36,7 +85,7 @@ void rinterpolate_construct_hypercube(struct rinterpolate_table_t * RESTRICT con
 #endif//RINTERPOLATE_DEBUG
 
         memcpy(hypertable->data + k,
-               table->data + hypertable->sum[i],
+               data + hypertable->sum[i],
                table->line_length_sizeof);
 
         k += table->line_length;
@@ -54,7 +103,7 @@ void rinterpolate_construct_hypercube(struct rinterpolate_table_t * RESTRICT con
             {
                 Rinterpolate_print("% 3.3e ",*(hypertable->data+i*table->line_length+j));FLUSH;
             }
-            Rinterpolate_print(" %u/%u\n",i,table->hypertable_length-1);FLUSH;
+            Rinterpolate_print(" %u/%u\n",i,length-1);FLUSH;
         }
 #endif
 
@@ -65,7 +114,7 @@ void rinterpolate_construct_hypercube(struct rinterpolate_table_t * RESTRICT con
         Rinterpolate_print("done hypertable\n");
         Rinterpolate_print("Interpolation (f) factors: ");
         rinterpolate_counter_t j;
-        for(j=0;j<table->n;j++)
+        for(j=0;j<hypertable->n_active;j++)
         {
             Rinterpolate_print("% 3.3e ",hypertable->f[j]);
         }
@@ -0,0 +1,32 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Return the number of bytes allocated by librinterpolate
+ * for the dataspace and all the tables in it.
+ */
+
+size_t rinterpolate_dataspace_memory(const struct rinterpolate_data_t * RESTRICT const rinterpolate_data)
+{
+    size_t bytes = 0;
+    if(rinterpolate_data != NULL)
+    {
+        rinterpolate_counter_t i;
+        struct rinterpolate_memory_t memory;
+        bytes = sizeof(struct rinterpolate_data_t) +
+            rinterpolate_data->number_of_interpolation_tables * sizeof(struct rinterpolate_table_t *);
+        for(i=0;i<rinterpolate_data->number_of_interpolation_tables;i++)
+        {
+            rinterpolate_table_memory(rinterpolate_data->tables[i],&memory);
+            bytes +=
+                memory.table +
+                memory.cache +
+                memory.cell_cache +
+                memory.presearch +
+                memory.hypertable +
+                memory.layout +
+                memory.mask;
+        }
+    }
+    return bytes;
+}
@@ -0,0 +1,76 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Interpolate the table at x, without the cache: search the
+ * table, construct the hypercube and reduce it, putting the
+ * result in r.
+ *
+ * This is the work done by rinterpolate when the result is not
+ * in the cache.
+ */
+
+void rinterpolate_evaluate(struct rinterpolate_table_t * RESTRICT const table,
+                           const rinterpolate_float_t * RESTRICT const x,
+                           rinterpolate_float_t * RESTRICT const r)
+{
+    /*
+     * First, search the table to find the spanning indices,
+     * leaving out the axes on which x is on a node.
+     */
+    rinterpolate_search_pruned(table,x);
+
+#ifdef RINTERPOLATE_DEBUG
+    if(rinterpolate_debug==TRUE)
+    {
+        rinterpolate_counter_t j;
+        Rinterpolate_print("Parameter (x) values: ");
+        for(j=0;j<table->n;j++)
+        {
+            Rinterpolate_print("% 3.3e ",x[j]);
+        }
+        Rinterpolate_print("\n");
+
+        Rinterpolate_print("Interpolation (f) factors: ");
+        for(j=0;j<table->hypertable->n_active;j++)
+        {
+            Rinterpolate_print("% 3.3e ",table->hypertable->f[j]);
+        }
+        Rinterpolate_print("\n");
+        Rinterpolate_print("Interpolation hypertable:\n");
+    }
+#endif
+
+    if(table->hypertable->n_active == 0)
+    {
+        /*
+         * x is on a node of the grid: return its data
+         */
+        const rinterpolate_float_t * const node_data =
+            rinterpolate_node_data(table,table->hypertable->sum[0]);
+        if(likely(node_data != NULL))
+        {
+            memcpy(r,node_data,table->d_float_sizeof);
+        }
+        else
+        {
+            rinterpolate_counter_t j;
+            for(j=0;j<table->d;j++)
+            {
+                r[j] = NAN;
+            }
+        }
+    }
+    else
+    {
+        /*
+         * construct hypercube
+         */
+        rinterpolate_construct_hypercube(table);
+
+        /*
+         * Do interpolation on hypercube
+         */
+        rinterpolate_interpolate(table,x,r);
+    }
+}
@@ -0,0 +1,76 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+/*
+ * Return the table struct for the given data table, adding a new
+ * table to the rinterpolate data structure if it is not there yet.
+ *
+ * The cache is resized if cache_length has changed. With cache_length
+ * RINTERPOLATE_CACHE_AUTO it is sized automatically (see
+ * rinterpolate_adapt_cache).
+ */
+
+struct rinterpolate_table_t * rinterpolate_find_table(
+    struct rinterpolate_data_t * RESTRICT const rinterpolate_data,
+    const rinterpolate_float_t * RESTRICT const datatable,
+    const rinterpolate_counter_t n,
+    const rinterpolate_counter_t d,
+    const rinterpolate_counter_t l,
+    const rinterpolate_counter_t cache_length
+    )
+{
+    /*
+     * Get the table id
+     */
+    rinterpolate_signed_counter_t table_id =
+        rinterpolate_id_table(rinterpolate_data,
+                              datatable);
+
+    Rinterpolate_print("Table ID %d\n",table_id);
+
+    if(table_id == -1)
+    {
+        /*
+         * Table not found, so add a new table
+         */
+        table_id = rinterpolate_add_new_table(rinterpolate_data,
+                                              datatable,
+                                              n,
+                                              d,
+                                              l,
+                                              cache_length == RINTERPOLATE_CACHE_AUTO ? 0 : cache_length);
+        Rinterpolate_print("New table ID %d\n",table_id);
+    }
+
+    /*
+     * Pointer to the table
+     */
+    struct rinterpolate_table_t * RESTRICT table =
+        rinterpolate_data->tables[table_id];
+
+#ifdef RINTERPOLATE_CACHE
+    /*
+     * Check for a change to or from automatic sizing,
+     * or a cache resize
+     */
+    if(cache_length == RINTERPOLATE_CACHE_AUTO)
+    {
+        if(unlikely(table->cache_stats == NULL))
+        {
+            rinterpolate_set_cache_auto(table,TRUE);
+        }
+    }
+    else
+    {
+        if(unlikely(table->cache_stats != NULL))
+        {
+            rinterpolate_set_cache_auto(table,FALSE);
+        }
+        if(cache_length != table->cache_length)
+        {
+            rinterpolate_resize_cache(table,cache_length);
+        }
+    }
+#endif // RINTERPOLATE_CACHE
+
+    return table;
+}
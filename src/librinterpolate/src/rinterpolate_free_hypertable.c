@@ -9,4 +9,5 @@ void rinterpolate_free_hypertable(struct rinterpolate_hypertable_t * RESTRICT hy
     Safe_free(hypertable->data);
     Safe_free(hypertable->f);
     Safe_free(hypertable->sum);
+    Safe_free(hypertable->index);
 }
@@ -0,0 +1,37 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+/*
+ * rinterpolate_free_table
+ *
+ * Given a table struct, free everything in it (but not the struct itself).
+ */
+
+void rinterpolate_free_table(struct rinterpolate_table_t * const table)
+{
+#ifdef RINTERPOLATE_CACHE
+    Safe_free(table->cache);
+    Safe_free(table->cache_stats);
+    Safe_free(table->cell_cache);
+    Safe_free(table->cell_cache_work);
+    Safe_free(table->cache_quantum);
+    Safe_free(table->cache_round_bits);
+    Safe_free(table->cache_x);
+#endif//RINTERPOLATE_CACHE
+#ifdef RINTERPOLATE_PRESEARCH
+    rinterpolate_counter_t j;
+    for(j=0;j<table->presearch_n;j++)
+    {
+        Safe_free(table->presearch[j]);
+    }
+    Safe_free(table->presearch);
+    rinterpolate_set_search(table,NULL);
+#endif//RINTERPOLATE_PRESEARCH
+    Safe_free(table->layout_data);
+    Safe_free(table->mask);
+    Safe_free(table->mask_rank);
+    Safe_free(table->categorical);
+    Safe_free(table->steps);
+    Safe_free(table->varcount);
+    rinterpolate_free_hypertable(table->hypertable);
+    Safe_free(table->hypertable);
+}
@@ -0,0 +1,75 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Interpolate several data blocks that share the parameter grid
+ * of table, searching the grid only once.
+ *
+ * table is usually a table with only the parameter columns (d=0).
+ * blocks[b] is a row-major table of data only, with block_d[b]
+ * items per line, of which line i belongs to node i of the grid
+ * (or to line i of a ragged table). The result for block b is put
+ * in r[b].
+ *
+ * scratch should have space for hypertable_length * max(block_d)
+ * floats, it is used to gather the hypercube of each block.
+ */
+
+void rinterpolate_fused(struct rinterpolate_table_t * RESTRICT const table,
+                        const rinterpolate_float_t * RESTRICT const x,
+                        const rinterpolate_counter_t nblocks,
+                        const rinterpolate_float_t * const * const blocks,
+                        const rinterpolate_counter_t * RESTRICT const block_d,
+                        rinterpolate_float_t * const * const r,
+                        rinterpolate_float_t * RESTRICT const scratch)
+{
+    const struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+    rinterpolate_counter_t b,i,j;
+
+    /*
+     * Search once: this sets the line numbers of the
+     * hypercube (sum) and the interpolation factors (f)
+     */
+    rinterpolate_search_table(table,x);
+
+    for(b=0;b<nblocks;b++)
+    {
+        const rinterpolate_counter_t d = block_d[b];
+        const size_t d_float_sizeof = sizeof(rinterpolate_float_t) * d;
+
+        /*
+         * Gather the hypercube of this block
+         */
+        for(i=0;i<table->hypertable_length;i++)
+        {
+            const rinterpolate_signed_counter_t line =
+                table->mask != NULL ?
+                rinterpolate_ragged_line(table,hypertable->sum[i]) :
+                (rinterpolate_signed_counter_t)hypertable->sum[i];
+
+            if(likely(line >= 0))
+            {
+                memcpy(scratch + i*d,
+                       blocks[b] + (size_t)line*d,
+                       d_float_sizeof);
+            }
+            else
+            {
+                for(j=0;j<d;j++)
+                {
+                    scratch[i*d + j] = NAN;
+                }
+            }
+        }
+
+        /*
+         * And reduce it
+         */
+        rinterpolate_reduce(scratch,
+                            hypertable->f,
+                            table->n,
+                            d,
+                            d,
+                            r[b]);
+    }
+}
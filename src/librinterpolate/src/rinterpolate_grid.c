@@ -0,0 +1,225 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Interpolate the table on the Cartesian product of the query
+ * axes: axes[j] holds the k[j] values of parameter j, and r is set
+ * to the prod(k[j])*d results, in row-major order (the last
+ * parameter varying fastest, then the data items).
+ *
+ * Multilinear interpolation is separable, so rather than search
+ * and reduce a hypercube for each of the prod(k[j]) points, each
+ * query axis is searched once, then the grid of data is contracted
+ * along one parameter at a time: along parameter j, every point of
+ * the grid of the results so far (k[0]..k[j-1] by the table's
+ * varcount[j]..varcount[n-1]) is replaced by the k[j] blends of the
+ * pair of grid values around each axes[j] value. This is done in
+ * the order of rinterpolate_reduce, with the same kernel and
+ * rounding of the factors, so the results are exactly those of
+ * rinterpolate at each point.
+ *
+ * The search is done by rinterpolate_search_brackets, on all the
+ * parameters at once, max(k[j]) times. On a ragged table, points
+ * that need a missing node are NaN.
+ *
+ * Returns 0, or RINTERPOLATE_CALLOC_FAILED if the work space could
+ * not be allocated (r is then not set).
+ */
+
+/*
+ * r = the blend of a and b with the factor f of the pair they are
+ * on, rounded as in rinterpolate_reduce, for count items
+ */
+static void blend_pair(rinterpolate_float_t * RESTRICT const r,
+                       const rinterpolate_float_t * RESTRICT const a,
+                       const rinterpolate_float_t * RESTRICT const b,
+                       const size_t count,
+                       const rinterpolate_float_t f)
+{
+    size_t done = 0;
+    if(!(f>TINY))
+    {
+        memcpy(r,a,count*sizeof(rinterpolate_float_t));
+    }
+    else if(f+TINY>1.0)
+    {
+        memcpy(r,b,count*sizeof(rinterpolate_float_t));
+    }
+    else
+    {
+        while(done < count)
+        {
+            const rinterpolate_counter_t chunk =
+                (rinterpolate_counter_t) Min(count - done,(size_t)1<<30);
+            rinterpolate_simd.blend(r + done,a + done,b + done,chunk,1.0 - f,f);
+            done += chunk;
+        }
+    }
+}
+
+rinterpolate_counter_t rinterpolate_grid(struct rinterpolate_table_t * RESTRICT const table,
+                                         const rinterpolate_float_t * const * const axes,
+                                         const rinterpolate_counter_t * RESTRICT const k,
+                                         rinterpolate_float_t * RESTRICT const r)
+{
+    const rinterpolate_counter_t n = table->n;
+    const rinterpolate_counter_t d = table->d;
+    const struct rinterpolate_hypertable_t * const hypertable = table->hypertable;
+    rinterpolate_counter_t j,q,kmax = 0,ktotal = 0;
+    size_t outer,inner,m,size,largest;
+
+    for(j=0;j<n;j++)
+    {
+        if(k[j] == 0)
+        {
+            return 0;
+        }
+        kmax = Max(kmax,k[j]);
+        ktotal += k[j];
+    }
+
+    /*
+     * The largest of the grids between the contractions: after
+     * contracting along j it has k[0]..k[j] points by
+     * varcount[j+1]..varcount[n-1]
+     */
+    largest = 0;
+    for(j=0;j<n;j++)
+    {
+        size = d;
+        for(q=0;q<n;q++)
+        {
+            size *= q<=j ? k[q] : Max(table->varcount[q],1);
+        }
+        largest = Max(largest,size);
+    }
+
+    rinterpolate_counter_t * const index =
+        Rinterpolate_malloc(sizeof(rinterpolate_counter_t) * Max(ktotal,1));
+    rinterpolate_float_t * const f =
+        Rinterpolate_malloc(sizeof(rinterpolate_float_t) * Max(ktotal,1));
+    rinterpolate_float_t * const x =
+        Rinterpolate_malloc(table->n_float_sizeof + sizeof(rinterpolate_float_t));
+    rinterpolate_float_t * const work =
+        n > 1 ? Rinterpolate_malloc(sizeof(rinterpolate_float_t) * 2 * largest) : NULL;
+
+    if(unlikely(index == NULL || f == NULL || x == NULL ||
+                (n > 1 && work == NULL)))
+    {
+        Rinterpolate_free(index);
+        Rinterpolate_free(f);
+        Rinterpolate_free(x);
+        Rinterpolate_free(work);
+        return RINTERPOLATE_CALLOC_FAILED;
+    }
+
+    /*
+     * Search the query axes: the values of axis j start at
+     * offset[j] = k[0] + ... + k[j-1] in index and f
+     */
+    for(q=0;q<kmax;q++)
+    {
+        rinterpolate_counter_t offset = 0;
+        for(j=0;j<n;j++)
+        {
+            x[j] = axes[j][Min(q,k[j]-1)];
+        }
+        rinterpolate_search_brackets(table,x);
+        for(j=0;j<n;j++)
+        {
+            if(q < k[j])
+            {
+                index[offset + q] = hypertable->index[j];
+                f[offset + q] = hypertable->f[j];
+            }
+            offset += k[j];
+        }
+    }
+
+    /*
+     * Contract the table along parameter 0: each of its k[0]
+     * values blends two slices of lines of the table
+     */
+    {
+        rinterpolate_float_t * const out = n > 1 ? work : r;
+        rinterpolate_counter_t step = 1;
+        for(j=1;j<n;j++)
+        {
+            step *= Max(table->varcount[j],1);
+        }
+        for(q=0;q<k[0];q++)
+        {
+            const rinterpolate_counter_t a = index[q] * step;
+            const rinterpolate_counter_t b = f[q] > TINY ? a + step : a;
+            for(m=0;m<step;m++)
+            {
+                const rinterpolate_float_t * const la = rinterpolate_node_data(table,a + m);
+                const rinterpolate_float_t * const lb = rinterpolate_node_data(table,b + m);
+                rinterpolate_float_t * const o = out + ((size_t)q*step + m)*d;
+                /* only the nodes with a weight are needed */
+                if(likely((la != NULL || f[q]+TINY > 1.0) &&
+                          (lb != NULL || !(f[q] > TINY))))
+                {
+                    blend_pair(o,
+                               la,
+                               lb,
+                               d,
+                               f[q]);
+                }
+                else
+                {
+                    rinterpolate_counter_t i;
+                    for(i=0;i<d;i++)
+                    {
+                        o[i] = NAN;
+                    }
+                }
+            }
+        }
+    }
+
+    /*
+     * Contract along the other parameters, between the two halves
+     * of work, the last straight into r
+     */
+    outer = k[0];
+    inner = d;
+    for(j=1;j<n;j++)
+    {
+        inner *= Max(table->varcount[j],1);
+    }
+    {
+        rinterpolate_counter_t offset = k[0];
+        for(j=1;j<n;j++)
+        {
+            const rinterpolate_float_t * const in = work + ((j-1)%2) * largest;
+            rinterpolate_float_t * const out = j == n-1 ? r : work + (j%2) * largest;
+            const size_t slab = inner / Max(table->varcount[j],1);
+            size_t o;
+
+            for(o=0;o<outer;o++)
+            {
+                const rinterpolate_float_t * const from = in + o*inner;
+                for(q=0;q<k[j];q++)
+                {
+                    const size_t a = index[offset + q] * slab;
+                    const size_t b = f[offset + q] > TINY ? a + slab : a;
+                    blend_pair(out + (o*k[j] + q)*slab,
+                               from + a,
+                               from + b,
+                               slab,
+                               f[offset + q]);
+                }
+            }
+            outer *= k[j];
+            inner = slab;
+            offset += k[j];
+        }
+    }
+
+    Rinterpolate_free(index);
+    Rinterpolate_free(f);
+    Rinterpolate_free(x);
+    Rinterpolate_free(work);
+    return 0;
+}
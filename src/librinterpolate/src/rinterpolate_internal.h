@@ -47,6 +47,19 @@
             (unlikely(More_than(_x,_b)) ? _b : _x);     \
     })
 
+/* number of bits set in a 64-bit word */
+#ifdef __GNUC__
+#define Popcount64(A) ((rinterpolate_counter_t)__builtin_popcountll(A))
+#else
+#define Popcount64(A) __extension__                     \
+    ({                                                  \
+        uint64_t _w = (A);                              \
+        rinterpolate_counter_t _c = 0;                  \
+        while(_w) { _w &= _w - 1; _c++; }               \
+        _c;                                             \
+    })
+#endif
+
 #ifndef Is_zero
 #define Is_zero(A) (fabs((A))<TINY)
 #endif
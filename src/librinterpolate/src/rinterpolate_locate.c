@@ -0,0 +1,50 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Locate x in the table: set corners to the lines of the table at
+ * the 2^n corners of the hypercube around x, and weights to the
+ * weight of each corner in the multilinear interpolation, such that
+ *
+ * r[i] = sum_c weights[c] * data[corners[c]][i]
+ *
+ * Missing corners of a ragged table are set to -1.
+ *
+ * Interpolation factors within TINY of 0 or 1 are rounded as they
+ * are in rinterpolate_reduce, so corners that are not used there have
+ * zero weight.
+ */
+
+void rinterpolate_locate(struct rinterpolate_table_t * RESTRICT const table,
+                         const rinterpolate_float_t * RESTRICT const x,
+                         int64_t * RESTRICT const corners,
+                         rinterpolate_float_t * RESTRICT const weights)
+{
+    const struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+    rinterpolate_counter_t i,j;
+
+    rinterpolate_search_table(table,x);
+
+    for(i=0;i<table->hypertable_length;i++)
+    {
+        corners[i] =
+            table->mask != NULL ?
+            (int64_t)rinterpolate_ragged_line(table,hypertable->sum[i]) :
+            (int64_t)hypertable->sum[i];
+        weights[i] = 1.0;
+    }
+
+    for(j=0;j<table->n;j++)
+    {
+        const rinterpolate_float_t f = hypertable->f[j];
+        const rinterpolate_float_t v =
+            f>TINY ? (f+TINY>1.0 ? 1.0 : f) : 0.0;
+        const rinterpolate_float_t u = 1.0 - v;
+        const rinterpolate_counter_t c = Intger_power_of_two(table->n-1-j);
+
+        for(i=0;i<table->hypertable_length;i++)
+        {
+            weights[i] *= (i&c)==0 ? u : v;
+        }
+    }
+}
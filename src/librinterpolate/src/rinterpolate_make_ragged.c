@@ -0,0 +1,168 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Set up a table as a ragged table: a table in which only the
+ * nodes of the parameter grid that exist are stored.
+ *
+ * The lines of the table should still be sorted in the same order
+ * as a full table, e.g.
+ *
+ * 0.1 -100 10 ...data...
+ * 0.1 -100 25 ...data...
+ * 0.1  -50 25 ...data...
+ * 0.3 -100 10 ...data...
+ * 0.3  -50 10 ...data...
+ * 0.3  -50 25 ...data...
+ *
+ * in which the nodes (0.1,-50,10) and (0.3,-100,25) are missing.
+ *
+ * The grid values of each parameter (presearch), varcount and steps
+ * are those of the full grid, so rinterpolate_search_table is
+ * unchanged. Which nodes are present is stored in a bit mask with
+ * one bit per node of the full grid, and the number of bits set before
+ * each 64-bit word of the mask, from which rinterpolate_ragged_line
+ * finds the line of a node in O(1).
+ *
+ * The memory used is about 0.19 bytes per node of the full grid,
+ * cf. line_length*8 bytes for each dummy line of a padded table.
+ *
+ * Returns RINTERPOLATE_NO_ERROR, RINTERPOLATE_TABLE_NOT_SORTED if the
+ * lines are not sorted (or a node appears twice), or
+ * RINTERPOLATE_TABLE_TOO_LARGE if the full grid has too many nodes to
+ * be counted.
+ */
+
+static int compare_floats(const void * a, const void * b);
+
+rinterpolate_counter_t rinterpolate_make_ragged(struct rinterpolate_table_t * RESTRICT const table)
+{
+    rinterpolate_counter_t i,j;
+    rinterpolate_float_t * column =
+        Rinterpolate_malloc(sizeof(rinterpolate_float_t) * Max(table->l,1));
+
+#ifdef RINTERPOLATE_ALLOC_CHECKS
+    if(unlikely(column==NULL))
+    {
+        rinterpolate_error(RINTERPOLATE_CALLOC_FAILED,
+                           "Failed to alloc column in rinterpolate_make_ragged\n",
+                           table->parent);
+    }
+#endif
+
+    /*
+     * Find the (unique, sorted) grid values of each parameter
+     */
+    for(j=0;j<table->n;j++)
+    {
+        for(i=0;i<table->l;i++)
+        {
+            column[i] = table->data[(size_t)i*table->line_length + j];
+        }
+        qsort(column,table->l,sizeof(rinterpolate_float_t),compare_floats);
+
+        rinterpolate_counter_t count = 0;
+        for(i=0;i<table->l;i++)
+        {
+            if(count==0 || !Fequal(column[i],column[count-1]))
+            {
+                column[count++] = column[i];
+            }
+        }
+
+        table->varcount[j] = count;
+        table->presearch[j] =
+            Rinterpolate_realloc(table->presearch[j],
+                                 sizeof(rinterpolate_float_t) * count);
+#ifdef RINTERPOLATE_ALLOC_CHECKS
+        if(unlikely(table->presearch[j]==NULL))
+        {
+            rinterpolate_error(RINTERPOLATE_CALLOC_FAILED,
+                               "Failed to alloc presearch in rinterpolate_make_ragged\n",
+                               table->parent);
+        }
+#endif
+        memcpy(table->presearch[j],column,sizeof(rinterpolate_float_t) * count);
+    }
+    Safe_free(column);
+
+    /*
+     * Steps of the full grid
+     */
+    double nnodes = 1.0;
+    for(j=table->n;j-->0;)
+    {
+        table->steps[j] = (rinterpolate_counter_t) nnodes;
+        nnodes *= table->varcount[j];
+    }
+    if(nnodes > (double)(UINT_MAX>>1))
+    {
+        return RINTERPOLATE_TABLE_TOO_LARGE;
+    }
+    table->nnodes = (rinterpolate_counter_t) nnodes;
+
+    /*
+     * Make the mask of nodes present in the table
+     */
+    const size_t nwords = (table->nnodes + 63)/64;
+    Safe_free(table->mask);
+    Safe_free(table->mask_rank);
+    table->mask = Rinterpolate_calloc(nwords,sizeof(uint64_t));
+    table->mask_rank = Rinterpolate_calloc(nwords,sizeof(rinterpolate_counter_t));
+
+#ifdef RINTERPOLATE_ALLOC_CHECKS
+    if(unlikely(table->mask==NULL || table->mask_rank==NULL))
+    {
+        rinterpolate_error(RINTERPOLATE_CALLOC_FAILED,
+                           "Failed to alloc mask in rinterpolate_make_ragged\n",
+                           table->parent);
+    }
+#endif
+
+    rinterpolate_signed_counter_t prev = -1;
+    for(i=0;i<table->l;i++)
+    {
+        const rinterpolate_float_t * line = table->data + (size_t)i*table->line_length;
+        rinterpolate_counter_t node = 0;
+        for(j=0;j<table->n;j++)
+        {
+            /* binary search for the grid value */
+            const rinterpolate_float_t * pre = table->presearch[j];
+            rinterpolate_counter_t a = 0, b = table->varcount[j];
+            while(b - a > 1)
+            {
+                const rinterpolate_counter_t c = (a+b)>>1;
+                if(line[j] < pre[c] && !Fequal(line[j],pre[c])) b = c;
+                else a = c;
+            }
+            node += a * table->steps[j];
+        }
+
+        if((rinterpolate_signed_counter_t)node <= prev)
+        {
+            return RINTERPOLATE_TABLE_NOT_SORTED;
+        }
+        prev = node;
+        table->mask[node>>6] |= ((uint64_t)1) << (node & 63);
+    }
+
+    /*
+     * Rank of each word
+     */
+    rinterpolate_counter_t rank = 0;
+    size_t w;
+    for(w=0;w<nwords;w++)
+    {
+        table->mask_rank[w] = rank;
+        rank += Popcount64(table->mask[w]);
+    }
+
+    return RINTERPOLATE_NO_ERROR;
+}
+
+static int compare_floats(const void * a, const void * b)
+{
+    const rinterpolate_float_t x = *(const rinterpolate_float_t *)a;
+    const rinterpolate_float_t y = *(const rinterpolate_float_t *)b;
+    return Less_than(x,y) ? -1 : More_than(x,y) ? 1 : 0;
+}
@@ -0,0 +1,60 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Zeroth-order lookup: set r to the data at a single node of the
+ * grid, rather than interpolating over the hypercube.
+ *
+ * mode is
+ *
+ * RINTERPOLATE_MODE_NEAREST : the node nearest to x on each axis
+ *                             (the upper node at exactly half way)
+ * RINTERPOLATE_MODE_FLOOR   : the node at or below x on each axis
+ *
+ * As in the interpolation, x is forced into the range of the table.
+ *
+ * Only the search on each axis is required, so this is O(n log varcount)
+ * and there is no hypercube to construct. If the node is missing
+ * from a ragged table, r is set to NaN.
+ */
+
+void rinterpolate_nearest(struct rinterpolate_table_t * RESTRICT const table,
+                          const rinterpolate_float_t * RESTRICT const x,
+                          rinterpolate_float_t * RESTRICT const r,
+                          const rinterpolate_counter_t mode)
+{
+    const struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+    rinterpolate_counter_t j;
+    rinterpolate_counter_t node = 0;
+
+    rinterpolate_search_brackets(table,x);
+
+    for(j=0;j<table->n;j++)
+    {
+        const rinterpolate_float_t f = hypertable->f[j];
+
+        /*
+         * The search finds the bracket with lower < x <= upper,
+         * so for FLOOR we take the upper node if x is on it
+         */
+        const rinterpolate_Boolean_t upper =
+            mode == RINTERPOLATE_MODE_FLOOR ?
+            Boolean_(f+TINY > 1.0) :
+            Boolean_(f >= 0.5);
+
+        node += (hypertable->index[j] + (upper == TRUE ? 1 : 0)) * table->steps[j];
+    }
+
+    const rinterpolate_float_t * const node_data = rinterpolate_node_data(table,node);
+    if(likely(node_data != NULL))
+    {
+        memcpy(r,node_data,table->d_float_sizeof);
+    }
+    else
+    {
+        for(j=0;j<table->d;j++)
+        {
+            r[j] = NAN;
+        }
+    }
+}
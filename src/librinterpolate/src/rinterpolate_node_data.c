@@ -0,0 +1,29 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Given the number of a node of the parameter grid (i.e. the
+ * line number in a full, row-major table), return a pointer
+ * to its d data items, taking the tiled layout and ragged
+ * tables into account.
+ *
+ * Returns NULL if the node is missing from a ragged table.
+ */
+
+const rinterpolate_float_t * rinterpolate_node_data(const struct rinterpolate_table_t * RESTRICT const table,
+                                                    const rinterpolate_counter_t node)
+{
+    if(table->mask != NULL)
+    {
+        const rinterpolate_signed_counter_t line = rinterpolate_ragged_line(table,node);
+        return likely(line >= 0) ? table->data + (size_t)line * table->line_length + table->n : NULL;
+    }
+    else if(table->layout_data != NULL)
+    {
+        return table->layout_data + rinterpolate_tiled_line(table,node) * table->d;
+    }
+    else
+    {
+        return table->data + (size_t)node * table->line_length + table->n;
+    }
+}
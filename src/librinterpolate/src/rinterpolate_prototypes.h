@@ -18,6 +18,70 @@ struct rinterpolate_data_t * rinterpolate(
 void rinterpolate_free_data(struct rinterpolate_data_t * RESTRICT const rinterpolate_data);
 rinterpolate_counter_t rinterpolate_alloc_dataspace(struct rinterpolate_data_t ** RESTRICT const r);
 void rinterpolate_build_flags(struct rinterpolate_data_t * RESTRICT const rinterpolate_data);
+struct rinterpolate_table_t * rinterpolate_find_table(
+    struct rinterpolate_data_t * RESTRICT const rinterpolate_data,
+    const rinterpolate_float_t * RESTRICT const datatable,
+    const rinterpolate_counter_t n,
+    const rinterpolate_counter_t d,
+    const rinterpolate_counter_t l,
+    const rinterpolate_counter_t cache_length);
+void rinterpolate_set_layout(struct rinterpolate_table_t * RESTRICT const table,
+                             const rinterpolate_counter_t tile);
+void rinterpolate_update_layout(struct rinterpolate_table_t * RESTRICT const table,
+                                const rinterpolate_counter_t first);
+void rinterpolate_nearest(struct rinterpolate_table_t * RESTRICT const table,
+                          const rinterpolate_float_t * RESTRICT const x,
+                          rinterpolate_float_t * RESTRICT const r,
+                          const rinterpolate_counter_t mode);
+void rinterpolate_simplex(struct rinterpolate_table_t * RESTRICT const table,
+                          const rinterpolate_float_t * RESTRICT const x,
+                          rinterpolate_float_t * RESTRICT const r);
+void rinterpolate_fused(struct rinterpolate_table_t * RESTRICT const table,
+                        const rinterpolate_float_t * RESTRICT const x,
+                        const rinterpolate_counter_t nblocks,
+                        const rinterpolate_float_t * const * const blocks,
+                        const rinterpolate_counter_t * RESTRICT const block_d,
+                        rinterpolate_float_t * const * const r,
+                        rinterpolate_float_t * RESTRICT const scratch);
+void rinterpolate_locate(struct rinterpolate_table_t * RESTRICT const table,
+                         const rinterpolate_float_t * RESTRICT const x,
+                         int64_t * RESTRICT const corners,
+                         rinterpolate_float_t * RESTRICT const weights);
+void rinterpolate_apply_weights(const rinterpolate_float_t * RESTRICT const data,
+                                const size_t line_length,
+                                const size_t ncolumns,
+                                const int64_t * RESTRICT const columns,
+                                const size_t k,
+                                const size_t ncorners,
+                                const int64_t * RESTRICT const corners,
+                                const rinterpolate_float_t * RESTRICT const weights,
+                                rinterpolate_float_t * RESTRICT const r);
+void rinterpolate_sparse_apply(const rinterpolate_float_t * RESTRICT const data,
+                               const size_t line_length,
+                               const size_t ncolumns,
+                               const int64_t * RESTRICT const columns,
+                               const size_t k,
+                               const int64_t * RESTRICT const indptr,
+                               const int64_t * RESTRICT const indices,
+                               const rinterpolate_float_t * RESTRICT const weights,
+                               rinterpolate_float_t * RESTRICT const r);
+const rinterpolate_float_t * rinterpolate_node_data(const struct rinterpolate_table_t * RESTRICT const table,
+                                                    const rinterpolate_counter_t node);
+rinterpolate_counter_t rinterpolate_make_ragged(struct rinterpolate_table_t * RESTRICT const table);
+void rinterpolate_update_data(struct rinterpolate_data_t * RESTRICT const rinterpolate_data,
+                              const rinterpolate_float_t * RESTRICT const datatable);
+rinterpolate_counter_t rinterpolate_check_append(const struct rinterpolate_table_t * RESTRICT const table,
+                                                 const rinterpolate_float_t * const lines,
+                                                 const rinterpolate_counter_t nnew);
+rinterpolate_counter_t rinterpolate_append_lines(struct rinterpolate_table_t * RESTRICT const table,
+                                                const rinterpolate_float_t * const datatable,
+                                                const rinterpolate_counter_t l);
+rinterpolate_counter_t rinterpolate_check_table(const struct rinterpolate_table_t * RESTRICT const table,
+                                               const rinterpolate_counter_t start,
+                                               const rinterpolate_counter_t end,
+                                               rinterpolate_counter_t * RESTRICT const bad_line);
+void rinterpolate_remove_table(struct rinterpolate_data_t * RESTRICT const rinterpolate_data,
+                               const rinterpolate_float_t * RESTRICT const datatable);
 
 /*
  * Internal functions 
@@ -44,10 +108,21 @@ void rinterpolate_alloc_cacheline(struct rinterpolate_table_t * RESTRICT const t
 void rinterpolate_make_steps(struct rinterpolate_table_t * RESTRICT const table);
 void rinterpolate_alloc_hypertable(struct rinterpolate_table_t * RESTRICT const table);
 void rinterpolate_alloc_varcount(struct rinterpolate_table_t * RESTRICT const table);
+void rinterpolate_search_brackets(
+    struct rinterpolate_table_t * RESTRICT const table,
+    const rinterpolate_float_t * RESTRICT const x
+    );
 void rinterpolate_search_table(
     struct rinterpolate_table_t * RESTRICT const table,
     const rinterpolate_float_t * RESTRICT const x
     );
+void rinterpolate_evaluate(struct rinterpolate_table_t * RESTRICT const table,
+                           const rinterpolate_float_t * RESTRICT const x,
+                           rinterpolate_float_t * RESTRICT const r);
+void rinterpolate_search_pruned(
+    struct rinterpolate_table_t * RESTRICT const table,
+    const rinterpolate_float_t * RESTRICT const x
+    );
 void rinterpolate_construct_hypercube(
     struct rinterpolate_table_t * RESTRICT const table
     );
@@ -57,15 +132,63 @@ void rinterpolate_interpolate(
     const rinterpolate_float_t * RESTRICT const x,
     rinterpolate_float_t * RESTRICT const r);
 
+void rinterpolate_reduce(rinterpolate_float_t * RESTRICT const data,
+                         const rinterpolate_float_t * RESTRICT const f,
+                         const rinterpolate_counter_t n,
+                         const rinterpolate_counter_t line_length,
+                         const rinterpolate_counter_t d,
+                         rinterpolate_float_t * RESTRICT const r);
+
+void rinterpolate_reduce_from(const rinterpolate_float_t * RESTRICT const data,
+                              const rinterpolate_float_t * RESTRICT const f,
+                              const rinterpolate_counter_t n,
+                              const rinterpolate_counter_t line_length,
+                              const rinterpolate_counter_t d,
+                              rinterpolate_float_t * RESTRICT const work,
+                              rinterpolate_float_t * RESTRICT const r);
+
 void rinterpolate_store_cache(struct rinterpolate_table_t * RESTRICT const table,
                               const rinterpolate_float_t * RESTRICT const x,
                               const rinterpolate_float_t * RESTRICT const r);
 
+#ifdef RINTERPOLATE_CACHE
+void rinterpolate_clear_cache(struct rinterpolate_table_t * RESTRICT const table);
+#endif
 void rinterpolate_make_presearch(struct rinterpolate_table_t * RESTRICT const table);
+double rinterpolate_clock(void);
+
+#ifdef RINTERPOLATE_PRESEARCH
+rinterpolate_counter_t rinterpolate_search_axis(struct rinterpolate_search_t * RESTRICT const search,
+                                                const rinterpolate_float_t * RESTRICT const tpre,
+                                                const rinterpolate_counter_t varcount,
+                                                const rinterpolate_float_t v);
+rinterpolate_counter_t rinterpolate_set_search(struct rinterpolate_table_t * RESTRICT const table,
+                                               const rinterpolate_counter_t * const methods);
+rinterpolate_counter_t rinterpolate_set_categorical(struct rinterpolate_table_t * RESTRICT const table,
+                                                    const rinterpolate_Boolean_t * const categorical);
+rinterpolate_counter_t rinterpolate_autotune_search(struct rinterpolate_table_t * RESTRICT const table,
+                                                    const rinterpolate_float_t * RESTRICT const x,
+                                                    const size_t k,
+                                                    double * RESTRICT const times);
+#endif
 
 #ifdef RINTERPOLATE_CACHE
 void rinterpolate_resize_cache(struct rinterpolate_table_t * RESTRICT const table,
                                const rinterpolate_counter_t cache_length);
+rinterpolate_counter_t rinterpolate_set_cache_auto(struct rinterpolate_table_t * RESTRICT const table,
+                                                   const rinterpolate_Boolean_t automatic);
+void rinterpolate_adapt_cache(struct rinterpolate_table_t * RESTRICT const table);
+rinterpolate_counter_t rinterpolate_resize_cell_cache(struct rinterpolate_table_t * RESTRICT const table,
+                                                      const rinterpolate_counter_t cell_cache_length);
+rinterpolate_Boolean_t rinterpolate_check_cell_cache(struct rinterpolate_table_t * RESTRICT const table,
+                                                     const rinterpolate_float_t * RESTRICT const x,
+                                                     rinterpolate_float_t * RESTRICT const r);
+void rinterpolate_store_cell_cache(struct rinterpolate_table_t * RESTRICT const table);
+rinterpolate_counter_t rinterpolate_set_cache_tolerance(struct rinterpolate_table_t * RESTRICT const table,
+                                                        const rinterpolate_float_t * const atol,
+                                                        const rinterpolate_float_t * const rtol);
+rinterpolate_float_t * rinterpolate_quantize(struct rinterpolate_table_t * RESTRICT const table,
+                                             const rinterpolate_float_t * RESTRICT const x);
 #endif
 
 
@@ -79,6 +202,33 @@ rinterpolate_counter_t rinterpolate_add_new_table(
     const rinterpolate_counter_t cache_length);
 
 
+size_t Pure_function rinterpolate_tiled_line(const struct rinterpolate_table_t * RESTRICT const table,
+                                             const size_t line);
+
+rinterpolate_signed_counter_t Pure_function rinterpolate_ragged_line(const struct rinterpolate_table_t * RESTRICT const table,
+                                                                     const rinterpolate_counter_t node);
+void rinterpolate_free_table(struct rinterpolate_table_t * const table);
+
 void rinterpolate_free_hypertable(struct rinterpolate_hypertable_t * RESTRICT hypertable);
 
+void rinterpolate_set_allocator(const struct rinterpolate_allocator_t * const allocator);
+
+void rinterpolate_table_memory(const struct rinterpolate_table_t * RESTRICT const table,
+                               struct rinterpolate_memory_t * RESTRICT const memory);
+
+size_t rinterpolate_dataspace_memory(const struct rinterpolate_data_t * RESTRICT const rinterpolate_data);
+
+rinterpolate_counter_t rinterpolate_batch_grouped(struct rinterpolate_table_t * RESTRICT const table,
+                                                  const rinterpolate_float_t * RESTRICT const x,
+                                                  rinterpolate_float_t * RESTRICT const r,
+                                                  const size_t k);
+
+rinterpolate_counter_t rinterpolate_grid(struct rinterpolate_table_t * RESTRICT const table,
+                                         const rinterpolate_float_t * const * const axes,
+                                         const rinterpolate_counter_t * RESTRICT const k,
+                                         rinterpolate_float_t * RESTRICT const r);
+
+rinterpolate_signed_counter_t rinterpolate_simd_supported(void);
+rinterpolate_signed_counter_t rinterpolate_set_simd(const rinterpolate_signed_counter_t level);
+
 #endif//RINTERPOLATE_PROTOTYPES_H
@@ -0,0 +1,54 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+
+/*
+ * Quantize the parameters x with the tolerances of the table (see
+ * rinterpolate_set_cache_tolerance) and return a pointer to the
+ * quantized parameters, which are what rinterpolate then looks up in
+ * the cache and interpolates at. The pointer is valid until the next
+ * call for the same table.
+ *
+ * Quantization snaps x[j] to the centre of the bucket it is in, so
+ * all x in a bucket give the same cache key and the same result,
+ * whatever the order of the calls. This result differs from that at
+ * x by at most sum_j L_j*tol_j, where tol_j is the tolerance
+ * (atol[j], or rtol[j]*|x[j]|) and L_j the largest slope of the
+ * data along axis j over a grid cell.
+ *
+ * NaN and infinite values are not changed.
+ */
+
+rinterpolate_float_t * rinterpolate_quantize(struct rinterpolate_table_t * RESTRICT const table,
+                                             const rinterpolate_float_t * RESTRICT const x)
+{
+    rinterpolate_float_t * RESTRICT const xq = table->cache_x;
+    rinterpolate_counter_t j;
+
+    for(j=0;j<table->n;j++)
+    {
+        const rinterpolate_float_t w = table->cache_quantum[j];
+        const rinterpolate_counter_t bits = table->cache_round_bits[j];
+
+        if(w > 0.0 && isfinite(x[j]))
+        {
+            xq[j] = w * floor(x[j]/w + 0.5);
+        }
+        else if(bits > 0 && isfinite(x[j]))
+        {
+            /* round half up in the mantissa: a carry into the exponent is fine */
+            uint64_t u;
+            memcpy(&u,x+j,sizeof(uint64_t));
+            u += UINT64_C(1) << (bits-1);
+            u &= ~((UINT64_C(1) << bits) - 1);
+            memcpy(xq+j,&u,sizeof(uint64_t));
+        }
+        else
+        {
+            xq[j] = x[j];
+        }
+    }
+    return xq;
+}
+#endif // RINTERPOLATE_CACHE
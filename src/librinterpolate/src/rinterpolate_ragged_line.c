@@ -0,0 +1,22 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Given the number of a node on the (full) parameter grid of a
+ * ragged table, return the line at which it is stored in the
+ * data, or -1 if the node is missing.
+ *
+ * The stored line is the number of nodes present before this one,
+ * i.e. the rank of the node's bit in the mask.
+ */
+
+rinterpolate_signed_counter_t Pure_function rinterpolate_ragged_line(const struct rinterpolate_table_t * RESTRICT const table,
+                                                                     const rinterpolate_counter_t node)
+{
+    const uint64_t word = table->mask[node>>6];
+    const uint64_t bit = ((uint64_t)1) << (node & 63);
+
+    return likely(word & bit) ?
+        (rinterpolate_signed_counter_t)(table->mask_rank[node>>6] + Popcount64(word & (bit - 1))) :
+        -1;
+}
@@ -0,0 +1,86 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Reduce a hypercube of 2^n lines, each line_length long, by linear
+ * interpolation along each dimension in turn, with factors f[0..n-1].
+ *
+ * data points to the first of the d items of the first line that are
+ * to be interpolated, the result (d items) is put in r. The data
+ * are overwritten in the process.
+ *
+ * This is the work horse of rinterpolate_interpolate, but can also be
+ * used on hypercubes gathered from other tables, see rinterpolate_fused.
+ */
+
+void rinterpolate_reduce(rinterpolate_float_t * RESTRICT const data,
+                         const rinterpolate_float_t * RESTRICT const f,
+                         const rinterpolate_counter_t n,
+                         const rinterpolate_counter_t line_length,
+                         const rinterpolate_counter_t d,
+                         rinterpolate_float_t * RESTRICT const r)
+{
+    rinterpolate_float_t  u,v;
+    rinterpolate_counter_t j = 0;
+    rinterpolate_counter_t g = n>0 ? line_length<<(n-1) : 0;
+    const size_t d_float_sizeof = sizeof(rinterpolate_float_t) * d;
+
+    prefetch(data,0);
+    prefetch(f,0);
+
+    while(j < n)
+    {
+        /*
+         * Do the interpolation
+         */
+#ifdef RINTERPOLATE_DEBUG
+        Rinterpolate_print("Interpolate n=%u f=%g\n",n,f[j]);
+        FLUSH;
+#endif
+#ifdef RINTERPOLATE_USE_POINTER_ARITHMETIC
+        v = *(f+j);
+#else
+        v = f[j];
+#endif
+
+        if(likely(v>TINY))
+        {
+            if(unlikely(v+TINY>1.0))
+            {
+                // u=0 v=1: unusual case but easy to calculate (no inner loop required)
+#ifdef RINTERPOLATE_DEBUG
+                Rinterpolate_print("u=0 v=1\n");
+#endif
+                rinterpolate_float_t *xxx;
+                rinterpolate_counter_t i;
+                for(i=0;i<g;i+=line_length)
+                {
+                    xxx = data+i;
+                    memcpy(xxx,xxx+g,d_float_sizeof);
+                }
+            }
+            else
+            {
+                /*
+                 * intermediate cases : the most common, so done
+                 * by the SIMD kernel (see rinterpolate_simd.c)
+                 */
+                u = 1.0 - v;
+                rinterpolate_simd.reduce_step(data,g,line_length,d,u,v);
+            }
+        }
+        // else v=0, data[k] stays the same
+        j++;
+        g >>=1; // g/=2;
+    }
+
+#ifdef RINTERPOLATE_DEBUG
+    Rinterpolate_print("memcopy results\n");
+    FLUSH;
+#endif
+
+    /*
+     * Set the result array
+     */
+    memcpy(r,data,d_float_sizeof);
+}
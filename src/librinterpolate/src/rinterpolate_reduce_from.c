@@ -0,0 +1,61 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Reduce a hypercube of 2^n lines, each line_length long, with
+ * factors f[0..n-1] as rinterpolate_reduce does, but without
+ * overwriting it, so that it can be reduced again with other factors.
+ *
+ * data points to the first of the d items of the first line that are
+ * to be interpolated. The first step (along the first dimension)
+ * reads the hypercube and writes only the d items of each line to
+ * work, which must have space for 2^(n-1)*d items, and the rest of
+ * the reduction is done on work. The result (d items) is put in r,
+ * and is exactly that of rinterpolate_reduce.
+ */
+
+void rinterpolate_reduce_from(const rinterpolate_float_t * RESTRICT const data,
+                              const rinterpolate_float_t * RESTRICT const f,
+                              const rinterpolate_counter_t n,
+                              const rinterpolate_counter_t line_length,
+                              const rinterpolate_counter_t d,
+                              rinterpolate_float_t * RESTRICT const work,
+                              rinterpolate_float_t * RESTRICT const r)
+{
+    const size_t d_float_sizeof = sizeof(rinterpolate_float_t) * d;
+
+    if(n == 0)
+    {
+        memcpy(r,data,d_float_sizeof);
+    }
+    else
+    {
+        const rinterpolate_counter_t half = Intger_power_of_two(n-1);
+        const rinterpolate_float_t v = f[0];
+        rinterpolate_counter_t i;
+
+        for(i=0;i<half;i++)
+        {
+            const rinterpolate_float_t * const a = data + i*line_length;
+            const rinterpolate_float_t * const b = a + half*line_length;
+            if(likely(v>TINY))
+            {
+                if(unlikely(v+TINY>1.0))
+                {
+                    memcpy(work + i*d,b,d_float_sizeof);
+                }
+                else
+                {
+                    rinterpolate_simd.blend(work + i*d,a,b,d,1.0-v,v);
+                }
+            }
+            else
+            {
+                memcpy(work + i*d,a,d_float_sizeof);
+            }
+        }
+
+        /* the lines of work are d long */
+        rinterpolate_reduce(work,f+1,n-1,d,d,r);
+    }
+}
@@ -0,0 +1,33 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+/*
+ * Remove the table with the given data from the rinterpolate
+ * data structure, freeing its memory.
+ *
+ * This should be called before the data table is freed, otherwise
+ * a new table allocated at the same address would be matched
+ * to the stale table struct by rinterpolate_id_table.
+ */
+
+void rinterpolate_remove_table(struct rinterpolate_data_t * RESTRICT const rinterpolate_data,
+                               const rinterpolate_float_t * RESTRICT const datatable)
+{
+    const rinterpolate_signed_counter_t table_id =
+        rinterpolate_id_table(rinterpolate_data,
+                              datatable);
+
+    if(table_id != -1)
+    {
+        rinterpolate_free_table(rinterpolate_data->tables[table_id]);
+        Safe_free(rinterpolate_data->tables[table_id]);
+
+        /* move the later tables down and renumber them */
+        rinterpolate_counter_t i;
+        for(i=table_id+1;i<rinterpolate_data->number_of_interpolation_tables;i++)
+        {
+            rinterpolate_data->tables[i-1] = rinterpolate_data->tables[i];
+            rinterpolate_data->tables[i-1]->table_number = i-1;
+        }
+        rinterpolate_data->number_of_interpolation_tables--;
+    }
+}
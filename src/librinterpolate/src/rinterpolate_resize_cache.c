@@ -10,13 +10,62 @@ void rinterpolate_resize_cache(struct rinterpolate_table_t * RESTRICT const tabl
      * Change the size of the rinterpolate_cache to cache_length, which
      * could be zero.
      *
-     * Note that this wipes the cache in the process.
+     * The most recently stored lines that fit are kept, in the same
+     * order of age, the others are set to NaN so they cannot match.
      */
-    Safe_free(table->cache);
+    rinterpolate_float_t * const old_cache = table->cache;
+    const rinterpolate_counter_t old_length = old_cache != NULL ? table->cache_length : 0;
+    const rinterpolate_counter_t keep =
+        table->cache_spin_line == -1 ? 0 : Min(old_length,cache_length);
+    const rinterpolate_signed_counter_t old_spin_line = table->cache_spin_line;
+    rinterpolate_counter_t i;
+
+    table->cache = NULL;
     table->cache_length = cache_length;
+    table->cache_match_line = 0;
+    table->cache_spin_line = -1;
+
     if(cache_length>0)
     {
-        rinterpolate_alloc_cacheline(table);
+        table->cache = Rinterpolate_malloc(sizeof(rinterpolate_float_t) *
+                                           table->line_length * cache_length);
+#ifdef RINTERPOLATE_ALLOC_CHECKS
+        if(unlikely(table->cache==NULL))
+        {
+            rinterpolate_error(RINTERPOLATE_CALLOC_FAILED,
+                               "Failed to alloc cache \n",
+                               table->parent);
+        }
+#endif
+        if(unlikely(table->cache==NULL))
+        {
+            /* no memory: no cache */
+            table->cache_length = 0;
+            Rinterpolate_free(old_cache);
+            return;
+        }
+        for(i=0;i<table->line_length*cache_length;i++)
+        {
+            table->cache[i] = NAN;
+        }
+
+        /*
+         * The line of age a (0 is the newest) goes to line keep-1-a,
+         * so the newest is at cache_spin_line = keep-1
+         */
+        for(i=0;i<keep;i++)
+        {
+            const rinterpolate_counter_t old_line =
+                (old_spin_line + old_length - i) % old_length;
+            memcpy(table->cache + (size_t)table->line_length * (keep-1-i),
+                   old_cache + (size_t)table->line_length * old_line,
+                   table->line_length_sizeof);
+        }
+        if(keep > 0)
+        {
+            table->cache_spin_line = keep - 1;
+        }
     }
+    Rinterpolate_free(old_cache);
 }
-#endif // RINTERPOLATE_CACHE    
+#endif // RINTERPOLATE_CACHE
@@ -0,0 +1,51 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+
+/*
+ * Change the number of cells in the cell cache of the table to
+ * cell_cache_length, which could be zero (no cell cache).
+ *
+ * The cell cache keeps the hypercubes of the last cell_cache_length
+ * cells of the grid in which the table was interpolated, so that
+ * interpolation at any other x in one of these cells only has
+ * to reduce the hypercube (see rinterpolate_check_cell_cache).
+ * Each cell takes 2^n*d+4n floats.
+ *
+ * Note that this wipes the cell cache in the process.
+ *
+ * Returns 0, or RINTERPOLATE_CALLOC_FAILED if the memory could not
+ * be allocated, in which case there is no cell cache.
+ */
+
+rinterpolate_counter_t rinterpolate_resize_cell_cache(struct rinterpolate_table_t * RESTRICT const table,
+                                                      const rinterpolate_counter_t cell_cache_length)
+{
+    Safe_free(table->cell_cache);
+    Safe_free(table->cell_cache_work);
+    table->cell_cache_length = 0;
+    table->cell_cache_used = 0;
+    table->cell_cache_next = 0;
+    table->cell_cache_match_line = 0;
+
+    if(cell_cache_length > 0)
+    {
+        table->cell_cache =
+            Rinterpolate_malloc(sizeof(rinterpolate_float_t) *
+                                RINTERPOLATE_CELL_CACHE_LINE * cell_cache_length);
+        table->cell_cache_work =
+            Rinterpolate_malloc(table->d_float_sizeof *
+                                Max(table->hypertable_length/2,1));
+        if(unlikely(table->cell_cache == NULL ||
+                    table->cell_cache_work == NULL))
+        {
+            Safe_free(table->cell_cache);
+            Safe_free(table->cell_cache_work);
+            return RINTERPOLATE_CALLOC_FAILED;
+        }
+        table->cell_cache_length = cell_cache_length;
+    }
+    return 0;
+}
+#endif // RINTERPOLATE_CACHE
@@ -0,0 +1,137 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Search the grid values of one axis, tpre (varcount > 1 of them),
+ * for the lower of the pair which spans v, with the method in search
+ * (see rinterpolate_set_search).
+ *
+ * v must already be forced into the range of the axis. All the
+ * methods return the same index as the binary search in
+ * rinterpolate_search_brackets: the largest a < varcount-1 with
+ * tpre[a] < v, or 0 if there is none.
+ *
+ * RINTERPOLATE_SEARCH_BINARY     : bisection, O(log varcount)
+ * RINTERPOLATE_SEARCH_BRANCHLESS : bisection with a conditional move
+ *                                  rather than a branch, so there are
+ *                                  no mispredictions
+ * RINTERPOLATE_SEARCH_LINEAR     : a scan from the start, the fastest
+ *                                  on short axes
+ * RINTERPOLATE_SEARCH_HUNT       : start from the index found last time
+ *                                  and gallop away from it, the fastest
+ *                                  when successive x are close
+ * RINTERPOLATE_SEARCH_INDEXED    : start from an index of uniform buckets
+ *                                  of the axis, O(1) on a uniform grid
+ */
+
+/*
+ * bisection between a and b, where tpre[a] < v (or a is 0)
+ * and v <= tpre[b] (or b is the last grid value)
+ */
+static inline rinterpolate_counter_t bisect(const rinterpolate_float_t * RESTRICT const tpre,
+                                            rinterpolate_counter_t a,
+                                            rinterpolate_counter_t b,
+                                            const rinterpolate_float_t v)
+{
+    while(likely(b - a > 1))
+    {
+        const rinterpolate_counter_t c = (a+b)>>1;
+        if(equally_likely(v > tpre[c])) a = c;
+        else b = c;
+    }
+    return a;
+}
+
+/*
+ * Gallop from the guess a, doubling the step until the span is
+ * bracketed, then bisect the last step
+ */
+static inline rinterpolate_counter_t hunt(const rinterpolate_float_t * RESTRICT const tpre,
+                                          const rinterpolate_counter_t varcount,
+                                          rinterpolate_counter_t a,
+                                          const rinterpolate_float_t v)
+{
+    const rinterpolate_counter_t top = varcount - 2;
+    rinterpolate_counter_t step = 1;
+    a = Min(a,top);
+
+    if(a < top && tpre[a+1] < v)
+    {
+        /* up */
+        rinterpolate_counter_t lo = a + 1;
+        rinterpolate_counter_t hi = lo + 1;
+        while(hi < top + 1 && tpre[hi] < v)
+        {
+            lo = hi;
+            step <<= 1;
+            hi = Min(lo + step,top + 1);
+        }
+        return bisect(tpre,lo,hi,v);
+    }
+    else if(a > 0 && !(tpre[a] < v))
+    {
+        /* down */
+        rinterpolate_counter_t hi = a;
+        rinterpolate_counter_t lo = a - 1;
+        while(lo > 0 && !(tpre[lo] < v))
+        {
+            hi = lo;
+            step <<= 1;
+            lo = hi > step ? hi - step : 0;
+        }
+        return bisect(tpre,lo,hi,v);
+    }
+    return a;
+}
+
+rinterpolate_counter_t rinterpolate_search_axis(struct rinterpolate_search_t * RESTRICT const search,
+                                                const rinterpolate_float_t * RESTRICT const tpre,
+                                                const rinterpolate_counter_t varcount,
+                                                const rinterpolate_float_t v)
+{
+    rinterpolate_counter_t a = 0;
+
+    switch(search->method)
+    {
+    case RINTERPOLATE_SEARCH_BRANCHLESS:
+    {
+        rinterpolate_counter_t length = varcount - 1;
+        while(length > 1)
+        {
+            const rinterpolate_counter_t half = length >> 1;
+            a = tpre[a + half] < v ? a + half : a;
+            length -= half;
+        }
+        break;
+    }
+
+    case RINTERPOLATE_SEARCH_LINEAR:
+        while(a + 2 < varcount && tpre[a + 1] < v)
+        {
+            a++;
+        }
+        break;
+
+    case RINTERPOLATE_SEARCH_HUNT:
+        a = hunt(tpre,varcount,search->last,v);
+        search->last = a;
+        break;
+
+    case RINTERPOLATE_SEARCH_INDEXED:
+    {
+        /* !(v > tpre[0]) also catches NaN */
+        const rinterpolate_float_t y = (v - tpre[0]) * search->scale;
+        const rinterpolate_counter_t bucket =
+            !(v > tpre[0]) ? 0 :
+            y >= (rinterpolate_float_t)(search->nbuckets - 1) ? search->nbuckets - 1 :
+            (rinterpolate_counter_t) y;
+        a = hunt(tpre,varcount,search->guess[bucket],v);
+        break;
+    }
+
+    default:
+        a = bisect(tpre,0,varcount-1,v);
+    }
+
+    return a;
+}
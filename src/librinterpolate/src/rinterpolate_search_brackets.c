@@ -0,0 +1,216 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Search the table for the grid values which span x on
+ * each axis.
+ *
+ * On return, hypertable->index[j] is the index of the lower
+ * spanning grid value on axis j, i.e. the upper is index[j]+1
+ * (unless there is only one value on the axis), and
+ * hypertable->f[j] is the interpolation factor between them.
+ *
+ * x is forced into the range of the table.
+ *
+ * On exact-match axes (see rinterpolate_set_categorical), index[j]
+ * is the grid value nearest x (which can be the last) and f[j] is 0.
+ */
+
+void rinterpolate_search_brackets(
+    struct rinterpolate_table_t * RESTRICT const table,
+    const rinterpolate_float_t * RESTRICT const x
+    )
+{
+    rinterpolate_counter_t j;
+#ifdef RINTERPOLATE_DEBUG
+    Rinterpolate_print("search table for span of { ");
+    for(j=0;j<table->n;j++)
+    {
+        Rinterpolate_print("x[%u]=%g%s",j,x[j],j!=(table->n-1)?", ":" }\n");
+    }
+    FLUSH;
+#endif
+#if !defined RINTERPOLATE_PRESEARCH || defined RINTERPOLATE_DEBUG
+    rinterpolate_counter_t g = table->line_length*(table->l-1);
+#endif
+    struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+
+    for(j=0;j<table->n;j++)
+    {
+        /*
+         * limit the value of our given parameter x[j] to the range we have
+         * and save to the parameter v
+         */
+        rinterpolate_counter_t b = table->varcount[j];
+#ifdef RINTERPOLATE_PRESEARCH
+        const rinterpolate_float_t * RESTRICT tpre =
+            table->presearch[j];
+#endif
+#ifdef RINTERPOLATE_POINTER_ARITHMETIC_J_LOOP
+#ifdef RINTERPOLATE_PRESEARCH
+        const rinterpolate_float_t v = Force_range(*tpre,*(tpre+b-1),*(x+j));
+#else
+        const rinterpolate_float_t * tj = table->data + j;
+        const rinterpolate_float_t v = Max(*tj,Min(*(tj+g),*(x+j)));
+#endif
+        const rinterpolate_counter_t k MAYBE_UNUSED = *(table->steps+j);
+#else
+#ifdef RINTERPOLATE_PRESEARCH
+        const rinterpolate_float_t v = Max(tpre[0],Min(tpre[b-1],x[j]));
+#else
+        const rinterpolate_float_t v = Max(table->data[j],Min(table->data[g+j],x[j]));
+#endif
+        const rinterpolate_counter_t k MAYBE_UNUSED = table->steps[j];
+#endif
+
+#ifdef RINTERPOLATE_DEBUG
+        if(rinterpolate_debug)
+        {
+            Rinterpolate_print("Construct variable %u hypertable position\n",
+                   j);
+            FLUSH;
+
+            /*
+             * Check if the parameter value exceeds the end of the
+             * table value
+             */
+            if(x[j] - DBL_EPSILON > table->data[g+j])
+            {
+                printf("WARNING : parameter %u is %g which exceeds (by %g cf. TINY = %g DBL_EPSILON = %g) the maximum possible which is %g\n",
+                       j,
+                       x[j],
+                       x[j] - table->data[g+j],
+                       TINY,
+                       DBL_EPSILON,
+                       table->data[g+j]);
+            }
+            FLUSH;
+        }
+#endif
+        /*
+         * Now we can guess the parameter value appropriate for us:
+         * a and b are the binary search limits, start at a=0
+         * and b=varcount[j] (the max possible value, set above)
+         */
+        rinterpolate_counter_t a = 0;
+
+        if(likely(b>1))
+        {
+#ifndef RINTERPOLATE_PRESEARCH
+            const rinterpolate_counter_t i = table->line_length * k;
+#endif
+#ifdef RINTERPOLATE_PRESEARCH
+            if(table->search != NULL &&
+               table->search[j].method != RINTERPOLATE_SEARCH_BINARY)
+            {
+                /*
+                 * another search algorithm chosen with
+                 * rinterpolate_set_search or rinterpolate_autotune_search
+                 */
+                a = rinterpolate_search_axis(table->search + j,tpre,b,v);
+                b = a + 1;
+            }
+            else
+#endif
+            {
+            /*
+             * Binary search blatantly stolen (well, with permission)
+             * from Evert Glebbeek's code (thanks Evert!)
+             */
+            /*
+             * The search method can be chosen per axis at run time,
+             * see rinterpolate_search_axis: binary search is the default.
+             * Of those tested in
+             * https://arxiv.org/pdf/1506.08620.pdf
+             * it was the best:
+             *
+             * Test time (s):
+             *
+             * BINARY_SEARCH 10.68
+             * QUADRATIC_SEARCH 11.03 (inaccurate)
+             * PULVER_SEARCH 11.95
+             * DIRECT_SEARCH 44.34
+             */
+            while(likely(b - a > 1))
+            {
+                /*
+                 * The following three are equivalent, but the
+                 * bit shift is fastest.
+                 */
+                //c = ( a + b ) / 2;
+                //c = a + (b - a) / 2;//use this in case of overflow (unlikely!)
+                const rinterpolate_counter_t c = (a+b)>>1; // bit shift
+
+#ifdef RINTERPOLATE_POINTER_ARITHMETIC_J_LOOP
+#ifdef RINTERPOLATE_PRESEARCH
+                if(equally_likely(v > *(tpre+c))) a = c;
+#else
+                if(equally_likely(v > *(tj+c*i))) a = c;
+#endif
+#else
+#ifdef RINTERPOLATE_PRESEARCH
+                if(equally_likely(v > tpre[c])) a = c; // u=table->data[c*i+j]
+#else
+                if(equally_likely(v > table->data[c*i+j])) a = c; // u=table->data[c*i+j]
+#endif
+#endif
+                else b = c; // if(LESS_OR_EQUAL(v,u)) // obviously!
+            }
+            }
+
+            Rinterpolate_print("Binary search : indices a=%u b=%u : vars %g < v=%g < %g\n",
+                   a,
+                   b,
+                   *(tpre+a),
+                   v,
+                   *(tpre+b));
+
+
+            /* calculate interpolation factor (nasty, sorry...) */
+#ifdef RINTERPOLATE_POINTER_ARITHMETIC_J_LOOP
+#ifdef RINTERPOLATE_PRESEARCH
+            const rinterpolate_float_t u = *(tpre+a);
+            *(hypertable->f+j) = (v - u)/( *(tpre + b) - u);
+#else
+            const rinterpolate_float_t u = *(tj+a*i);
+            *(hypertable->f+j) = (v - u)/( *(tj + b*i) - u);
+#endif//RINTERPOLATE_PRESEARCH
+#else//RINTERPOLATE_POINTER_ARITHMETIC_J_LOOP
+#ifdef RINTERPOLATE_PRESEARCH
+            const rinterpolate_float_t u = tpre[a];
+            hypertable->f[j] = (v - u)/(tpre[b] - u);
+#else
+            const rinterpolate_float_t u = table->data[a*i+j];
+            hypertable->f[j] = (v - u)/(table->data[b*i+j] - u);
+#endif//RINTERPOLATE_PRESEARCH
+#endif//RINTERPOLATE_POINTER_ARITHMETIC_J_LOOP
+        }
+        else
+        {
+#ifdef RINTERPOLATE_POINTER_ARITHMETIC_J_LOOP
+            *(hypertable->f+j) = 0.0;
+#else
+            hypertable->f[j] = 0.0; // only one value to choose from! (the low value)
+#endif
+        }
+
+#ifdef RINTERPOLATE_PRESEARCH
+        if(table->categorical != NULL &&
+           table->categorical[j] == TRUE &&
+           table->varcount[j] > 1)
+        {
+            /*
+             * exact-match axis: select the nearest grid value
+             * (the lower at exactly half way), which is then the
+             * only corner on this axis
+             */
+            if(v > 0.5 * (tpre[a] + tpre[b]))
+            {
+                a = b;
+            }
+            hypertable->f[j] = 0.0;
+        }
+#endif
+        hypertable->index[j] = a;
+    }
+}
@@ -0,0 +1,83 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * As rinterpolate_search_table, but axes on which x is on a node
+ * of the grid (the interpolation factor is within TINY of 0 or 1,
+ * or the axis has only one value) are left out of the hypercube.
+ *
+ * On return, hypertable->n_active is the number, k, of axes the
+ * hypercube spans, hypertable->active_length = 2^k and the first
+ * 2^k elements of hypertable->sum are the nodes at its corners.
+ * The interpolation factors of the k axes are moved to the start
+ * of hypertable->f, in order, so the hypercube is reduced just as
+ * a full one would be. The result is the same as that of the full
+ * hypercube, in which rinterpolate_reduce skips these axes anyway,
+ * but only 2^k lines are gathered instead of 2^n.
+ *
+ * If x is on a node on every axis, k = 0 and sum[0] is that node.
+ */
+
+void rinterpolate_search_pruned(
+    struct rinterpolate_table_t * RESTRICT const table,
+    const rinterpolate_float_t * RESTRICT const x
+    )
+{
+    struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+    rinterpolate_counter_t * RESTRICT const sum = hypertable->sum;
+    rinterpolate_float_t * RESTRICT const f = hypertable->f;
+    rinterpolate_counter_t j,m;
+    rinterpolate_counter_t base = 0;
+    rinterpolate_counter_t k = 0;
+    rinterpolate_counter_t length = 1;
+
+    /*
+     * Find the spanning grid values on each axis
+     */
+    rinterpolate_search_brackets(table,x);
+
+    /*
+     * Add the nodes of the axes on which x is on a node to the
+     * base, and double the hypercube for each of the others.
+     * Each new axis becomes the lowest bit of the corner number,
+     * so the first axis ends up as the highest, as in
+     * rinterpolate_search_table.
+     */
+    sum[0] = 0;
+    for(j=0;j<table->n;j++)
+    {
+        const rinterpolate_float_t v = f[j];
+        const rinterpolate_counter_t a = hypertable->index[j] * table->steps[j];
+        if(v <= TINY || table->varcount[j] == 1)
+        {
+            base += a;
+        }
+        else if(v + TINY > 1.0)
+        {
+            base += a + table->steps[j];
+        }
+        else
+        {
+            const rinterpolate_counter_t b = a + table->steps[j];
+            for(m=length;m-->0;)
+            {
+                sum[2*m+1] = sum[m] + b;
+                sum[2*m] = sum[m] + a;
+            }
+            length *= 2;
+            f[k++] = v;
+        }
+    }
+
+    for(m=0;m<length;m++)
+    {
+        sum[m] += base;
+
+        /* watch for table overrun */
+        if(unlikely(sum[m]>=table->nnodes))
+            sum[m] = sum[m]%table->nnodes;
+    }
+
+    hypertable->n_active = k;
+    hypertable->active_length = length;
+}
@@ -0,0 +1,36 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * The functions through which librinterpolate allocates and frees
+ * its memory: the standard *alloc unless changed.
+ */
+struct rinterpolate_allocator_t rinterpolate_allocator = {
+    malloc,
+    calloc,
+    realloc,
+    free
+};
+
+/*
+ * Set the allocator of librinterpolate, or restore the
+ * standard *alloc if allocator is NULL.
+ *
+ * Memory must be freed by the allocator that allocated it, so
+ * only change the allocator when nothing is allocated.
+ */
+
+void rinterpolate_set_allocator(const struct rinterpolate_allocator_t * const allocator)
+{
+    if(allocator == NULL)
+    {
+        rinterpolate_allocator.malloc_function = malloc;
+        rinterpolate_allocator.calloc_function = calloc;
+        rinterpolate_allocator.realloc_function = realloc;
+        rinterpolate_allocator.free_function = free;
+    }
+    else
+    {
+        rinterpolate_allocator = *allocator;
+    }
+}
@@ -0,0 +1,51 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+
+/*
+ * Turn the automatic sizing of the cache of the table on or off
+ * (see rinterpolate_adapt_cache). When turned on, the cache starts
+ * with RINTERPOLATE_CACHE_AUTO_START lines, keeping the lines it
+ * already has. When turned off, the cache keeps its size until
+ * it is resized.
+ *
+ * Returns 0, or RINTERPOLATE_CALLOC_FAILED if the statistics could
+ * not be allocated, in which case the sizing is not automatic.
+ */
+
+rinterpolate_counter_t rinterpolate_set_cache_auto(struct rinterpolate_table_t * RESTRICT const table,
+                                                   const rinterpolate_Boolean_t automatic)
+{
+    Safe_free(table->cache_stats);
+
+    if(automatic == TRUE)
+    {
+        table->cache_stats = Rinterpolate_calloc(1,sizeof(struct rinterpolate_cache_stats_t));
+        if(unlikely(table->cache_stats == NULL))
+        {
+            return RINTERPOLATE_CALLOC_FAILED;
+        }
+        table->cache_stats->hit_rate = -1.0;
+        table->cache_stats->retry_windows = RINTERPOLATE_CACHE_AUTO_RETRY;
+        table->cache_stats->retry_length = Min(8*RINTERPOLATE_CACHE_AUTO_START,
+                                               RINTERPOLATE_CACHE_AUTO_MAX);
+
+        /* time the clock, which is subtracted from the timings */
+        {
+            int i;
+            const double t0 = rinterpolate_clock();
+            for(i=0;i<16;i++)
+            {
+                rinterpolate_clock();
+            }
+            table->cache_stats->clock_cost = (rinterpolate_clock() - t0) / 17.0;
+        }
+        if(table->cache_length != RINTERPOLATE_CACHE_AUTO_START)
+        {
+            rinterpolate_resize_cache(table,RINTERPOLATE_CACHE_AUTO_START);
+        }
+    }
+    return 0;
+}
+#endif // RINTERPOLATE_CACHE
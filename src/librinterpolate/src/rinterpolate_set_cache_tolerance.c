@@ -0,0 +1,74 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+
+/*
+ * Set the tolerances with which the parameters x are quantized
+ * before they are looked up in the cache of results of the table
+ * (see rinterpolate_quantize), so that x that differ only a
+ * little, e.g. in the last bits, give the same cache key.
+ *
+ * atol and rtol are arrays of n absolute and relative tolerances,
+ * or NULL. On each axis j, x[j] is changed by at most atol[j] if it
+ * is > 0, else by at most rtol[j]*|x[j]| if that is > 0, else not at
+ * all. Both NULL turns the quantization off.
+ *
+ * The cache is cleared.
+ *
+ * Returns 0, or RINTERPOLATE_CALLOC_FAILED if the memory could not
+ * be allocated, in which case there is no quantization.
+ */
+
+rinterpolate_counter_t rinterpolate_set_cache_tolerance(struct rinterpolate_table_t * RESTRICT const table,
+                                                        const rinterpolate_float_t * const atol,
+                                                        const rinterpolate_float_t * const rtol)
+{
+    rinterpolate_counter_t j;
+
+    Safe_free(table->cache_quantum);
+    Safe_free(table->cache_round_bits);
+    Safe_free(table->cache_x);
+    rinterpolate_clear_cache(table);
+
+    if(atol == NULL && rtol == NULL)
+    {
+        return 0;
+    }
+
+    table->cache_quantum = Rinterpolate_malloc(table->n_float_sizeof);
+    table->cache_round_bits = Rinterpolate_malloc(sizeof(rinterpolate_counter_t) * table->n);
+    table->cache_x = Rinterpolate_malloc(table->n_float_sizeof);
+    if(unlikely(table->cache_quantum == NULL ||
+                table->cache_round_bits == NULL ||
+                table->cache_x == NULL))
+    {
+        Safe_free(table->cache_quantum);
+        Safe_free(table->cache_round_bits);
+        Safe_free(table->cache_x);
+        return RINTERPOLATE_CALLOC_FAILED;
+    }
+
+    for(j=0;j<table->n;j++)
+    {
+        const rinterpolate_float_t a = atol != NULL ? atol[j] : 0.0;
+        const rinterpolate_float_t b = rtol != NULL ? rtol[j] : 0.0;
+
+        /* absolute: round to the nearest multiple of 2*atol */
+        table->cache_quantum[j] = a > 0.0 ? 2.0*a : 0.0;
+
+        /*
+         * relative: round off the low mantissa bits, which changes
+         * x by at most 2^(bits-53)*|x|, so bits = floor(log2(rtol))+53
+         */
+        table->cache_round_bits[j] = 0;
+        if(!(a > 0.0) && b > 0.0)
+        {
+            const int bits = (int)floor(log2(b)) + 53;
+            table->cache_round_bits[j] = bits < 0 ? 0 : bits > 52 ? 52 : (rinterpolate_counter_t)bits;
+        }
+    }
+
+    return 0;
+}
+#endif // RINTERPOLATE_CACHE
@@ -0,0 +1,49 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Mark the axes j of the table for which categorical[j] is TRUE
+ * as exact-match (categorical) axes, e.g. labels or integer flags
+ * between which interpolation is meaningless, or none if
+ * categorical is NULL.
+ *
+ * On these axes x selects the nearest grid value (the lower at
+ * exactly half way), which is the only corner of the hypercube on
+ * the axis: the interpolation factor is 0, so the uncached
+ * interpolation (see rinterpolate_search_pruned) gathers only
+ * 2^(n-k) lines with k exact-match axes.
+ *
+ * The caches are cleared, because the results change.
+ *
+ * Returns 0, or RINTERPOLATE_CALLOC_FAILED if the memory could not
+ * be allocated, in which case no axis is exact-match.
+ */
+
+rinterpolate_counter_t rinterpolate_set_categorical(struct rinterpolate_table_t * RESTRICT const table,
+                                                    const rinterpolate_Boolean_t * const categorical)
+{
+    rinterpolate_counter_t j;
+
+    Safe_free(table->categorical);
+#ifdef RINTERPOLATE_CACHE
+    rinterpolate_clear_cache(table);
+#endif
+
+    if(categorical == NULL)
+    {
+        return 0;
+    }
+
+    table->categorical = Rinterpolate_malloc(sizeof(rinterpolate_Boolean_t) * Max(table->n,1));
+    if(unlikely(table->categorical == NULL))
+    {
+        return RINTERPOLATE_CALLOC_FAILED;
+    }
+
+    for(j=0;j<table->n;j++)
+    {
+        table->categorical[j] = Boolean_(categorical[j]);
+    }
+
+    return 0;
+}
@@ -0,0 +1,48 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Set the memory layout of the table data used to construct
+ * the hypercube.
+ *
+ * In a row-major table, the 2^n corner lines of a cell are
+ * steps[j]*line_length apart, so for a high-dimensional table
+ * each interpolation touches 2^n distant cache lines and pages.
+ *
+ * With tile > 1 we make a copy of the data in which the grid is
+ * cut into tiles of tile^n nodes, each of which is contiguous in
+ * memory (see rinterpolate_tiled_line). The corners of a cell then
+ * lie in the same or neighbouring tiles. With tile = 2, the corners
+ * of the cells with even indices on all axes are one contiguous
+ * block of 2^n lines.
+ *
+ * The copy only holds the d data items of each line, which is all
+ * the hypercube gathers read, so it takes l*d floats on top of the
+ * table. The table cannot be tiled in place: its (row-major) lines
+ * are still used to set up the steps, varcount and presearch arrays,
+ * to identify the table, and by the caller (e.g. to append to it).
+ *
+ * tile = 0 or 1 restores the row-major layout, as does a table
+ * that is not a regular grid (for which varcount does not
+ * multiply up to the number of lines) and a ragged table.
+ */
+
+void rinterpolate_set_layout(struct rinterpolate_table_t * RESTRICT const table,
+                             const rinterpolate_counter_t tile)
+{
+    Safe_free(table->layout_data);
+    table->tile = 0;
+
+    size_t nnodes = 1;
+    rinterpolate_counter_t j;
+    for(j=0;j<table->n;j++)
+    {
+        nnodes *= table->varcount[j];
+    }
+
+    if(tile > 1 && nnodes == table->l && table->mask == NULL)
+    {
+        table->tile = tile;
+        rinterpolate_update_layout(table,0);
+    }
+}
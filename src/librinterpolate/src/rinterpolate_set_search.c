@@ -0,0 +1,96 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Set the search algorithm of each axis of the table to
+ * methods[j], one of the RINTERPOLATE_SEARCH_* (see
+ * rinterpolate_search_axis), or to binary searches on every axis if
+ * methods is NULL.
+ *
+ * The RINTERPOLATE_SEARCH_INDEXED axes have an index made of
+ * RINTERPOLATE_SEARCH_BUCKETS uniform buckets per grid interval,
+ * each of which stores the index of the grid value found by a binary
+ * search at its start. This is only where the search starts, so the
+ * results are still right (just slower) if the grid is later changed
+ * by rinterpolate_append_lines or rinterpolate_make_ragged.
+ *
+ * The results are the same with any method.
+ *
+ * Returns 0, or RINTERPOLATE_CALLOC_FAILED (in which case every axis
+ * is left with binary searches).
+ */
+
+rinterpolate_counter_t rinterpolate_set_search(struct rinterpolate_table_t * RESTRICT const table,
+                                               const rinterpolate_counter_t * const methods)
+{
+    rinterpolate_counter_t j;
+    rinterpolate_Boolean_t binary = TRUE;
+
+    if(table->search != NULL)
+    {
+        for(j=0;j<table->n;j++)
+        {
+            Safe_free(table->search[j].guess);
+        }
+        Safe_free(table->search);
+    }
+
+    if(methods != NULL)
+    {
+        for(j=0;j<table->n;j++)
+        {
+            if(methods[j] != RINTERPOLATE_SEARCH_BINARY)
+            {
+                binary = FALSE;
+            }
+        }
+    }
+    if(binary == TRUE)
+    {
+        return 0;
+    }
+
+    table->search = Rinterpolate_calloc(table->n,sizeof(struct rinterpolate_search_t));
+    if(unlikely(table->search == NULL))
+    {
+        return RINTERPOLATE_CALLOC_FAILED;
+    }
+
+    for(j=0;j<table->n;j++)
+    {
+        struct rinterpolate_search_t * const search = table->search + j;
+        const rinterpolate_float_t * const tpre = table->presearch[j];
+        const rinterpolate_counter_t varcount = table->varcount[j];
+
+        search->method = methods[j];
+        search->last = 0;
+
+        if(search->method == RINTERPOLATE_SEARCH_INDEXED)
+        {
+            struct rinterpolate_search_t binary_search = {0};
+            rinterpolate_counter_t k;
+
+            search->nbuckets = RINTERPOLATE_SEARCH_BUCKETS * Max(varcount,2) - RINTERPOLATE_SEARCH_BUCKETS;
+            search->guess = Rinterpolate_calloc(search->nbuckets,sizeof(rinterpolate_counter_t));
+            if(unlikely(search->guess == NULL))
+            {
+                rinterpolate_set_search(table,NULL);
+                return RINTERPOLATE_CALLOC_FAILED;
+            }
+
+            if(varcount > 1)
+            {
+                search->scale = search->nbuckets / (tpre[varcount-1] - tpre[0]);
+                for(k=0;k<search->nbuckets;k++)
+                {
+                    search->guess[k] = rinterpolate_search_axis(&binary_search,
+                                                                tpre,
+                                                                varcount,
+                                                                tpre[0] + k / search->scale);
+                }
+            }
+        }
+    }
+
+    return 0;
+}
@@ -0,0 +1,406 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Vectorized kernels for the inner loops of rinterpolate, and their
+ * selection at run time.
+ *
+ * The kernels are compiled for each instruction set with target
+ * attributes, so a library built for generic x86-64 still uses
+ * AVX2 or AVX-512 on CPUs that have them. Which kernels are used
+ * is chosen from the CPU (cpuid) by rinterpolate_set_simd, which is
+ * done automatically when the first dataspace is allocated, but
+ * can also be called to force a lower level, e.g. for benchmarking.
+ *
+ * The AVX2 and AVX-512 kernels use fused multiply-adds, so their
+ * results may differ from the others in the last bit.
+ *
+ * The kernels are
+ *
+ * reduce_step : for each of the lines at 0, line_length, ... < g of data,
+ *               set its d items a = u*a + v*b, where b are the items
+ *               of the line g further on (one dimension of
+ *               rinterpolate_reduce)
+ *
+ * axpy        : r += w*x for d items
+ *
+ * blend       : r = u*a + v*b for d items, exactly as reduce_step
+ *               but out of place (see rinterpolate_batch_grouped)
+ */
+
+#if (defined __x86_64__ || defined __i386__) &&         \
+    (defined __GNUC__ || defined __clang__)
+#define RINTERPOLATE_X86_SIMD
+#include <immintrin.h>
+#endif
+
+/* the generic kernels, which the compiler may vectorize */
+static void reduce_step_generic(rinterpolate_float_t * RESTRICT const data,
+                                const rinterpolate_counter_t g,
+                                const rinterpolate_counter_t line_length,
+                                const rinterpolate_counter_t d,
+                                const rinterpolate_float_t u,
+                                const rinterpolate_float_t v)
+{
+    rinterpolate_counter_t i,k;
+    for(i=0;i<g;i+=line_length)
+    {
+        rinterpolate_float_t * RESTRICT const a = data + i;
+        const rinterpolate_float_t * RESTRICT const b = data + i + g;
+        for(k=0;k<d;k++)
+        {
+            a[k] = u*a[k] + v*b[k];
+        }
+    }
+}
+
+static void axpy_generic(rinterpolate_float_t * RESTRICT const r,
+                         const rinterpolate_float_t * RESTRICT const x,
+                         const rinterpolate_float_t w,
+                         const rinterpolate_counter_t d)
+{
+    rinterpolate_counter_t k;
+    for(k=0;k<d;k++)
+    {
+        r[k] += w*x[k];
+    }
+}
+
+static void blend_generic(rinterpolate_float_t * RESTRICT const r,
+                          const rinterpolate_float_t * RESTRICT const a,
+                          const rinterpolate_float_t * RESTRICT const b,
+                          const rinterpolate_counter_t d,
+                          const rinterpolate_float_t u,
+                          const rinterpolate_float_t v)
+{
+    rinterpolate_counter_t k;
+    for(k=0;k<d;k++)
+    {
+        r[k] = u*a[k] + v*b[k];
+    }
+}
+
+#ifdef RINTERPOLATE_X86_SIMD
+
+/* SSE2: two doubles at a time */
+__attribute__((target("sse2")))
+static void reduce_step_sse2(rinterpolate_float_t * RESTRICT const data,
+                             const rinterpolate_counter_t g,
+                             const rinterpolate_counter_t line_length,
+                             const rinterpolate_counter_t d,
+                             const rinterpolate_float_t u,
+                             const rinterpolate_float_t v)
+{
+    const __m128d uu = _mm_set1_pd(u);
+    const __m128d vv = _mm_set1_pd(v);
+    rinterpolate_counter_t i,k;
+    for(i=0;i<g;i+=line_length)
+    {
+        rinterpolate_float_t * RESTRICT const a = data + i;
+        const rinterpolate_float_t * RESTRICT const b = data + i + g;
+        for(k=0;k+2<=d;k+=2)
+        {
+            _mm_storeu_pd(a+k,
+                          _mm_add_pd(_mm_mul_pd(uu,_mm_loadu_pd(a+k)),
+                                     _mm_mul_pd(vv,_mm_loadu_pd(b+k))));
+        }
+        for(;k<d;k++)
+        {
+            a[k] = u*a[k] + v*b[k];
+        }
+    }
+}
+
+__attribute__((target("sse2")))
+static void axpy_sse2(rinterpolate_float_t * RESTRICT const r,
+                      const rinterpolate_float_t * RESTRICT const x,
+                      const rinterpolate_float_t w,
+                      const rinterpolate_counter_t d)
+{
+    const __m128d ww = _mm_set1_pd(w);
+    rinterpolate_counter_t k;
+    for(k=0;k+2<=d;k+=2)
+    {
+        _mm_storeu_pd(r+k,
+                      _mm_add_pd(_mm_loadu_pd(r+k),
+                                 _mm_mul_pd(ww,_mm_loadu_pd(x+k))));
+    }
+    for(;k<d;k++)
+    {
+        r[k] += w*x[k];
+    }
+}
+
+__attribute__((target("sse2")))
+static void blend_sse2(rinterpolate_float_t * RESTRICT const r,
+                       const rinterpolate_float_t * RESTRICT const a,
+                       const rinterpolate_float_t * RESTRICT const b,
+                       const rinterpolate_counter_t d,
+                       const rinterpolate_float_t u,
+                       const rinterpolate_float_t v)
+{
+    const __m128d uu = _mm_set1_pd(u);
+    const __m128d vv = _mm_set1_pd(v);
+    rinterpolate_counter_t k;
+    for(k=0;k+2<=d;k+=2)
+    {
+        _mm_storeu_pd(r+k,
+                      _mm_add_pd(_mm_mul_pd(uu,_mm_loadu_pd(a+k)),
+                                 _mm_mul_pd(vv,_mm_loadu_pd(b+k))));
+    }
+    for(;k<d;k++)
+    {
+        r[k] = u*a[k] + v*b[k];
+    }
+}
+
+/* AVX2: four doubles at a time */
+__attribute__((target("avx2,fma")))
+static void reduce_step_avx2(rinterpolate_float_t * RESTRICT const data,
+                             const rinterpolate_counter_t g,
+                             const rinterpolate_counter_t line_length,
+                             const rinterpolate_counter_t d,
+                             const rinterpolate_float_t u,
+                             const rinterpolate_float_t v)
+{
+    const __m256d uu = _mm256_set1_pd(u);
+    const __m256d vv = _mm256_set1_pd(v);
+    rinterpolate_counter_t i,k;
+    for(i=0;i<g;i+=line_length)
+    {
+        rinterpolate_float_t * RESTRICT const a = data + i;
+        const rinterpolate_float_t * RESTRICT const b = data + i + g;
+        for(k=0;k+4<=d;k+=4)
+        {
+            _mm256_storeu_pd(a+k,
+                             _mm256_fmadd_pd(vv,
+                                             _mm256_loadu_pd(b+k),
+                                             _mm256_mul_pd(uu,_mm256_loadu_pd(a+k))));
+        }
+        for(;k<d;k++)
+        {
+            a[k] = u*a[k] + v*b[k];
+        }
+    }
+}
+
+__attribute__((target("avx2,fma")))
+static void axpy_avx2(rinterpolate_float_t * RESTRICT const r,
+                      const rinterpolate_float_t * RESTRICT const x,
+                      const rinterpolate_float_t w,
+                      const rinterpolate_counter_t d)
+{
+    const __m256d ww = _mm256_set1_pd(w);
+    rinterpolate_counter_t k;
+    for(k=0;k+4<=d;k+=4)
+    {
+        _mm256_storeu_pd(r+k,
+                         _mm256_fmadd_pd(ww,
+                                         _mm256_loadu_pd(x+k),
+                                         _mm256_loadu_pd(r+k)));
+    }
+    for(;k<d;k++)
+    {
+        r[k] += w*x[k];
+    }
+}
+
+__attribute__((target("avx2,fma")))
+static void blend_avx2(rinterpolate_float_t * RESTRICT const r,
+                       const rinterpolate_float_t * RESTRICT const a,
+                       const rinterpolate_float_t * RESTRICT const b,
+                       const rinterpolate_counter_t d,
+                       const rinterpolate_float_t u,
+                       const rinterpolate_float_t v)
+{
+    const __m256d uu = _mm256_set1_pd(u);
+    const __m256d vv = _mm256_set1_pd(v);
+    rinterpolate_counter_t k;
+    for(k=0;k+4<=d;k+=4)
+    {
+        _mm256_storeu_pd(r+k,
+                         _mm256_fmadd_pd(vv,
+                                         _mm256_loadu_pd(b+k),
+                                         _mm256_mul_pd(uu,_mm256_loadu_pd(a+k))));
+    }
+    for(;k<d;k++)
+    {
+        r[k] = u*a[k] + v*b[k];
+    }
+}
+
+/* AVX-512: eight doubles at a time, with a masked remainder */
+__attribute__((target("avx512f")))
+static void reduce_step_avx512(rinterpolate_float_t * RESTRICT const data,
+                               const rinterpolate_counter_t g,
+                               const rinterpolate_counter_t line_length,
+                               const rinterpolate_counter_t d,
+                               const rinterpolate_float_t u,
+                               const rinterpolate_float_t v)
+{
+    const __m512d uu = _mm512_set1_pd(u);
+    const __m512d vv = _mm512_set1_pd(v);
+    const __mmask8 tail = (__mmask8)((1u << (d & 7)) - 1);
+    rinterpolate_counter_t i,k;
+    for(i=0;i<g;i+=line_length)
+    {
+        rinterpolate_float_t * RESTRICT const a = data + i;
+        const rinterpolate_float_t * RESTRICT const b = data + i + g;
+        for(k=0;k+8<=d;k+=8)
+        {
+            _mm512_storeu_pd(a+k,
+                             _mm512_fmadd_pd(vv,
+                                             _mm512_loadu_pd(b+k),
+                                             _mm512_mul_pd(uu,_mm512_loadu_pd(a+k))));
+        }
+        if(tail)
+        {
+            _mm512_mask_storeu_pd(a+k,
+                                  tail,
+                                  _mm512_fmadd_pd(vv,
+                                                  _mm512_maskz_loadu_pd(tail,b+k),
+                                                  _mm512_mul_pd(uu,_mm512_maskz_loadu_pd(tail,a+k))));
+        }
+    }
+}
+
+__attribute__((target("avx512f")))
+static void axpy_avx512(rinterpolate_float_t * RESTRICT const r,
+                        const rinterpolate_float_t * RESTRICT const x,
+                        const rinterpolate_float_t w,
+                        const rinterpolate_counter_t d)
+{
+    const __m512d ww = _mm512_set1_pd(w);
+    const __mmask8 tail = (__mmask8)((1u << (d & 7)) - 1);
+    rinterpolate_counter_t k;
+    for(k=0;k+8<=d;k+=8)
+    {
+        _mm512_storeu_pd(r+k,
+                         _mm512_fmadd_pd(ww,
+                                         _mm512_loadu_pd(x+k),
+                                         _mm512_loadu_pd(r+k)));
+    }
+    if(tail)
+    {
+        _mm512_mask_storeu_pd(r+k,
+                              tail,
+                              _mm512_fmadd_pd(ww,
+                                              _mm512_maskz_loadu_pd(tail,x+k),
+                                              _mm512_maskz_loadu_pd(tail,r+k)));
+    }
+}
+
+__attribute__((target("avx512f")))
+static void blend_avx512(rinterpolate_float_t * RESTRICT const r,
+                         const rinterpolate_float_t * RESTRICT const a,
+                         const rinterpolate_float_t * RESTRICT const b,
+                         const rinterpolate_counter_t d,
+                         const rinterpolate_float_t u,
+                         const rinterpolate_float_t v)
+{
+    const __m512d uu = _mm512_set1_pd(u);
+    const __m512d vv = _mm512_set1_pd(v);
+    const __mmask8 tail = (__mmask8)((1u << (d & 7)) - 1);
+    rinterpolate_counter_t k;
+    for(k=0;k+8<=d;k+=8)
+    {
+        _mm512_storeu_pd(r+k,
+                         _mm512_fmadd_pd(vv,
+                                         _mm512_loadu_pd(b+k),
+                                         _mm512_mul_pd(uu,_mm512_loadu_pd(a+k))));
+    }
+    if(tail)
+    {
+        _mm512_mask_storeu_pd(r+k,
+                              tail,
+                              _mm512_fmadd_pd(vv,
+                                              _mm512_maskz_loadu_pd(tail,b+k),
+                                              _mm512_mul_pd(uu,_mm512_maskz_loadu_pd(tail,a+k))));
+    }
+}
+
+#endif // RINTERPOLATE_X86_SIMD
+
+/*
+ * The kernels in use: the generic ones until rinterpolate_set_simd
+ * is called (level -1)
+ */
+struct rinterpolate_simd_t rinterpolate_simd = {
+    reduce_step_generic,
+    axpy_generic,
+    blend_generic,
+    -1
+};
+
+/*
+ * Return the highest level of SIMD kernels (RINTERPOLATE_SIMD_*)
+ * supported by the CPU.
+ */
+
+rinterpolate_signed_counter_t rinterpolate_simd_supported(void)
+{
+#ifdef RINTERPOLATE_X86_SIMD
+    __builtin_cpu_init();
+    if(__builtin_cpu_supports("avx512f"))
+    {
+        return RINTERPOLATE_SIMD_AVX512;
+    }
+    else if(__builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma"))
+    {
+        return RINTERPOLATE_SIMD_AVX2;
+    }
+    else if(__builtin_cpu_supports("sse2"))
+    {
+        return RINTERPOLATE_SIMD_SSE2;
+    }
+#endif // RINTERPOLATE_X86_SIMD
+    return RINTERPOLATE_SIMD_GENERIC;
+}
+
+/*
+ * Use the SIMD kernels of the given level (RINTERPOLATE_SIMD_*), or
+ * the highest level supported by the CPU if level is RINTERPOLATE_SIMD_AUTO.
+ *
+ * Returns the level in use, or -1 (and nothing is changed) if the
+ * level is not supported by the CPU.
+ */
+
+rinterpolate_signed_counter_t rinterpolate_set_simd(const rinterpolate_signed_counter_t level)
+{
+    const rinterpolate_signed_counter_t supported = rinterpolate_simd_supported();
+    const rinterpolate_signed_counter_t use =
+        level == RINTERPOLATE_SIMD_AUTO ? supported : level;
+
+    if(use < RINTERPOLATE_SIMD_GENERIC || use > supported)
+    {
+        return -1;
+    }
+
+    switch(use)
+    {
+#ifdef RINTERPOLATE_X86_SIMD
+    case RINTERPOLATE_SIMD_AVX512:
+        rinterpolate_simd.reduce_step = reduce_step_avx512;
+        rinterpolate_simd.axpy = axpy_avx512;
+        rinterpolate_simd.blend = blend_avx512;
+        break;
+    case RINTERPOLATE_SIMD_AVX2:
+        rinterpolate_simd.reduce_step = reduce_step_avx2;
+        rinterpolate_simd.axpy = axpy_avx2;
+        rinterpolate_simd.blend = blend_avx2;
+        break;
+    case RINTERPOLATE_SIMD_SSE2:
+        rinterpolate_simd.reduce_step = reduce_step_sse2;
+        rinterpolate_simd.axpy = axpy_sse2;
+        rinterpolate_simd.blend = blend_sse2;
+        break;
+#endif // RINTERPOLATE_X86_SIMD
+    default:
+        rinterpolate_simd.reduce_step = reduce_step_generic;
+        rinterpolate_simd.axpy = axpy_generic;
+        rinterpolate_simd.blend = blend_generic;
+    }
+    rinterpolate_simd.level = use;
+
+    return use;
+}
@@ -0,0 +1,96 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Simplex interpolation: set r to the linear interpolation of the
+ * data over the n+1 vertices of the simplex around x, rather than the
+ * multilinear interpolation over the 2^n corners of the hypercube.
+ *
+ * The hypercube is split into n! simplices (the Kuhn triangulation).
+ * With the axes ordered by decreasing interpolation factor,
+ * f[o0] >= f[o1] >= ... >= f[o(n-1)], the simplex around x has the
+ * vertices v0 = the lower corner and vk = v(k-1) one step up axis o(k-1),
+ * with weights
+ *
+ * w0 = 1 - f[o0], wk = f[o(k-1)] - f[ok], wn = f[o(n-1)]
+ *
+ * This is exact at the nodes of the grid and continuous, but is
+ * a different interpolant from the multilinear one inside the cells.
+ * It costs O(n log n + n d) instead of O(2^n d), so it is much faster
+ * for tables with many parameters.
+ *
+ * As in the interpolation, x is forced into the range of the table.
+ * If a vertex with a non-zero weight is missing from a ragged table,
+ * r is set to NaN.
+ */
+
+void rinterpolate_simplex(struct rinterpolate_table_t * RESTRICT const table,
+                          const rinterpolate_float_t * RESTRICT const x,
+                          rinterpolate_float_t * RESTRICT const r)
+{
+    const struct rinterpolate_hypertable_t * hypertable = table->hypertable;
+    const rinterpolate_float_t * RESTRICT const f = hypertable->f;
+
+    /*
+     * The sum array of the hypertable is not used here: we use
+     * it for the order of the axes (it has 2^n >= n elements)
+     */
+    rinterpolate_counter_t * RESTRICT const order = hypertable->sum;
+    rinterpolate_counter_t i,j,k;
+    rinterpolate_counter_t node = 0;
+
+    rinterpolate_search_brackets(table,x);
+
+    /*
+     * Order the axes by decreasing interpolation factor: n is
+     * small, so an insertion sort is fast
+     */
+    for(j=0;j<table->n;j++)
+    {
+        k = j;
+        while(k>0 && f[order[k-1]] < f[j])
+        {
+            order[k] = order[k-1];
+            k--;
+        }
+        order[k] = j;
+        node += hypertable->index[j] * table->steps[j];
+    }
+
+    memset(r,0,table->d_float_sizeof);
+
+    /*
+     * Walk from the lower corner up one axis at a time,
+     * adding the data at each vertex
+     */
+    rinterpolate_float_t previous = 1.0;
+    for(k=0;k<=table->n;k++)
+    {
+        const rinterpolate_float_t next = k < table->n ? f[order[k]] : 0.0;
+        const rinterpolate_float_t w = previous - next;
+
+        if(w > 0.0)
+        {
+            const rinterpolate_float_t * const node_data = rinterpolate_node_data(table,node);
+            if(unlikely(node_data == NULL))
+            {
+                for(i=0;i<table->d;i++)
+                {
+                    r[i] = NAN;
+                }
+                return;
+            }
+            rinterpolate_simd.axpy(r,node_data,w,table->d);
+        }
+
+        if(k < table->n)
+        {
+            /* axes with one value have f = 0 and no upper node */
+            if(likely(table->varcount[order[k]] > 1))
+            {
+                node += table->steps[order[k]];
+            }
+            previous = next;
+        }
+    }
+}
@@ -0,0 +1,57 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Multiply the sparse interpolation matrix of k rows, in compressed
+ * sparse row (CSR) format, by columns of the table data:
+ *
+ * r[p][i] = sum_{c=indptr[p]}^{indptr[p+1]-1} weights[c] * data[indices[c]][columns[i]]
+ *
+ * data is a table of lines of line_length items. A negative index
+ * (a missing node of a ragged table) gives NaN.
+ */
+
+void rinterpolate_sparse_apply(const rinterpolate_float_t * RESTRICT const data,
+                               const size_t line_length,
+                               const size_t ncolumns,
+                               const int64_t * RESTRICT const columns,
+                               const size_t k,
+                               const int64_t * RESTRICT const indptr,
+                               const int64_t * RESTRICT const indices,
+                               const rinterpolate_float_t * RESTRICT const weights,
+                               rinterpolate_float_t * RESTRICT const r)
+{
+    size_t p,i;
+    int64_t c;
+
+    for(p=0;p<k;p++)
+    {
+        rinterpolate_float_t * const pr = r + p*ncolumns;
+
+        for(i=0;i<ncolumns;i++)
+        {
+            pr[i] = 0.0;
+        }
+
+        for(c=indptr[p];c<indptr[p+1];c++)
+        {
+            const rinterpolate_float_t w = weights[c];
+            if(likely(indices[c] >= 0))
+            {
+                const rinterpolate_float_t * const line =
+                    data + (size_t)indices[c]*line_length;
+                for(i=0;i<ncolumns;i++)
+                {
+                    pr[i] += w * line[columns[i]];
+                }
+            }
+            else
+            {
+                for(i=0;i<ncolumns;i++)
+                {
+                    pr[i] = NAN;
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,67 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+#ifdef RINTERPOLATE_CACHE
+
+/*
+ * Store the hypercube of the table, just made by
+ * rinterpolate_search_table and rinterpolate_construct_hypercube
+ * (and not yet reduced), in the cell cache, replacing the
+ * oldest cell if the cache is full.
+ *
+ * With the hypercube (only the d data items of each line) are
+ * stored the lower and upper grid values of the cell on each axis,
+ * and the limits of x for which rinterpolate_search_brackets would
+ * find this cell: x > above and x <= below. These are infinite at
+ * the edges of the grid, where x is forced into the range of the
+ * table, and on axes with only one value. On exact-match axes
+ * (see rinterpolate_set_categorical) they are half way to the
+ * neighbouring grid values, and the cell spans a single value.
+ */
+
+void rinterpolate_store_cell_cache(struct rinterpolate_table_t * RESTRICT const table)
+{
+    const struct rinterpolate_hypertable_t * const hypertable = table->hypertable;
+    const rinterpolate_counter_t n = table->n;
+    rinterpolate_float_t * const line = Rinterpolate_cell_cache_line(table->cell_cache_next);
+    rinterpolate_float_t * const lower = line;
+    rinterpolate_float_t * const upper = line + n;
+    rinterpolate_float_t * const above = line + 2*n;
+    rinterpolate_float_t * const below = line + 3*n;
+    rinterpolate_float_t * const cube = line + 4*n;
+    rinterpolate_counter_t j,c;
+
+    for(j=0;j<n;j++)
+    {
+        const rinterpolate_float_t * const tpre = table->presearch[j];
+        const rinterpolate_counter_t a = hypertable->index[j];
+        const rinterpolate_counter_t b = table->varcount[j];
+        if(table->categorical != NULL && table->categorical[j] == TRUE)
+        {
+            /* exact-match axis: x selects the nearest grid value */
+            lower[j] = tpre[a];
+            upper[j] = tpre[a];
+            above[j] = a==0 ? -INFINITY : 0.5 * (tpre[a-1] + tpre[a]);
+            below[j] = a+1>=b ? INFINITY : 0.5 * (tpre[a] + tpre[a+1]);
+        }
+        else
+        {
+            lower[j] = tpre[a];
+            upper[j] = b>1 ? tpre[a+1] : tpre[a];
+            above[j] = a==0 ? -INFINITY : tpre[a];
+            below[j] = (b<=1 || a+2==b) ? INFINITY : tpre[a+1];
+        }
+    }
+
+    for(c=0;c<table->hypertable_length;c++)
+    {
+        memcpy(cube + c*table->d,
+               hypertable->data + c*table->line_length + n,
+               table->d_float_sizeof);
+    }
+
+    table->cell_cache_match_line = table->cell_cache_next;
+    table->cell_cache_next = (table->cell_cache_next + 1) % table->cell_cache_length;
+    table->cell_cache_used = Min(table->cell_cache_used + 1,table->cell_cache_length);
+}
+#endif // RINTERPOLATE_CACHE
@@ -0,0 +1,97 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Set in memory the number of bytes allocated by librinterpolate
+ * for the table, by structure. The data of the table belong to
+ * the caller and are not counted.
+ */
+
+void rinterpolate_table_memory(const struct rinterpolate_table_t * RESTRICT const table,
+                               struct rinterpolate_memory_t * RESTRICT const memory)
+{
+    memset(memory,0,sizeof(struct rinterpolate_memory_t));
+
+    memory->table = sizeof(struct rinterpolate_table_t);
+    if(table->steps != NULL)
+    {
+        memory->table += table->n * sizeof(rinterpolate_counter_t);
+    }
+    if(table->varcount != NULL)
+    {
+        memory->table += table->n * sizeof(rinterpolate_counter_t);
+    }
+    if(table->categorical != NULL)
+    {
+        memory->table += table->n * sizeof(rinterpolate_Boolean_t);
+    }
+
+#ifdef RINTERPOLATE_CACHE
+    if(table->cache != NULL)
+    {
+        memory->cache = (size_t)table->line_length * table->cache_length *
+            sizeof(rinterpolate_float_t);
+    }
+    if(table->cache_stats != NULL)
+    {
+        memory->cache += sizeof(struct rinterpolate_cache_stats_t);
+    }
+    if(table->cache_quantum != NULL)
+    {
+        memory->cache += 2 * table->n_float_sizeof +
+            table->n * sizeof(rinterpolate_counter_t);
+    }
+    if(table->cell_cache != NULL)
+    {
+        memory->cell_cache =
+            ((size_t)RINTERPOLATE_CELL_CACHE_LINE * table->cell_cache_length +
+             Max(table->hypertable_length/2,1) * table->d) *
+            sizeof(rinterpolate_float_t);
+    }
+#endif//RINTERPOLATE_CACHE
+
+#ifdef RINTERPOLATE_PRESEARCH
+    if(table->presearch != NULL)
+    {
+        rinterpolate_counter_t j;
+        memory->presearch = table->n * sizeof(rinterpolate_float_t *);
+        for(j=0;j<table->presearch_n;j++)
+        {
+            if(table->presearch[j] != NULL)
+            {
+                memory->presearch += table->varcount[j] * sizeof(rinterpolate_float_t);
+            }
+        }
+    }
+    if(table->search != NULL)
+    {
+        rinterpolate_counter_t j;
+        memory->presearch += table->n * sizeof(struct rinterpolate_search_t);
+        for(j=0;j<table->n;j++)
+        {
+            memory->presearch += table->search[j].nbuckets * sizeof(rinterpolate_counter_t);
+        }
+    }
+#endif//RINTERPOLATE_PRESEARCH
+
+    if(table->hypertable != NULL)
+    {
+        memory->hypertable =
+            sizeof(struct rinterpolate_hypertable_t) +
+            table->hypertable_length * table->line_length_sizeof +
+            table->n_float_sizeof +
+            table->sum_sizeof +
+            Max(table->n,1) * sizeof(rinterpolate_counter_t);
+    }
+
+    if(table->layout_data != NULL)
+    {
+        memory->layout = (size_t)table->l * table->d_float_sizeof;
+    }
+
+    if(table->mask != NULL)
+    {
+        const size_t nwords = ((size_t)table->nnodes + 63)/64;
+        memory->mask = nwords * (sizeof(uint64_t) + sizeof(rinterpolate_counter_t));
+    }
+}
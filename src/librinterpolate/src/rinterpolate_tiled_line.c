@@ -0,0 +1,46 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Given a line number in the (row-major) data table, return
+ * the line number in the tiled layout, see rinterpolate_set_layout.
+ *
+ * In the tiled layout, the parameter grid is cut into blocks
+ * (tiles) of table->tile nodes along each axis. The tiles are
+ * stored in row-major order, and so are the nodes in each tile.
+ * Tiles at the upper end of an axis are truncated if varcount
+ * is not a multiple of the tile size, so no padding is required.
+ *
+ * With a_j the index of the node on axis j, t_j = a_j/tile its tile and
+ * w_j = a_j%tile its position in the tile, the tiled line is
+ *
+ * sum_j t_j * tile * prod_{i<j} ext_i * prod_{i>j} varcount_i
+ *   + (row-major position of w in the tile)
+ *
+ * where ext_i is the extent of tile t_i along axis i.
+ */
+
+size_t Pure_function rinterpolate_tiled_line(const struct rinterpolate_table_t * RESTRICT const table,
+                                             const size_t line)
+{
+    const rinterpolate_counter_t tile = table->tile;
+    size_t offset = 0;     /* line number of the start of the tile */
+    size_t within = 0;     /* row-major position within the tile */
+    size_t prefix = 1;     /* product of the tile extents for axes < j */
+    rinterpolate_counter_t j;
+
+    for(j=0;j<table->n;j++)
+    {
+        const rinterpolate_counter_t a =
+            (line / table->steps[j]) % table->varcount[j];
+        const rinterpolate_counter_t t = a / tile;
+        const rinterpolate_counter_t ext = Min(tile, table->varcount[j] - t*tile);
+
+        /* number of nodes on axes > j is the number of steps on axis j */
+        offset += prefix * t * tile * table->steps[j];
+        within = within * ext + a % tile;
+        prefix *= ext;
+    }
+
+    return offset + within;
+}
@@ -0,0 +1,35 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Tell rinterpolate that the data (not the parameters) of the
+ * table with the given data have changed in place.
+ *
+ * The steps, varcount and presearch arrays depend only on the
+ * parameters, so they are kept. The cache of results is cleared
+ * and the data in the tiled copy, if any, are replaced.
+ *
+ * Nothing is done if the table is not (yet) set up.
+ */
+
+void rinterpolate_update_data(struct rinterpolate_data_t * RESTRICT const rinterpolate_data,
+                              const rinterpolate_float_t * RESTRICT const datatable)
+{
+    const rinterpolate_signed_counter_t table_id =
+        rinterpolate_id_table(rinterpolate_data,
+                              datatable);
+
+    if(table_id != -1)
+    {
+        struct rinterpolate_table_t * const table = rinterpolate_data->tables[table_id];
+
+#ifdef RINTERPOLATE_CACHE
+        rinterpolate_clear_cache(table);
+#endif
+
+        if(table->layout_data != NULL)
+        {
+            rinterpolate_update_layout(table,0);
+        }
+    }
+}
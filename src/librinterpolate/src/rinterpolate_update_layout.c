@@ -0,0 +1,41 @@
+#include "rinterpolate.h"
+#include "rinterpolate_internal.h"
+
+/*
+ * Place the data of the lines first to l-1 of the table in its
+ * tiled copy (see rinterpolate_set_layout), which is first resized
+ * to the l lines of the table.
+ *
+ * The place of a line in the tiled copy depends on varcount[0]
+ * only through the extent of the last tile along the first
+ * parameter, so when slices are appended (see
+ * rinterpolate_append_lines) only the lines from the start of the
+ * old last tile on have to be placed.
+ */
+
+void rinterpolate_update_layout(struct rinterpolate_table_t * RESTRICT const table,
+                                const rinterpolate_counter_t first)
+{
+    const size_t d = table->d;
+    size_t i;
+
+    table->layout_data = Rinterpolate_realloc(table->layout_data,
+                                              Max((size_t)table->l * table->d_float_sizeof,
+                                                  sizeof(rinterpolate_float_t)));
+
+#ifdef RINTERPOLATE_ALLOC_CHECKS
+    if(unlikely(table->layout_data==NULL))
+    {
+        rinterpolate_error(RINTERPOLATE_CALLOC_FAILED,
+                           "Failed to alloc layout_data\n",
+                           table->parent);
+    }
+#endif
+
+    for(i=first;i<table->l;i++)
+    {
+        memcpy(table->layout_data + rinterpolate_tiled_line(table,i) * d,
+               table->data + i * table->line_length + table->n,
+               table->d_float_sizeof);
+    }
+}
@@ -1,6 +1,7 @@
 #include <Python.h>
 #include "rinterpolate.h"
 #include <assert.h>
+#include <stddef.h>
 
 /************************************************************
  * python & rinterpolate api bindings.
@@ -37,6 +38,48 @@ static char rinterpolate_check_C_table_docstring[] =
     "Interface function to check the contents of the C_table";
 static char rinterpolate_wrapper_docstring[] =
     "Interface function to interpolate the table with the given input coefficients";
+static char rinterpolate_set_layout_wrapper_docstring[] =
+    "Interface function to set the memory layout (tile size) of the table data in the dataspace";
+static char rinterpolate_set_cell_cache_wrapper_docstring[] =
+    "Interface function to set the number of grid cells whose hypercubes are kept in the cell cache of the table";
+static char rinterpolate_set_cache_tolerance_wrapper_docstring[] =
+    "Interface function to set the absolute and relative tolerances with which the coefficients are quantized for the cache of the table";
+static char rinterpolate_set_search_wrapper_docstring[] =
+    "Interface function to set the search algorithm of each parameter of the table";
+static char rinterpolate_set_categorical_wrapper_docstring[] =
+    "Interface function to set which parameters of the table are categorical (exact-match) axes";
+static char rinterpolate_autotune_search_wrapper_docstring[] =
+    "Interface function to time the search algorithms of each parameter of the table on a buffer of k*nparams coefficients, and set each parameter to the fastest";
+static char rinterpolate_cache_info_wrapper_docstring[] =
+    "Interface function to get the length of the cache of the table and whether it is sized automatically";
+static char rinterpolate_set_ragged_wrapper_docstring[] =
+    "Interface function to set up the table in the dataspace as a ragged table, in which only the existing grid nodes are stored";
+static char rinterpolate_batch_wrapper_docstring[] =
+    "Interface function to interpolate the table on a buffer of k*nparams coefficients, writing k*ndata results into an output buffer, optionally grouping the coefficients by grid cell";
+static char rinterpolate_grid_wrapper_docstring[] =
+    "Interface function to interpolate the table on the Cartesian product of a tuple of nparams buffers of coordinates, writing prod(k_j)*ndata results into an output buffer";
+static char rinterpolate_locate_wrapper_docstring[] =
+    "Interface function to find the corner lines and weights of the hypercube around each of a buffer of k*nparams coefficients";
+static char rinterpolate_apply_weights_wrapper_docstring[] =
+    "Interface function to evaluate columns of a table from the corner lines and weights found by the locate wrapper";
+static char rinterpolate_sparse_apply_wrapper_docstring[] =
+    "Interface function to multiply a sparse (CSR) interpolation matrix by columns of a table";
+static char rinterpolate_update_C_table_docstring[] =
+    "Interface function to overwrite the data (not the parameters) of the C_table in place, keeping the search structures of the table";
+static char rinterpolate_append_C_table_docstring[] =
+    "Interface function to append slices along the first parameter to the C_table, growing its memory geometrically";
+static char rinterpolate_check_table_wrapper_docstring[] =
+    "Interface function to check that a range of lines of the table is on a regular, sorted grid";
+static char rinterpolate_fused_wrapper_docstring[] =
+    "Interface function to interpolate several data blocks that share the parameter grid of the table, searching the grid once per set of coefficients";
+static char rinterpolate_memory_usage_wrapper_docstring[] =
+    "Interface function to get the number of bytes allocated by librinterpolate for the table, by structure, and for the whole dataspace";
+static char rinterpolate_set_simd_docstring[] =
+    "Interface function to choose the level of the SIMD kernels of librinterpolate (-1 for the highest supported by the CPU), returning the level in use";
+static char rinterpolate_simd_level_docstring[] =
+    "Interface function to get the level of the SIMD kernels in use and the highest level supported by the CPU";
+static char rinterpolate_set_tracked_allocation_docstring[] =
+    "Interface function to allocate the memory of librinterpolate and the C_tables through the python allocator (traced by tracemalloc), or through the standard malloc";
 
 /***********************************************************
  * Initialize pyobjects/prototypes
@@ -48,6 +91,27 @@ static PyObject* rinterpolate_free_dataspace_wrapper(PyObject *self, PyObject *a
 static PyObject* rinterpolate_free_C_table(PyObject *self, PyObject *args);
 static PyObject* rinterpolate_check_C_table(PyObject *self, PyObject *args);
 static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_batch_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_layout_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_cell_cache_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_cache_tolerance_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_search_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_autotune_search_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_categorical_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_cache_info_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_ragged_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_fused_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_grid_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_locate_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_apply_weights_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_sparse_apply_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_update_C_table(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_append_C_table(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_check_table_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_memory_usage_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_tracked_allocation(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_set_simd_wrapper(PyObject *self, PyObject *args);
+static PyObject* rinterpolate_simd_level_wrapper(PyObject *self, PyObject *args);
 
 /***********************************************************
  * Set the module functions
@@ -60,6 +124,27 @@ static PyMethodDef module_methods[] = {
     {"_rinterpolate_free_C_table", rinterpolate_free_C_table, METH_VARARGS, rinterpolate_free_C_table_docstring},
     {"_rinterpolate_check_C_table", rinterpolate_check_C_table, METH_VARARGS, rinterpolate_check_C_table_docstring},
     {"_rinterpolate_wrapper", rinterpolate_wrapper, METH_VARARGS, rinterpolate_wrapper_docstring},
+    {"_rinterpolate_batch_wrapper", rinterpolate_batch_wrapper, METH_VARARGS, rinterpolate_batch_wrapper_docstring},
+    {"_rinterpolate_set_layout_wrapper", rinterpolate_set_layout_wrapper, METH_VARARGS, rinterpolate_set_layout_wrapper_docstring},
+    {"_rinterpolate_set_cell_cache_wrapper", rinterpolate_set_cell_cache_wrapper, METH_VARARGS, rinterpolate_set_cell_cache_wrapper_docstring},
+    {"_rinterpolate_set_cache_tolerance_wrapper", rinterpolate_set_cache_tolerance_wrapper, METH_VARARGS, rinterpolate_set_cache_tolerance_wrapper_docstring},
+    {"_rinterpolate_set_search_wrapper", rinterpolate_set_search_wrapper, METH_VARARGS, rinterpolate_set_search_wrapper_docstring},
+    {"_rinterpolate_set_categorical_wrapper", rinterpolate_set_categorical_wrapper, METH_VARARGS, rinterpolate_set_categorical_wrapper_docstring},
+    {"_rinterpolate_autotune_search_wrapper", rinterpolate_autotune_search_wrapper, METH_VARARGS, rinterpolate_autotune_search_wrapper_docstring},
+    {"_rinterpolate_cache_info_wrapper", rinterpolate_cache_info_wrapper, METH_VARARGS, rinterpolate_cache_info_wrapper_docstring},
+    {"_rinterpolate_set_ragged_wrapper", rinterpolate_set_ragged_wrapper, METH_VARARGS, rinterpolate_set_ragged_wrapper_docstring},
+    {"_rinterpolate_fused_wrapper", rinterpolate_fused_wrapper, METH_VARARGS, rinterpolate_fused_wrapper_docstring},
+    {"_rinterpolate_grid_wrapper", rinterpolate_grid_wrapper, METH_VARARGS, rinterpolate_grid_wrapper_docstring},
+    {"_rinterpolate_locate_wrapper", rinterpolate_locate_wrapper, METH_VARARGS, rinterpolate_locate_wrapper_docstring},
+    {"_rinterpolate_apply_weights_wrapper", rinterpolate_apply_weights_wrapper, METH_VARARGS, rinterpolate_apply_weights_wrapper_docstring},
+    {"_rinterpolate_sparse_apply_wrapper", rinterpolate_sparse_apply_wrapper, METH_VARARGS, rinterpolate_sparse_apply_wrapper_docstring},
+    {"_rinterpolate_update_C_table", rinterpolate_update_C_table, METH_VARARGS, rinterpolate_update_C_table_docstring},
+    {"_rinterpolate_append_C_table", rinterpolate_append_C_table, METH_VARARGS, rinterpolate_append_C_table_docstring},
+    {"_rinterpolate_check_table_wrapper", rinterpolate_check_table_wrapper, METH_VARARGS, rinterpolate_check_table_wrapper_docstring},
+    {"_rinterpolate_memory_usage_wrapper", rinterpolate_memory_usage_wrapper, METH_VARARGS, rinterpolate_memory_usage_wrapper_docstring},
+    {"_rinterpolate_set_tracked_allocation", rinterpolate_set_tracked_allocation, METH_VARARGS, rinterpolate_set_tracked_allocation_docstring},
+    {"_rinterpolate_set_simd", rinterpolate_set_simd_wrapper, METH_VARARGS, rinterpolate_set_simd_docstring},
+    {"_rinterpolate_simd_level", rinterpolate_simd_level_wrapper, METH_NOARGS, rinterpolate_simd_level_docstring},
 
     {NULL, NULL, 0, NULL}
 };
@@ -78,10 +163,256 @@ static struct PyModuleDef Py__py_rinterpolate =
     module_methods
 };
 
+static PyTypeObject PreparedInterpolatorType;
+
 /* Initialize function for module */
 PyMODINIT_FUNC PyInit__py_rinterpolate(void)
 {
-    return PyModule_Create(&Py__py_rinterpolate);
+    if (PyType_Ready(&PreparedInterpolatorType) < 0)
+        return NULL;
+
+    PyObject * module = PyModule_Create(&Py__py_rinterpolate);
+    if (module == NULL)
+        return NULL;
+
+    Py_INCREF(&PreparedInterpolatorType);
+    if (PyModule_AddObject(module, "_PreparedInterpolator", (PyObject *) &PreparedInterpolatorType) < 0)
+    {
+        Py_DECREF(&PreparedInterpolatorType);
+        Py_DECREF(module);
+        return NULL;
+    }
+
+    return module;
+}
+
+/***********************************************************
+ * Memory allocation
+ ***********************************************************/
+
+/*
+ * The python raw allocator: allocations through it are traced by
+ * tracemalloc, and it is safe to call without the GIL.
+ */
+static const struct rinterpolate_allocator_t tracked_allocator = {
+    PyMem_RawMalloc,
+    PyMem_RawCalloc,
+    PyMem_RawRealloc,
+    PyMem_RawFree
+};
+
+/*
+ * Number of dataspaces and C_tables that are allocated: memory must be
+ * freed by the allocator that allocated it, so the allocator can only
+ * be changed when this is zero.
+ */
+static Py_ssize_t live_allocations = 0;
+
+/***********************************************************
+ * Helper functions
+ ***********************************************************/
+
+/*
+ * Unpack the table pointer from a TABLE capsule. Returns NULL (with the
+ * python error set) if the capsule is not a TABLE capsule.
+ */
+static double * unpack_C_table_capsule(PyObject * C_table_capsule)
+{
+    if (!PyCapsule_IsValid(C_table_capsule, "TABLE"))
+    {
+        PyErr_SetString(PyExc_TypeError, "Incorrect capsule received. Expected a TABLE capsule");
+        return NULL;
+    }
+    return (double *) PyCapsule_GetPointer(C_table_capsule, "TABLE");
+}
+
+/*
+ * Unpack the dataspace pointer from a DATASPACE capsule. Returns NULL (with the
+ * python error set) if the capsule is not a DATASPACE capsule.
+ */
+static struct rinterpolate_data_t * unpack_dataspace_capsule(PyObject * dataspace_mem_capsule)
+{
+    if (!PyCapsule_IsValid(dataspace_mem_capsule, "DATASPACE"))
+    {
+        PyErr_SetString(PyExc_TypeError, "Incorrect capsule received. Expected a DATASPACE capsule");
+        return NULL;
+    }
+    return (struct rinterpolate_data_t *) PyCapsule_GetPointer(dataspace_mem_capsule, "DATASPACE");
+}
+
+/*
+ * Each dataspace has a lock, kept as the context of its capsule, which
+ * is held while librinterpolate uses the dataspace. Its tables keep
+ * state that changes with every call (the hypertable, the caches and
+ * their statistics, the hunt searches, the table itself when it is set
+ * up at the first call), so only one thread at a time can use them.
+ *
+ * With the lock the GIL can be released during long calls: other
+ * python threads, and calls on other interpolators (which have their
+ * own dataspace), run meanwhile, and calls on the same interpolator
+ * from several threads take turns.
+ *
+ * lock_dataspace has to be called with the GIL held. If the lock is
+ * taken, the GIL is released while waiting for it, so a thread holding
+ * the lock can always get the GIL back.
+ */
+static void lock_dataspace(PyObject * dataspace_mem_capsule)
+{
+    PyThread_type_lock lock = (PyThread_type_lock) PyCapsule_GetContext(dataspace_mem_capsule);
+    if (!PyThread_acquire_lock(lock, NOWAIT_LOCK))
+    {
+        Py_BEGIN_ALLOW_THREADS
+        PyThread_acquire_lock(lock, WAIT_LOCK);
+        Py_END_ALLOW_THREADS
+    }
+}
+
+static void unlock_dataspace(PyObject * dataspace_mem_capsule)
+{
+    PyThread_release_lock((PyThread_type_lock) PyCapsule_GetContext(dataspace_mem_capsule));
+}
+
+/*
+ * Free the lock of a dataspace when its capsule is deleted (the
+ * dataspace itself is freed by rinterpolate_free_dataspace_wrapper)
+ */
+static void dataspace_capsule_destructor(PyObject * dataspace_mem_capsule)
+{
+    PyThread_type_lock lock = (PyThread_type_lock) PyCapsule_GetContext(dataspace_mem_capsule);
+    if (lock != NULL)
+        PyThread_free_lock(lock);
+}
+
+/*
+ * Get a C-contiguous float64 buffer from a python object (e.g. a numpy array).
+ * Returns 0 on success, -1 (with the python error set) on failure.
+ * The view has to be released with PyBuffer_Release.
+ */
+static int get_double_buffer(PyObject * obj, Py_buffer * view, int writable)
+{
+    int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+    if (writable) flags |= PyBUF_WRITABLE;
+
+    if (PyObject_GetBuffer(obj, view, flags) != 0)
+        return -1;
+
+    if (view->itemsize != sizeof(double) ||
+        (view->format != NULL && strcmp(view->format, "d") != 0))
+    {
+        PyBuffer_Release(view);
+        PyErr_SetString(PyExc_TypeError, "buffer must contain float64 items");
+        return -1;
+    }
+    return 0;
+}
+
+/*
+ * Get a C-contiguous int64 buffer from a python object (e.g. a numpy array).
+ * Returns 0 on success, -1 (with the python error set) on failure.
+ * The view has to be released with PyBuffer_Release.
+ */
+static int get_int64_buffer(PyObject * obj, Py_buffer * view, int writable)
+{
+    int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+    if (writable) flags |= PyBUF_WRITABLE;
+
+    if (PyObject_GetBuffer(obj, view, flags) != 0)
+        return -1;
+
+    if (view->itemsize != sizeof(int64_t) ||
+        (view->format != NULL &&
+         strcmp(view->format, "q") != 0 &&
+         strcmp(view->format, "l") != 0))
+    {
+        PyBuffer_Release(view);
+        PyErr_SetString(PyExc_TypeError, "buffer must contain int64 items");
+        return -1;
+    }
+    return 0;
+}
+
+/*
+ * Get the table data from either a TABLE capsule or a float64 buffer of
+ * nlines*line_length items. Returns NULL (with the python error set) on
+ * failure. If *have_view is set on return, the view has to be released
+ * with PyBuffer_Release.
+ */
+static const double * get_table_data(PyObject * table_obj,
+                                     Py_buffer * view,
+                                     int * have_view,
+                                     Py_ssize_t nlines,
+                                     Py_ssize_t line_length)
+{
+    *have_view = 0;
+    if (PyCapsule_CheckExact(table_obj))
+        return unpack_C_table_capsule(table_obj);
+
+    if (get_double_buffer(table_obj, view, 0) != 0)
+        return NULL;
+    *have_view = 1;
+
+    if (view->len / view->itemsize != nlines * line_length)
+    {
+        PyBuffer_Release(view);
+        *have_view = 0;
+        PyErr_SetString(PyExc_ValueError, "table size does not match nlines and line_length");
+        return NULL;
+    }
+    return (const double *) view->buf;
+}
+
+/*
+ * Check that all columns are in [0, line_length).
+ * Returns 0 if so, -1 (with the python error set) otherwise.
+ */
+static int check_columns(const int64_t * columns, Py_ssize_t ncolumns, Py_ssize_t line_length)
+{
+    Py_ssize_t i;
+    for(i=0; i<ncolumns; i++)
+    {
+        if (columns[i] < 0 || columns[i] >= line_length)
+        {
+            PyErr_Format(PyExc_IndexError, "column %lld out of range", (long long) columns[i]);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+/*
+ * Check that mode is one of the RINTERPOLATE_MODE_* evaluation modes.
+ * Returns 0 if so, -1 (with the python error set) otherwise.
+ */
+static int check_mode(int mode)
+{
+    if (mode != RINTERPOLATE_MODE_LINEAR &&
+        mode != RINTERPOLATE_MODE_NEAREST &&
+        mode != RINTERPOLATE_MODE_FLOOR &&
+        mode != RINTERPOLATE_MODE_SIMPLEX)
+    {
+        PyErr_Format(PyExc_ValueError, "Unknown evaluation mode %d", mode);
+        return -1;
+    }
+    return 0;
+}
+
+/*
+ * Evaluate the table at x in one of the modes other than the (cached)
+ * multilinear interpolation, which work on the table struct directly.
+ */
+static void evaluate_table(struct rinterpolate_table_t * rinterpolate_table,
+                           const double * x,
+                           double * r,
+                           int mode)
+{
+    if (mode == RINTERPOLATE_MODE_SIMPLEX)
+    {
+        rinterpolate_simplex(rinterpolate_table, x, r);
+    }
+    else
+    {
+        rinterpolate_nearest(rinterpolate_table, x, r, mode);
+    }
 }
 
 /***********************************************************
@@ -101,7 +432,21 @@ static PyObject* rinterpolate_alloc_dataspace_wrapper(PyObject *self, PyObject *
     }
 
     debug_printf("rinterpolate_alloc_dataspace_wrapper: Packing up dataspace pointer %p into capsule\n", (void *)rinterpolate_data);
-    PyObject * dataspace_mem_capsule = PyCapsule_New(rinterpolate_data, "DATASPACE", NULL);
+    PyThread_type_lock lock = PyThread_allocate_lock();
+    if (lock == NULL)
+    {
+        Rinterpolate_free(rinterpolate_data);
+        return PyErr_NoMemory();
+    }
+    PyObject * dataspace_mem_capsule = PyCapsule_New(rinterpolate_data, "DATASPACE", dataspace_capsule_destructor);
+    if (dataspace_mem_capsule == NULL)
+    {
+        PyThread_free_lock(lock);
+        Rinterpolate_free(rinterpolate_data);
+        return NULL;
+    }
+    PyCapsule_SetContext(dataspace_mem_capsule, lock);
+    live_allocations++;
 
     return dataspace_mem_capsule;
 }
@@ -109,6 +454,10 @@ static PyObject* rinterpolate_alloc_dataspace_wrapper(PyObject *self, PyObject *
 /* 
  * Build the c-version of the python table and return the pointer to it
  * 
+ * The table is either a list of floats or any object that exposes a
+ * C-contiguous float64 buffer (e.g. a numpy array or bytearray). The latter
+ * is copied with a single memcpy.
+ *
  * Got inspiration from:
  * https://stackoverflow.com/questions/22458298/extending-python-with-c-pass-a-list-to-pyarg-parsetuple
  */
@@ -124,50 +473,91 @@ static PyObject* rinterpolate_set_C_table(PyObject *self, PyObject *args)
     int nlines;
 
     /* Parse the input tuple */
-    if(!PyArg_ParseTuple(args, "O!iii", &PyList_Type, &pList, &nparams, &ndata, &nlines))
+    if(!PyArg_ParseTuple(args, "Oiii", &pList, &nparams, &ndata, &nlines))
         return NULL;
 
     /*
-     * Number of lines in the table
+     * Number of items in the table: computed in Py_ssize_t,
+     * as it can be larger than an int
      */
-    const long int ntable = (ndata + nparams) * nlines;
-    n_check = PyList_Size(pList);
-
-    if (n_check-ntable != 0)
-    {
-        printf("rinterpolate_set_C_table: Error, the length of the input table (%ld) does not match the length calculated (ndata + nparams) * nlines (%ld)\n", n_check, ntable);
-        PyErr_SetString(PyExc_ValueError, "rinterpolate_set_C_table: Wrong input for nparams and ndata");
-        return NULL;
-    }
+    const Py_ssize_t ntable = (Py_ssize_t)(ndata + nparams) * nlines;
 
     /*
      * Allocate memory for a C version of the interpolation
      * table, and fill it.
      */
-    double * table = malloc(sizeof(double) * ntable);
+    double * table = NULL;
 
-    if(table != NULL)
+    if(PyList_Check(pList))
     {
-        int i;
-        for(i=0; i<n_check; i++)
+        n_check = PyList_Size(pList);
+
+        if (n_check-ntable != 0)
         {
-            pItem = PyList_GetItem(pList, i);
-            if(!PyFloat_Check(pItem)) 
-            {
-                PyErr_SetString(PyExc_TypeError, "list items must be floats.");
-                return NULL;
-            }
-            double cItem = PyFloat_AsDouble(pItem);
+            printf("rinterpolate_set_C_table: Error, the length of the input table (%zd) does not match the length calculated (ndata + nparams) * nlines (%zd)\n", n_check, ntable);
+            PyErr_SetString(PyExc_ValueError, "rinterpolate_set_C_table: Wrong input for nparams and ndata");
+            return NULL;
+        }
+
+        table = Rinterpolate_malloc(sizeof(double) * ntable);
 
-            if (PyErr_Occurred() != NULL)
+        if(table != NULL)
+        {
+            Py_ssize_t i;
+            for(i=0; i<n_check; i++)
             {
-                PyErr_SetString(PyExc_TypeError, "error occured in converting the python float to C double\n");
-            } else {
-                table[i] = cItem;
+                pItem = PyList_GetItem(pList, i);
+                if(!PyFloat_Check(pItem)) 
+                {
+                    PyErr_SetString(PyExc_TypeError, "list items must be floats.");
+                    Rinterpolate_free(table);
+                    return NULL;
+                }
+                double cItem = PyFloat_AsDouble(pItem);
+
+                if (PyErr_Occurred() != NULL)
+                {
+                    PyErr_SetString(PyExc_TypeError, "error occured in converting the python float to C double\n");
+                } else {
+                    table[i] = cItem;
+                }
             }
         }
     }
     else
+    {
+        Py_buffer view;
+        if(PyObject_GetBuffer(pList, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0)
+        {
+            return NULL;
+        }
+
+        if(view.itemsize != sizeof(double) ||
+           (view.format != NULL && strcmp(view.format, "d") != 0))
+        {
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_TypeError, "rinterpolate_set_C_table: table buffer must contain float64 items");
+            return NULL;
+        }
+
+        n_check = view.len / view.itemsize;
+        if (n_check-ntable != 0)
+        {
+            PyBuffer_Release(&view);
+            printf("rinterpolate_set_C_table: Error, the length of the input table (%zd) does not match the length calculated (ndata + nparams) * nlines (%zd)\n", n_check, ntable);
+            PyErr_SetString(PyExc_ValueError, "rinterpolate_set_C_table: Wrong input for nparams and ndata");
+            return NULL;
+        }
+
+        table = Rinterpolate_malloc(sizeof(double) * ntable);
+        if(table != NULL)
+        {
+            memcpy(table, view.buf, sizeof(double) * ntable);
+        }
+        PyBuffer_Release(&view);
+    }
+
+    if(table == NULL)
     {
         PyErr_SetString(PyExc_ValueError, "rinterpolate_set_C_table: Table not set succesfully");
         return NULL;
@@ -175,6 +565,12 @@ static PyObject* rinterpolate_set_C_table(PyObject *self, PyObject *args)
 
     debug_printf("rinterpolate_set_C_table: Packing up table pointer %p into capsule\n", (void *)table);
     PyObject * C_table_capsule = PyCapsule_New(table, "TABLE", NULL);
+    if (C_table_capsule == NULL)
+    {
+        Rinterpolate_free(table);
+        return NULL;
+    }
+    live_allocations++;
 
     return C_table_capsule;
 }
@@ -212,8 +608,14 @@ static PyObject* rinterpolate_free_dataspace_wrapper(PyObject *self, PyObject *a
     if(rinterpolate_data != NULL)
     {
         debug_printf("rinterpolate_free_dataspace_wrapper: dataspace free rinterpolate_data 1 (free via rinterpolate_free_data) %p\n", (void *)rinterpolate_data);
+        lock_dataspace(dataspace_mem_capsule);
         rinterpolate_free_data(rinterpolate_data);
-        // TODO: Consider putting the extra free here. With valgrind on a normal c script where I interpolate on a table it needs to be there. 
+        Rinterpolate_free(rinterpolate_data);
+        live_allocations--;
+
+        /* Mark the capsule, so that prepared interpolators holding it know it is freed */
+        PyCapsule_SetName(dataspace_mem_capsule, "FREED_DATASPACE");
+        unlock_dataspace(dataspace_mem_capsule);
     }
 
     Py_RETURN_NONE;
@@ -222,13 +624,17 @@ static PyObject* rinterpolate_free_dataspace_wrapper(PyObject *self, PyObject *a
 /* 
  * Function to free the memory allocated for the C_table. 
  * Takes a long int as input that represents the memory adress stored as an int
+ *
+ * If the dataspace is passed too, the table is removed from it first,
+ * so that a new C_table at the same address is not matched to it.
  */
 static PyObject* rinterpolate_free_C_table(PyObject *self, PyObject *args)
 {
     PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
 
     /* Parse the input tuple */
-    if(!PyArg_ParseTuple(args, "O", &C_table_capsule))
+    if(!PyArg_ParseTuple(args, "O|O", &C_table_capsule, &dataspace_mem_capsule))
     {
         return NULL;
     }
@@ -252,9 +658,23 @@ static PyObject* rinterpolate_free_C_table(PyObject *self, PyObject *args)
     // TODO: mention to rob that this freeing doesnt `unset` the values in the table. 
     if(table != NULL)
     {
+        if (dataspace_mem_capsule != NULL && dataspace_mem_capsule != Py_None)
+        {
+            struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+            if (rinterpolate_data == NULL)
+                return NULL;
+            lock_dataspace(dataspace_mem_capsule);
+            rinterpolate_remove_table(rinterpolate_data, table);
+            unlock_dataspace(dataspace_mem_capsule);
+        }
+
         debug_printf("rinterpolate_free_C_table: free table %p\n", (void *)table);
-        free(table); // TODO: as rob if this works. 
+        Rinterpolate_free(table);
         table = NULL;
+        live_allocations--;
+
+        /* Mark the capsule, so that prepared interpolators holding it know it is freed */
+        PyCapsule_SetName(C_table_capsule, "FREED_TABLE");
     }
 
     Py_RETURN_NONE;
@@ -315,16 +735,48 @@ static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args)
     int ndata = -1;
     int nlines = -1;
     int usecache = -1;
+    int mode = RINTERPOLATE_MODE_LINEAR;
 
     PyObject *xList;
     PyObject *xItem;
+    PyObject *out_obj = Py_None;
     int i;
     PyObject* num;
 
     /* Parse the input tuple */
-    if(!PyArg_ParseTuple(args, "OOiiiO!i", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &PyList_Type, &xList, &usecache))
+    if(!PyArg_ParseTuple(args, "OOiiiO!i|iO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &PyList_Type, &xList, &usecache, &mode, &out_obj))
+        return NULL;
+
+    if (check_mode(mode) != 0)
         return NULL;
 
+    /*
+     * If an output buffer is given, the results are written
+     * into it, and it is returned instead of a new list.
+     * From here on every exit goes through done:, which frees
+     * x and r and releases the view.
+     */
+    Py_buffer out_view;
+    const int have_out = out_obj != Py_None;
+    double * x = NULL;
+    double * r = NULL;
+    PyObject * Result = NULL;
+    if (have_out)
+    {
+        if (get_double_buffer(out_obj, &out_view, 1) != 0)
+            return NULL;
+        if (out_view.len / out_view.itemsize != ndata)
+        {
+            PyErr_Format(PyExc_ValueError, "rinterpolate_wrapper: the output buffer should have %d items", ndata);
+            goto done;
+        }
+        if (PyList_Size(xList) != nparams)
+        {
+            PyErr_Format(PyExc_ValueError, "rinterpolate_wrapper: expected %d coefficients", nparams);
+            goto done;
+        }
+    }
+
     /* Unpack the capsules */
     double * table = NULL;
     if (C_table_capsule != NULL)
@@ -332,7 +784,7 @@ static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args)
         if (PyCapsule_IsValid(C_table_capsule, "TABLE"))
         {
             if (!(table = (double *) PyCapsule_GetPointer(C_table_capsule, "TABLE")))
-                return NULL;
+                goto done;
             debug_printf("rinterpolate_wrapper: Unpacked table pointer %p from capsule\n", (void *)table);
         }
         else
@@ -347,7 +799,7 @@ static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args)
         if (PyCapsule_IsValid(dataspace_mem_capsule, "DATASPACE"))
         {
             if (!(rinterpolate_data = (struct rinterpolate_data_t *) PyCapsule_GetPointer(dataspace_mem_capsule, "DATASPACE")))
-                return NULL;
+                goto done;
             debug_printf("rinterpolate_wrapper: Unpacked dataspace pointer %p from capsule\n", (void *)rinterpolate_data);                
         }
         else
@@ -359,10 +811,13 @@ static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args)
     /*
      * Allocate memory for the input array, x, and return array, r
      */
-    double * x = malloc(sizeof(double) * nparams);
-    if(x == NULL) Py_RETURN_NONE;
-    double * r = malloc(sizeof(double) * ndata);
-    if(r == NULL) Py_RETURN_NONE; // TODO: ask rob about the purpose of the return. should make it a return None probably
+    x = malloc(sizeof(double) * nparams);
+    r = have_out ? (double *) out_view.buf : malloc(sizeof(double) * ndata);
+    if(x == NULL || r == NULL)
+    {
+        PyErr_NoMemory();
+        goto done;
+    }
 
     // Fill the C-array with the python input
     for(i=0; i<nparams; i++)
@@ -371,7 +826,7 @@ static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args)
         if(!PyFloat_Check(xItem)) 
         {
             PyErr_SetString(PyExc_TypeError, "list items must be floats.");
-            return NULL;
+            goto done;
         }
         double cItem = PyFloat_AsDouble(xItem);
         debug_printf("rinterpolate_wrapper: i=%d input_table[i]=%f\n", i, cItem);
@@ -379,7 +834,7 @@ static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args)
         if (PyErr_Occurred() != NULL)
         {
             PyErr_SetString(PyExc_TypeError, "Conversion python float to C double failed.");
-            return NULL;
+            goto done;
         } else {
             x[i] = cItem;
         }
@@ -388,37 +843,1964 @@ static PyObject* rinterpolate_wrapper(PyObject *self, PyObject *args)
     /*
      * Call rinterpolate
      */
-    rinterpolate(table,
-                 rinterpolate_data,
-                 nparams,
-                 ndata,
-                 nlines,
-                 x,
-                 r,
-                 usecache);
+    if (rinterpolate_data != NULL)
+        lock_dataspace(dataspace_mem_capsule);
+    if (mode == RINTERPOLATE_MODE_LINEAR)
+    {
+        rinterpolate(table,
+                     rinterpolate_data,
+                     nparams,
+                     ndata,
+                     nlines,
+                     x,
+                     r,
+                     usecache);
+    }
+    else
+    {
+        evaluate_table(rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache),
+                       x,
+                       r,
+                       mode);
+    }
+    if (rinterpolate_data != NULL)
+        unlock_dataspace(dataspace_mem_capsule);
+
+    if (have_out)
+    {
+        Py_INCREF(out_obj);
+        Result = out_obj;
+        goto done;
+    }
 
     /*
      * Set results in Python array
      */
     PyObject *rList = PyList_New(ndata);
+    if (rList == NULL)
+        goto done;
     for(i=0; i<ndata; i++)
     {
         num = PyFloat_FromDouble(r[i]);
-        if(!num){ // TODO: check if this is the proper way to do things. 
+        if(!num){
             Py_DECREF(rList); 
-            return NULL;  
+            goto done;
         }
         PyList_SetItem(rList, i, num);
     }
+    Result = rList;
 
+done:
     /*
      * Free memory
      */
     free(x);
-    free(r);
+    if (have_out)
+        PyBuffer_Release(&out_view);
+    else
+        free(r);
 
-    // return stuff
-    PyObject *Result = Py_BuildValue("O", rList);
-    Py_DECREF(rList);
     return Result;
 }
+
+/*
+ * Function to interpolate a batch of coefficients in one call.
+ *
+ * The coefficients are passed as a float64 buffer of k*nparams items,
+ * the results are written to a writable float64 buffer of k*ndata items.
+ * The GIL is released during the interpolation, so other python threads
+ * (e.g. one reading the next chunk of coefficients) can run meanwhile,
+ * while the dataspace is locked (see lock_dataspace).
+ */
+static PyObject* rinterpolate_batch_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  x_obj = NULL;
+    PyObject *  r_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    int mode = RINTERPOLATE_MODE_LINEAR;
+    int grouped = 0;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiOOi|ip", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &x_obj, &r_obj, &usecache, &mode, &grouped))
+        return NULL;
+
+    if (check_mode(mode) != 0)
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    /* Get the input and output buffers */
+    Py_buffer x_view, r_view;
+    if (get_double_buffer(x_obj, &x_view, 0) != 0)
+        return NULL;
+    if (get_double_buffer(r_obj, &r_view, 1) != 0)
+    {
+        PyBuffer_Release(&x_view);
+        return NULL;
+    }
+
+    const Py_ssize_t nx = x_view.len / x_view.itemsize;
+    const Py_ssize_t nr = r_view.len / r_view.itemsize;
+    const Py_ssize_t k = nparams > 0 ? nx / nparams : 0;
+
+    if (nx != k * nparams || nr != k * ndata)
+    {
+        PyBuffer_Release(&x_view);
+        PyBuffer_Release(&r_view);
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_batch_wrapper: buffer sizes do not match nparams and ndata");
+        return NULL;
+    }
+
+    const double * x = (const double *) x_view.buf;
+    double * r = (double *) r_view.buf;
+    Py_ssize_t i;
+
+    rinterpolate_counter_t status = 0;
+
+    /*
+     * Call rinterpolate for each set of coefficients, or
+     * for all of them grouped by cell
+     */
+    lock_dataspace(dataspace_mem_capsule);
+    Py_BEGIN_ALLOW_THREADS
+    if (mode == RINTERPOLATE_MODE_LINEAR && grouped)
+    {
+        status = rinterpolate_batch_grouped(rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache),
+                                            x,
+                                            r,
+                                            (size_t) k);
+    }
+    else if (mode == RINTERPOLATE_MODE_LINEAR)
+    {
+        for(i=0; i<k; i++)
+        {
+            rinterpolate(table,
+                         rinterpolate_data,
+                         nparams,
+                         ndata,
+                         nlines,
+                         x + i * nparams,
+                         r + i * ndata,
+                         usecache);
+        }
+    }
+    else
+    {
+        struct rinterpolate_table_t * rinterpolate_table =
+            rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+        for(i=0; i<k; i++)
+        {
+            evaluate_table(rinterpolate_table,
+                           x + i * nparams,
+                           r + i * ndata,
+                           mode);
+        }
+    }
+    Py_END_ALLOW_THREADS
+    unlock_dataspace(dataspace_mem_capsule);
+
+    PyBuffer_Release(&x_view);
+    PyBuffer_Release(&r_view);
+
+    if (status != 0)
+        return PyErr_NoMemory();
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to set the memory layout of the table data. The table
+ * is set up in the dataspace if that was not done yet.
+ *
+ * tile = 0 uses the row-major layout of the input table,
+ * tile > 1 stores the table in tiles of tile^nparams lines.
+ */
+static PyObject* rinterpolate_set_layout_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    int tile = 0;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiii", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &tile))
+        return NULL;
+
+    if (tile < 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_set_layout_wrapper: tile size cannot be negative");
+        return NULL;
+    }
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    rinterpolate_set_layout(rinterpolate_table, tile);
+    tile = (int) rinterpolate_table->tile;
+    unlock_dataspace(dataspace_mem_capsule);
+
+    return PyLong_FromLong(tile);
+}
+
+/*
+ * Function to set the number of cells in the cell cache of the table
+ * (see rinterpolate_resize_cell_cache), 0 for none. The table is set
+ * up in the dataspace if that was not done yet.
+ */
+static PyObject* rinterpolate_set_cell_cache_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    int cells = 0;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiii", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &cells))
+        return NULL;
+
+    if (cells < 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_set_cell_cache_wrapper: number of cells cannot be negative");
+        return NULL;
+    }
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    const rinterpolate_counter_t status = rinterpolate_resize_cell_cache(rinterpolate_table, (rinterpolate_counter_t) cells);
+    unlock_dataspace(dataspace_mem_capsule);
+    if (status != 0)
+        return PyErr_NoMemory();
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to convert a sequence of nparams tolerances into the
+ * array tol. Returns 0, or -1 with an exception set.
+ */
+static int unpack_tolerances(PyObject * sequence, double * tol, int nparams, const char * name)
+{
+    PyObject * fast = PySequence_Fast(sequence, "rinterpolate_set_cache_tolerance_wrapper: tolerances should be a sequence");
+    if (fast == NULL)
+        return -1;
+
+    if (PySequence_Fast_GET_SIZE(fast) != nparams)
+    {
+        Py_DECREF(fast);
+        PyErr_Format(PyExc_ValueError, "rinterpolate_set_cache_tolerance_wrapper: %s should have nparams=%d items", name, nparams);
+        return -1;
+    }
+
+    PyObject ** items = PySequence_Fast_ITEMS(fast);
+    int i;
+    for (i=0; i<nparams; i++)
+    {
+        tol[i] = PyFloat_AsDouble(items[i]);
+        if (tol[i] == -1.0 && PyErr_Occurred())
+        {
+            Py_DECREF(fast);
+            return -1;
+        }
+    }
+    Py_DECREF(fast);
+    return 0;
+}
+
+/*
+ * Function to set the tolerances with which the coefficients are
+ * quantized before they are looked up in the cache of the table
+ * (see rinterpolate_set_cache_tolerance). atol and rtol are None or
+ * sequences of nparams tolerances. The table is set up in the
+ * dataspace if that was not done yet.
+ */
+static PyObject* rinterpolate_set_cache_tolerance_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  atol_obj = NULL;
+    PyObject *  rtol_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiOO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &atol_obj, &rtol_obj))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    double * atol = NULL;
+    double * rtol = NULL;
+    double * tol = PyMem_Malloc(sizeof(double) * 2 * (nparams > 0 ? nparams : 1));
+    if (tol == NULL)
+        return PyErr_NoMemory();
+
+    if (atol_obj != Py_None)
+    {
+        atol = tol;
+        if (unpack_tolerances(atol_obj, atol, nparams, "atol") != 0)
+        {
+            PyMem_Free(tol);
+            return NULL;
+        }
+    }
+    if (rtol_obj != Py_None)
+    {
+        rtol = tol + nparams;
+        if (unpack_tolerances(rtol_obj, rtol, nparams, "rtol") != 0)
+        {
+            PyMem_Free(tol);
+            return NULL;
+        }
+    }
+
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    rinterpolate_counter_t status = rinterpolate_set_cache_tolerance(rinterpolate_table, atol, rtol);
+    unlock_dataspace(dataspace_mem_capsule);
+    PyMem_Free(tol);
+
+    if (status != 0)
+        return PyErr_NoMemory();
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to set the search algorithm of each parameter of the table
+ * (see rinterpolate_set_search) from a sequence of nparams
+ * RINTERPOLATE_SEARCH_* numbers. The table is set up in the dataspace
+ * if that was not done yet.
+ */
+static PyObject* rinterpolate_set_search_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  methods_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    Py_ssize_t j;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &methods_obj))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    PyObject * fast = PySequence_Fast(methods_obj, "rinterpolate_set_search_wrapper: methods should be a sequence");
+    if (fast == NULL)
+        return NULL;
+    if (PySequence_Fast_GET_SIZE(fast) != nparams)
+    {
+        Py_DECREF(fast);
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_set_search_wrapper: there should be one method per parameter");
+        return NULL;
+    }
+
+    rinterpolate_counter_t * methods = PyMem_Malloc(sizeof(rinterpolate_counter_t) * (nparams > 0 ? nparams : 1));
+    if (methods == NULL)
+    {
+        Py_DECREF(fast);
+        return PyErr_NoMemory();
+    }
+    for(j=0; j<nparams; j++)
+    {
+        const long method = PyLong_AsLong(PySequence_Fast_GET_ITEM(fast, j));
+        if (method == -1 && PyErr_Occurred())
+        {
+            Py_DECREF(fast);
+            PyMem_Free(methods);
+            return NULL;
+        }
+        if (method < 0 || method >= RINTERPOLATE_SEARCH_NUMBER)
+        {
+            Py_DECREF(fast);
+            PyMem_Free(methods);
+            PyErr_SetString(PyExc_ValueError, "rinterpolate_set_search_wrapper: unknown search method");
+            return NULL;
+        }
+        methods[j] = (rinterpolate_counter_t) method;
+    }
+    Py_DECREF(fast);
+
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    rinterpolate_counter_t status = rinterpolate_set_search(rinterpolate_table, methods);
+    unlock_dataspace(dataspace_mem_capsule);
+    PyMem_Free(methods);
+
+    if (status != 0)
+        return PyErr_NoMemory();
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to make the parameters of the table whose numbers are in a
+ * sequence categorical (exact-match) axes, see
+ * rinterpolate_set_categorical. The table is set up in the dataspace
+ * if that was not done yet.
+ */
+static PyObject* rinterpolate_set_categorical_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  axes_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    Py_ssize_t i;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &axes_obj))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    PyObject * fast = PySequence_Fast(axes_obj, "rinterpolate_set_categorical_wrapper: axes should be a sequence");
+    if (fast == NULL)
+        return NULL;
+
+    rinterpolate_Boolean_t * categorical = PyMem_Calloc(nparams > 0 ? nparams : 1, sizeof(rinterpolate_Boolean_t));
+    if (categorical == NULL)
+    {
+        Py_DECREF(fast);
+        return PyErr_NoMemory();
+    }
+    for(i=0; i<PySequence_Fast_GET_SIZE(fast); i++)
+    {
+        const long axis = PyLong_AsLong(PySequence_Fast_GET_ITEM(fast, i));
+        if (axis == -1 && PyErr_Occurred())
+        {
+            Py_DECREF(fast);
+            PyMem_Free(categorical);
+            return NULL;
+        }
+        if (axis < 0 || axis >= nparams)
+        {
+            Py_DECREF(fast);
+            PyMem_Free(categorical);
+            PyErr_SetString(PyExc_ValueError, "rinterpolate_set_categorical_wrapper: axis out of range");
+            return NULL;
+        }
+        categorical[axis] = 1;
+    }
+    Py_DECREF(fast);
+
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    rinterpolate_counter_t status = rinterpolate_set_categorical(rinterpolate_table, categorical);
+    unlock_dataspace(dataspace_mem_capsule);
+    PyMem_Free(categorical);
+
+    if (status != 0)
+        return PyErr_NoMemory();
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to time the search algorithms of each parameter of the table
+ * on a buffer of k*nparams coefficients and set each parameter to the
+ * fastest (see rinterpolate_autotune_search). Returns a tuple of the
+ * list of the methods chosen and the list, per parameter, of the time
+ * in ns per search of each method. The table is set up in the
+ * dataspace if that was not done yet.
+ */
+static PyObject* rinterpolate_autotune_search_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  x_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    Py_ssize_t j, m;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &x_obj))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    /* Get the input buffer */
+    Py_buffer x_view;
+    if (get_double_buffer(x_obj, &x_view, 0) != 0)
+        return NULL;
+
+    const Py_ssize_t nx = x_view.len / x_view.itemsize;
+    const Py_ssize_t k = nparams > 0 ? nx / nparams : 0;
+    if (nx != k * nparams)
+    {
+        PyBuffer_Release(&x_view);
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_autotune_search_wrapper: buffer size does not match nparams");
+        return NULL;
+    }
+
+    double * times = PyMem_Malloc(sizeof(double) * RINTERPOLATE_SEARCH_NUMBER * (nparams > 0 ? nparams : 1));
+    long * chosen = PyMem_Malloc(sizeof(long) * (nparams > 0 ? nparams : 1));
+    if (times == NULL || chosen == NULL)
+    {
+        PyMem_Free(times);
+        PyMem_Free(chosen);
+        PyBuffer_Release(&x_view);
+        return PyErr_NoMemory();
+    }
+
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    rinterpolate_counter_t status;
+    Py_BEGIN_ALLOW_THREADS
+    status = rinterpolate_autotune_search(rinterpolate_table,
+                                          (const double *) x_view.buf,
+                                          (size_t) k,
+                                          times);
+    Py_END_ALLOW_THREADS
+    for(j=0; j<nparams; j++)
+    {
+        chosen[j] = rinterpolate_table->search != NULL ?
+            (long) rinterpolate_table->search[j].method : RINTERPOLATE_SEARCH_BINARY;
+    }
+    unlock_dataspace(dataspace_mem_capsule);
+    PyBuffer_Release(&x_view);
+
+    if (status != 0)
+    {
+        PyMem_Free(times);
+        PyMem_Free(chosen);
+        return PyErr_NoMemory();
+    }
+
+    /* the methods chosen, and the times */
+    PyObject * methods_list = PyList_New(nparams);
+    PyObject * times_list = PyList_New(nparams);
+    if (methods_list == NULL || times_list == NULL)
+    {
+        Py_XDECREF(methods_list);
+        Py_XDECREF(times_list);
+        PyMem_Free(times);
+        PyMem_Free(chosen);
+        return NULL;
+    }
+    for(j=0; j<nparams; j++)
+    {
+        PyObject * axis_times = PyList_New(RINTERPOLATE_SEARCH_NUMBER);
+        if (axis_times == NULL)
+        {
+            Py_DECREF(methods_list);
+            Py_DECREF(times_list);
+            PyMem_Free(times);
+            PyMem_Free(chosen);
+            return NULL;
+        }
+        for(m=0; m<RINTERPOLATE_SEARCH_NUMBER; m++)
+        {
+            PyList_SET_ITEM(axis_times, m, PyFloat_FromDouble(times[j * RINTERPOLATE_SEARCH_NUMBER + m]));
+        }
+        PyList_SET_ITEM(methods_list, j, PyLong_FromLong(chosen[j]));
+        PyList_SET_ITEM(times_list, j, axis_times);
+    }
+    PyMem_Free(times);
+    PyMem_Free(chosen);
+
+    return Py_BuildValue("(NN)", methods_list, times_list);
+}
+
+/*
+ * Function to set up the table in the dataspace as a ragged table,
+ * i.e. a table that only contains the nodes of the parameter grid
+ * that exist (see rinterpolate_make_ragged). Any table with the same
+ * address already in the dataspace is replaced.
+ *
+ * Returns the number of nodes of the full grid.
+ */
+static PyObject* rinterpolate_set_ragged_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiii", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    lock_dataspace(dataspace_mem_capsule);
+    rinterpolate_remove_table(rinterpolate_data, table);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+
+    const rinterpolate_counter_t status = rinterpolate_make_ragged(rinterpolate_table);
+    const unsigned long nnodes = (unsigned long) rinterpolate_table->nnodes;
+    if (status != RINTERPOLATE_NO_ERROR)
+    {
+        rinterpolate_remove_table(rinterpolate_data, table);
+        unlock_dataspace(dataspace_mem_capsule);
+        PyErr_SetString(PyExc_ValueError,
+                        status == RINTERPOLATE_TABLE_NOT_SORTED ?
+                        "rinterpolate_set_ragged_wrapper: the lines of the table are not sorted, or contain the same grid node twice" :
+                        "rinterpolate_set_ragged_wrapper: the parameter grid has too many nodes");
+        return NULL;
+    }
+
+    unlock_dataspace(dataspace_mem_capsule);
+
+    return PyLong_FromUnsignedLong(nnodes);
+}
+
+/*
+ * Function to interpolate the table on the Cartesian product of a
+ * tuple of nparams buffers of coordinates (see rinterpolate_grid),
+ * writing the prod(k_j)*ndata results into the output buffer.
+ */
+static PyObject* rinterpolate_grid_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  axes_obj = NULL;
+    PyObject *  r_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiO!O", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache,
+                         &PyTuple_Type, &axes_obj, &r_obj))
+        return NULL;
+
+    if (nparams <= 0 || PyTuple_GET_SIZE(axes_obj) != nparams)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_grid_wrapper: need one buffer of coordinates per parameter");
+        return NULL;
+    }
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    Py_buffer * views = PyMem_Calloc(nparams + 1, sizeof(Py_buffer));
+    const double ** axes = PyMem_Calloc(nparams, sizeof(double *));
+    rinterpolate_counter_t * k = PyMem_Calloc(nparams, sizeof(rinterpolate_counter_t));
+    Py_ssize_t nviews = 0;
+    Py_ssize_t j, npoints = 1;
+    rinterpolate_counter_t status = 0;
+    PyObject * result = NULL;
+
+    if (views == NULL || axes == NULL || k == NULL)
+    {
+        PyErr_NoMemory();
+        goto cleanup;
+    }
+
+    /* Get the buffers */
+    for(j=0; j<nparams; j++)
+    {
+        if (get_double_buffer(PyTuple_GET_ITEM(axes_obj, j), &views[nviews], 0) != 0)
+            goto cleanup;
+        nviews++;
+        axes[j] = (const double *) views[j].buf;
+        k[j] = (rinterpolate_counter_t) (views[j].len / views[j].itemsize);
+        npoints *= k[j];
+    }
+    if (get_double_buffer(r_obj, &views[nviews], 1) != 0)
+        goto cleanup;
+    nviews++;
+    if (views[nparams].len / views[nparams].itemsize != npoints * ndata)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_grid_wrapper: the output buffer should hold prod(k_j)*ndata items");
+        goto cleanup;
+    }
+
+    double * r = (double *) views[nparams].buf;
+
+    lock_dataspace(dataspace_mem_capsule);
+    Py_BEGIN_ALLOW_THREADS
+    status = rinterpolate_grid(rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache),
+                               axes,
+                               k,
+                               r);
+    Py_END_ALLOW_THREADS
+    unlock_dataspace(dataspace_mem_capsule);
+
+    if (status != 0)
+    {
+        PyErr_NoMemory();
+        goto cleanup;
+    }
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+cleanup:
+    for(j=0; j<nviews; j++)
+    {
+        PyBuffer_Release(&views[j]);
+    }
+    PyMem_Free(views);
+    PyMem_Free(axes);
+    PyMem_Free(k);
+    return result;
+}
+
+/*
+ * Function to interpolate several data blocks on the parameter grid of
+ * the table (which usually has ndata = 0), see rinterpolate_fused.
+ *
+ * blocks is a tuple of float64 buffers, each of nlines*d_b items, and
+ * outs a tuple of writable float64 buffers of k*d_b items, where k is
+ * the number of sets of coefficients in the buffer x (k*nparams items).
+ * The GIL is released during the interpolation.
+ */
+static PyObject* rinterpolate_fused_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  blocks_obj = NULL;
+    PyObject *  x_obj = NULL;
+    PyObject *  outs_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiO!OO!", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache,
+                         &PyTuple_Type, &blocks_obj, &x_obj, &PyTuple_Type, &outs_obj))
+        return NULL;
+
+    const Py_ssize_t nblocks = PyTuple_GET_SIZE(blocks_obj);
+    if (PyTuple_GET_SIZE(outs_obj) != nblocks)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_fused_wrapper: need one output buffer per data block");
+        return NULL;
+    }
+    if (nparams <= 0 || nlines <= 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_fused_wrapper: nparams and nlines must be positive");
+        return NULL;
+    }
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    /* Get the buffers */
+    Py_buffer x_view;
+    if (get_double_buffer(x_obj, &x_view, 0) != 0)
+        return NULL;
+    const Py_ssize_t nx = x_view.len / x_view.itemsize;
+    const Py_ssize_t k = nx / nparams;
+
+    Py_buffer * views = PyMem_Calloc(2 * nblocks + 1, sizeof(Py_buffer));
+    const double ** blocks = PyMem_Calloc(nblocks + 1, sizeof(double *));
+    double ** r = PyMem_Calloc(nblocks + 1, sizeof(double *));
+    rinterpolate_counter_t * block_d = PyMem_Calloc(nblocks + 1, sizeof(rinterpolate_counter_t));
+    Py_ssize_t nviews = 0;
+    Py_ssize_t b, i;
+    rinterpolate_counter_t max_d = 0;
+    struct rinterpolate_table_t * rinterpolate_table = NULL;
+    double * scratch = NULL;
+    PyObject * result = NULL;
+
+    if (views == NULL || blocks == NULL || r == NULL || block_d == NULL)
+    {
+        PyErr_NoMemory();
+        goto cleanup;
+    }
+    if (nx != k * nparams)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_fused_wrapper: the size of the coefficient buffer is not a multiple of nparams");
+        goto cleanup;
+    }
+
+    for(b=0; b<nblocks; b++)
+    {
+        Py_buffer * block_view = &views[nviews];
+        if (get_double_buffer(PyTuple_GET_ITEM(blocks_obj, b), block_view, 0) != 0)
+            goto cleanup;
+        nviews++;
+        Py_buffer * out_view = &views[nviews];
+        if (get_double_buffer(PyTuple_GET_ITEM(outs_obj, b), out_view, 1) != 0)
+            goto cleanup;
+        nviews++;
+
+        const Py_ssize_t nblock = block_view->len / block_view->itemsize;
+        const Py_ssize_t d = nblock / nlines;
+        if (nblock != d * nlines ||
+            out_view->len / out_view->itemsize != k * d)
+        {
+            PyErr_Format(PyExc_ValueError, "rinterpolate_fused_wrapper: buffer sizes of data block %zd do not match nlines and the number of coefficients", b);
+            goto cleanup;
+        }
+        blocks[b] = (const double *) block_view->buf;
+        r[b] = (double *) out_view->buf;
+        block_d[b] = (rinterpolate_counter_t) d;
+        if (block_d[b] > max_d) max_d = block_d[b];
+    }
+
+    lock_dataspace(dataspace_mem_capsule);
+    rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    scratch = PyMem_RawMalloc(sizeof(double) * (max_d + 1) * rinterpolate_table->hypertable_length);
+    if (scratch == NULL)
+    {
+        unlock_dataspace(dataspace_mem_capsule);
+        PyErr_NoMemory();
+        goto cleanup;
+    }
+
+    const double * const x = (const double *) x_view.buf;
+
+    /*
+     * Search the grid once for each set of coefficients,
+     * then advance the output pointers.
+     */
+    Py_BEGIN_ALLOW_THREADS
+    for(i=0; i<k; i++)
+    {
+        rinterpolate_fused(rinterpolate_table,
+                           x + i * nparams,
+                           (rinterpolate_counter_t) nblocks,
+                           blocks,
+                           block_d,
+                           r,
+                           scratch);
+        for(b=0; b<nblocks; b++)
+        {
+            r[b] += block_d[b];
+        }
+    }
+    Py_END_ALLOW_THREADS
+    unlock_dataspace(dataspace_mem_capsule);
+
+    PyMem_RawFree(scratch);
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+cleanup:
+    for(i=0; i<nviews; i++)
+    {
+        PyBuffer_Release(&views[i]);
+    }
+    PyBuffer_Release(&x_view);
+    PyMem_Free(views);
+    PyMem_Free(blocks);
+    PyMem_Free(r);
+    PyMem_Free(block_d);
+    return result;
+}
+
+/*
+ * Function to locate a buffer of k*nparams coefficients in the table:
+ * the lines of the 2^nparams corners of the hypercube around each are
+ * written to the int64 buffer corners, their weights to the float64
+ * buffer weights (both k*2^nparams items). See rinterpolate_locate.
+ */
+static PyObject* rinterpolate_locate_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  x_obj = NULL;
+    PyObject *  corners_obj = NULL;
+    PyObject *  weights_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiOOO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache,
+                         &x_obj, &corners_obj, &weights_obj))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    /* Get the buffers */
+    Py_buffer x_view, corners_view, weights_view;
+    if (get_double_buffer(x_obj, &x_view, 0) != 0)
+        return NULL;
+    if (get_int64_buffer(corners_obj, &corners_view, 1) != 0)
+    {
+        PyBuffer_Release(&x_view);
+        return NULL;
+    }
+    if (get_double_buffer(weights_obj, &weights_view, 1) != 0)
+    {
+        PyBuffer_Release(&x_view);
+        PyBuffer_Release(&corners_view);
+        return NULL;
+    }
+
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    const Py_ssize_t ncorners = rinterpolate_table->hypertable_length;
+    const Py_ssize_t nx = x_view.len / x_view.itemsize;
+    const Py_ssize_t k = nparams > 0 ? nx / nparams : 0;
+
+    if (nx != k * nparams ||
+        corners_view.len / corners_view.itemsize != k * ncorners ||
+        weights_view.len / weights_view.itemsize != k * ncorners)
+    {
+        unlock_dataspace(dataspace_mem_capsule);
+        PyBuffer_Release(&x_view);
+        PyBuffer_Release(&corners_view);
+        PyBuffer_Release(&weights_view);
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_locate_wrapper: buffer sizes do not match nparams");
+        return NULL;
+    }
+
+    const double * const x = (const double *) x_view.buf;
+    int64_t * const corners = (int64_t *) corners_view.buf;
+    double * const weights = (double *) weights_view.buf;
+    Py_ssize_t i;
+
+    Py_BEGIN_ALLOW_THREADS
+    for(i=0; i<k; i++)
+    {
+        rinterpolate_locate(rinterpolate_table,
+                            x + i * nparams,
+                            corners + i * ncorners,
+                            weights + i * ncorners);
+    }
+    Py_END_ALLOW_THREADS
+    unlock_dataspace(dataspace_mem_capsule);
+
+    PyBuffer_Release(&x_view);
+    PyBuffer_Release(&corners_view);
+    PyBuffer_Release(&weights_view);
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to evaluate a table from precomputed corners and weights,
+ * see rinterpolate_apply_weights. The table is either a TABLE capsule
+ * or a float64 buffer, of nlines lines of line_length items. columns is
+ * an int64 buffer with the items of each line to evaluate, out a writable
+ * float64 buffer of k*len(columns) items.
+ */
+static PyObject* rinterpolate_apply_weights_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  table_obj = NULL;
+    PyObject *  columns_obj = NULL;
+    PyObject *  corners_obj = NULL;
+    PyObject *  weights_obj = NULL;
+    PyObject *  r_obj = NULL;
+    Py_ssize_t nlines = -1;
+    Py_ssize_t line_length = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OnnOOOO", &table_obj, &nlines, &line_length,
+                         &columns_obj, &corners_obj, &weights_obj, &r_obj))
+        return NULL;
+
+    /* Get the table, from a capsule or a buffer */
+    Py_buffer table_view;
+    int have_table_view = 0;
+    const double * table = get_table_data(table_obj, &table_view, &have_table_view, nlines, line_length);
+    if (table == NULL)
+        return NULL;
+
+    /* Get the other buffers */
+    Py_buffer views[4];
+    int nviews = 0;
+    Py_ssize_t i;
+    PyObject * result = NULL;
+    if (get_int64_buffer(columns_obj, &views[0], 0) != 0)
+        goto cleanup;
+    nviews++;
+    if (get_int64_buffer(corners_obj, &views[1], 0) != 0)
+        goto cleanup;
+    nviews++;
+    if (get_double_buffer(weights_obj, &views[2], 0) != 0)
+        goto cleanup;
+    nviews++;
+    if (get_double_buffer(r_obj, &views[3], 1) != 0)
+        goto cleanup;
+    nviews++;
+
+    const int64_t * const columns = (const int64_t *) views[0].buf;
+    const int64_t * const corners = (const int64_t *) views[1].buf;
+    const Py_ssize_t ncolumns = views[0].len / views[0].itemsize;
+    const Py_ssize_t nweights = views[2].len / views[2].itemsize;
+    const Py_ssize_t nr = views[3].len / views[3].itemsize;
+    const Py_ssize_t k = ncolumns > 0 ? nr / ncolumns : 0;
+    const Py_ssize_t ncorners = k > 0 ? nweights / k : 0;
+
+    if (views[1].len / views[1].itemsize != nweights ||
+        nr != k * ncolumns ||
+        nweights != k * ncorners)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_apply_weights_wrapper: buffer sizes do not match");
+        goto cleanup;
+    }
+    if (check_columns(columns, ncolumns, line_length) != 0)
+        goto cleanup;
+    for(i=0; i<nweights; i++)
+    {
+        if (corners[i] >= nlines)
+        {
+            PyErr_Format(PyExc_IndexError, "rinterpolate_apply_weights_wrapper: corner line %lld out of range", (long long) corners[i]);
+            goto cleanup;
+        }
+    }
+
+    /*
+     * The GIL is only released if the table is a buffer, which cannot be
+     * resized while it is exported: a C_table can be reallocated by
+     * rinterpolate_append_C_table, which holds the GIL.
+     */
+    PyThreadState * thread_state = have_table_view ? PyEval_SaveThread() : NULL;
+    rinterpolate_apply_weights(table,
+                               line_length,
+                               ncolumns,
+                               columns,
+                               k,
+                               ncorners,
+                               corners,
+                               (const double *) views[2].buf,
+                               (double *) views[3].buf);
+    if (thread_state != NULL)
+        PyEval_RestoreThread(thread_state);
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+cleanup:
+    for(i=0; i<nviews; i++)
+    {
+        PyBuffer_Release(&views[i]);
+    }
+    if (have_table_view)
+        PyBuffer_Release(&table_view);
+    return result;
+}
+
+/*
+ * Function to multiply a sparse interpolation matrix of k rows, in CSR
+ * format (int64 indptr of k+1 items, int64 indices and float64 weights),
+ * by columns of a table, see rinterpolate_sparse_apply. The table is
+ * either a TABLE capsule or a float64 buffer, of nlines lines of
+ * line_length items. out is a writable float64 buffer of k*len(columns)
+ * items.
+ */
+static PyObject* rinterpolate_sparse_apply_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  table_obj = NULL;
+    PyObject *  columns_obj = NULL;
+    PyObject *  indptr_obj = NULL;
+    PyObject *  indices_obj = NULL;
+    PyObject *  weights_obj = NULL;
+    PyObject *  r_obj = NULL;
+    Py_ssize_t nlines = -1;
+    Py_ssize_t line_length = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OnnOOOOO", &table_obj, &nlines, &line_length,
+                         &columns_obj, &indptr_obj, &indices_obj, &weights_obj, &r_obj))
+        return NULL;
+
+    /* Get the table, from a capsule or a buffer */
+    Py_buffer table_view;
+    int have_table_view = 0;
+    const double * table = get_table_data(table_obj, &table_view, &have_table_view, nlines, line_length);
+    if (table == NULL)
+        return NULL;
+
+    /* Get the other buffers */
+    Py_buffer views[5];
+    int nviews = 0;
+    Py_ssize_t i;
+    PyObject * result = NULL;
+    if (get_int64_buffer(columns_obj, &views[0], 0) != 0)
+        goto cleanup;
+    nviews++;
+    if (get_int64_buffer(indptr_obj, &views[1], 0) != 0)
+        goto cleanup;
+    nviews++;
+    if (get_int64_buffer(indices_obj, &views[2], 0) != 0)
+        goto cleanup;
+    nviews++;
+    if (get_double_buffer(weights_obj, &views[3], 0) != 0)
+        goto cleanup;
+    nviews++;
+    if (get_double_buffer(r_obj, &views[4], 1) != 0)
+        goto cleanup;
+    nviews++;
+
+    const int64_t * const columns = (const int64_t *) views[0].buf;
+    const int64_t * const indptr = (const int64_t *) views[1].buf;
+    const int64_t * const indices = (const int64_t *) views[2].buf;
+    const Py_ssize_t ncolumns = views[0].len / views[0].itemsize;
+    const Py_ssize_t k = views[1].len / views[1].itemsize - 1;
+    const Py_ssize_t nnz = views[2].len / views[2].itemsize;
+
+    if (k < 0 ||
+        views[3].len / views[3].itemsize != nnz ||
+        views[4].len / views[4].itemsize != k * ncolumns)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_sparse_apply_wrapper: buffer sizes do not match");
+        goto cleanup;
+    }
+    if (check_columns(columns, ncolumns, line_length) != 0)
+        goto cleanup;
+    if (indptr[0] != 0 || indptr[k] != nnz)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_sparse_apply_wrapper: indptr does not match the number of weights");
+        goto cleanup;
+    }
+    for(i=0; i<k; i++)
+    {
+        if (indptr[i+1] < indptr[i])
+        {
+            PyErr_SetString(PyExc_ValueError, "rinterpolate_sparse_apply_wrapper: indptr is not sorted");
+            goto cleanup;
+        }
+    }
+    for(i=0; i<nnz; i++)
+    {
+        if (indices[i] >= nlines)
+        {
+            PyErr_Format(PyExc_IndexError, "rinterpolate_sparse_apply_wrapper: line %lld out of range", (long long) indices[i]);
+            goto cleanup;
+        }
+    }
+
+    /*
+     * The GIL is only released if the table is a buffer, which cannot be
+     * resized while it is exported: a C_table can be reallocated by
+     * rinterpolate_append_C_table, which holds the GIL.
+     */
+    PyThreadState * thread_state = have_table_view ? PyEval_SaveThread() : NULL;
+    rinterpolate_sparse_apply(table,
+                              line_length,
+                              ncolumns,
+                              columns,
+                              k,
+                              indptr,
+                              indices,
+                              (const double *) views[3].buf,
+                              (double *) views[4].buf);
+    if (thread_state != NULL)
+        PyEval_RestoreThread(thread_state);
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+cleanup:
+    for(i=0; i<nviews; i++)
+    {
+        PyBuffer_Release(&views[i]);
+    }
+    if (have_table_view)
+        PyBuffer_Release(&table_view);
+    return result;
+}
+
+/*
+ * Function to overwrite data in the C_table in place. With column = -1
+ * values is a float64 buffer of nlines*ndata items with all the data,
+ * otherwise it is a buffer of nlines items with the data of that
+ * column (0 = first data column).
+ *
+ * The table in the dataspace keeps its steps, varcount and presearch
+ * arrays, only its cache is cleared (see rinterpolate_update_data).
+ */
+static PyObject* rinterpolate_update_C_table(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  values_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int column = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &column, &values_obj))
+        return NULL;
+
+    if (column < -1 || column >= ndata)
+    {
+        PyErr_Format(PyExc_IndexError, "rinterpolate_update_C_table: data column %d out of range", column);
+        return NULL;
+    }
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    Py_buffer values_view;
+    if (get_double_buffer(values_obj, &values_view, 0) != 0)
+        return NULL;
+
+    const Py_ssize_t ncolumns = column == -1 ? ndata : 1;
+    if (values_view.len / values_view.itemsize != (Py_ssize_t) nlines * ncolumns)
+    {
+        PyBuffer_Release(&values_view);
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_update_C_table: the number of values does not match the table");
+        return NULL;
+    }
+
+    const double * const values = (const double *) values_view.buf;
+    const Py_ssize_t line_length = nparams + ndata;
+    const Py_ssize_t offset = nparams + (column == -1 ? 0 : column);
+    Py_ssize_t i;
+
+    lock_dataspace(dataspace_mem_capsule);
+    for(i=0; i<nlines; i++)
+    {
+        memcpy(table + i * line_length + offset,
+               values + i * ncolumns,
+               ncolumns * sizeof(double));
+    }
+    rinterpolate_update_data(rinterpolate_data, table);
+    unlock_dataspace(dataspace_mem_capsule);
+
+    PyBuffer_Release(&values_view);
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to append lines to the C_table. The table has nlines lines,
+ * with memory for capacity lines. new_lines is a float64 buffer with the
+ * lines to append, which should be slices along the first parameter
+ * (see rinterpolate_append_lines).
+ *
+ * If the lines do not fit, the memory of the C_table is grown to (at
+ * least) twice the capacity, and the pointer in the capsule is updated.
+ * The table in the dataspace is extended rather than rebuilt.
+ *
+ * The new lines are checked before anything is changed, so if they are
+ * rejected (with a ValueError) the C_table and its capsule are as they were.
+ *
+ * Returns the new capacity.
+ */
+static PyObject* rinterpolate_append_C_table(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    PyObject *  lines_obj = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    Py_ssize_t capacity = -1;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiinO", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &capacity, &lines_obj))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    Py_buffer lines_view;
+    if (get_double_buffer(lines_obj, &lines_view, 0) != 0)
+        return NULL;
+
+    const Py_ssize_t line_length = nparams + ndata;
+    const Py_ssize_t nnew = lines_view.len / lines_view.itemsize / line_length;
+    if (lines_view.len / lines_view.itemsize != nnew * line_length ||
+        nlines + nnew > UINT_MAX)
+    {
+        PyBuffer_Release(&lines_view);
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_append_C_table: the new lines do not match nparams and ndata");
+        return NULL;
+    }
+
+    /* The table in the dataspace, if it is set up */
+    lock_dataspace(dataspace_mem_capsule);
+    const rinterpolate_signed_counter_t table_id = rinterpolate_id_table(rinterpolate_data, table);
+    struct rinterpolate_table_t * const rinterpolate_table =
+        table_id != -1 ? rinterpolate_data->tables[table_id] : NULL;
+
+    if (rinterpolate_table != NULL &&
+        rinterpolate_check_append(rinterpolate_table,
+                                  (const double *) lines_view.buf,
+                                  (rinterpolate_counter_t) nnew) != RINTERPOLATE_NO_ERROR)
+    {
+        unlock_dataspace(dataspace_mem_capsule);
+        PyBuffer_Release(&lines_view);
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_append_C_table: the new lines are not slices of the grid along the first parameter, with increasing values");
+        return NULL;
+    }
+
+    /* Grow the memory geometrically */
+    if (nlines + nnew > capacity)
+    {
+        const Py_ssize_t new_capacity = Py_MAX(nlines + nnew, 2 * capacity);
+        double * const new_table = Rinterpolate_realloc(table, sizeof(double) * new_capacity * line_length);
+        if (new_table == NULL)
+        {
+            unlock_dataspace(dataspace_mem_capsule);
+            PyBuffer_Release(&lines_view);
+            return PyErr_NoMemory();
+        }
+        table = new_table;
+        capacity = new_capacity;
+        PyCapsule_SetPointer(C_table_capsule, table);
+    }
+
+    memcpy(table + (size_t) nlines * line_length,
+           lines_view.buf,
+           sizeof(double) * nnew * line_length);
+    PyBuffer_Release(&lines_view);
+
+    /* the lines were checked above, so this cannot fail */
+    if (rinterpolate_table != NULL)
+    {
+        rinterpolate_append_lines(rinterpolate_table, table, nlines + nnew);
+    }
+    unlock_dataspace(dataspace_mem_capsule);
+
+    return PyLong_FromSsize_t(capacity);
+}
+
+/*
+ * Function to check the lines start to end-1 of the table, see
+ * rinterpolate_check_table. The table is set up in the dataspace
+ * if that was not done yet. The GIL is released during the check,
+ * so separate ranges can be checked in parallel from python threads.
+ *
+ * Only the set up is done with the dataspace locked (see
+ * lock_dataspace): the check only reads the lines and grid of the
+ * table, which interpolations do not change, so it runs alongside
+ * them. The table must not be changed (e.g. appended to) meanwhile.
+ *
+ * Raises a ValueError if the table is not a regular, sorted grid.
+ */
+static PyObject* rinterpolate_check_table_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    int start = 0;
+    int end = 0;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OOiiiiii", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &start, &end))
+        return NULL;
+
+    if (start < 0 || end < start || end > nlines)
+    {
+        PyErr_SetString(PyExc_ValueError, "rinterpolate_check_table_wrapper: invalid range of lines");
+        return NULL;
+    }
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    /* set up (with the GIL held) before the parallel part */
+    lock_dataspace(dataspace_mem_capsule);
+    struct rinterpolate_table_t * rinterpolate_table =
+        rinterpolate_find_table(rinterpolate_data, table, nparams, ndata, nlines, usecache);
+    unlock_dataspace(dataspace_mem_capsule);
+
+    rinterpolate_counter_t status;
+    rinterpolate_counter_t bad_line = 0;
+    Py_BEGIN_ALLOW_THREADS
+    status = rinterpolate_check_table(rinterpolate_table, start, end, &bad_line);
+    Py_END_ALLOW_THREADS
+
+    if (status == RINTERPOLATE_TABLE_NOT_SORTED)
+    {
+        PyErr_Format(PyExc_ValueError, "the grid values of a parameter do not increase at line %u", bad_line);
+        return NULL;
+    }
+    else if (status == RINTERPOLATE_TABLE_NOT_REGULAR && bad_line == (rinterpolate_counter_t) nlines)
+    {
+        PyErr_Format(PyExc_ValueError, "the parameters do not form a regular grid of %d lines", nlines);
+        return NULL;
+    }
+    else if (status == RINTERPOLATE_TABLE_NOT_REGULAR)
+    {
+        PyErr_Format(PyExc_ValueError, "line %u is not on the regular grid of the table", bad_line);
+        return NULL;
+    }
+
+    Py_RETURN_NONE;
+}
+
+/***********************************************************
+ * Prepared interpolator type
+ ***********************************************************/
+
+/*
+ * A callable that interpolates one set of coefficients with as little
+ * overhead per call as possible: it holds the C_table and dataspace
+ * capsules, the table dimensions and scratch space for x and r, so
+ * that a call only converts the coefficients, interpolates and builds
+ * the result tuple. With python >= 3.9 it is called through vectorcall,
+ * so no argument tuple is made.
+ *
+ * The table pointer is read from the capsule at each call, so the
+ * callable follows an append (realloc) of the table. If the C_table or
+ * the dataspace is freed, the call raises a RuntimeError.
+ */
+typedef struct {
+    PyObject_HEAD
+    PyObject * C_table_capsule;
+    PyObject * dataspace_mem_capsule;
+    int nparams;
+    int ndata;
+    int nlines;
+    int usecache;
+    int mode;
+    double * x;
+    double * r;
+#if PY_VERSION_HEX >= 0x03090000
+    vectorcallfunc vectorcall;
+#endif
+} PreparedInterpolatorObject;
+
+static char prepared_interpolator_docstring[] =
+    "_PreparedInterpolator(C_table, dataspace, nparams, ndata, nlines, usecache, mode)\n\n"
+    "Callable that interpolates the table on one set of nparams coefficients, given as a tuple, "
+    "list or float64 buffer, and returns a tuple of ndata results. If a writable float64 buffer "
+    "of ndata items is passed as out, the results are written into it and it is returned.";
+
+/*
+ * Copy the coefficients from a tuple, list or float64 buffer into x.
+ * Returns 0 on success, -1 (with the python error set) on failure.
+ */
+static int prepared_get_x(PreparedInterpolatorObject * self, PyObject * x_obj)
+{
+    const int nparams = self->nparams;
+    int i;
+
+    if (PyTuple_CheckExact(x_obj) || PyList_CheckExact(x_obj))
+    {
+        PyObject ** items = PySequence_Fast_ITEMS(x_obj);
+        if (PySequence_Fast_GET_SIZE(x_obj) != nparams)
+        {
+            PyErr_Format(PyExc_ValueError, "expected %d coefficients, got %zd", nparams, PySequence_Fast_GET_SIZE(x_obj));
+            return -1;
+        }
+        for(i=0; i<nparams; i++)
+        {
+            if (PyFloat_CheckExact(items[i]))
+            {
+                self->x[i] = PyFloat_AS_DOUBLE(items[i]);
+            }
+            else
+            {
+                self->x[i] = PyFloat_AsDouble(items[i]);
+                if (self->x[i] == -1.0 && PyErr_Occurred())
+                    return -1;
+            }
+        }
+        return 0;
+    }
+
+    Py_buffer view;
+    if (get_double_buffer(x_obj, &view, 0) != 0)
+        return -1;
+    if (view.len / view.itemsize != nparams)
+    {
+        PyErr_Format(PyExc_ValueError, "expected %d coefficients, got %zd", nparams, view.len / view.itemsize);
+        PyBuffer_Release(&view);
+        return -1;
+    }
+    memcpy(self->x, view.buf, sizeof(double) * nparams);
+    PyBuffer_Release(&view);
+    return 0;
+}
+
+/*
+ * Interpolate the coefficients x_obj. If out_obj is not NULL, the results
+ * are written into it (a writable float64 buffer of ndata items) and it is
+ * returned, so no python objects are made. Otherwise a tuple is returned.
+ */
+static PyObject * prepared_interpolator_call_impl(PreparedInterpolatorObject * self,
+                                                  PyObject * x_obj,
+                                                  PyObject * out_obj)
+{
+    if (!PyCapsule_IsValid(self->C_table_capsule, "TABLE") ||
+        !PyCapsule_IsValid(self->dataspace_mem_capsule, "DATASPACE"))
+    {
+        PyErr_SetString(PyExc_RuntimeError, "the table of this prepared interpolator has been freed, prepare it again");
+        return NULL;
+    }
+
+    Py_buffer out_view;
+    double * r = self->r;
+    if (out_obj != NULL && out_obj != Py_None)
+    {
+        if (get_double_buffer(out_obj, &out_view, 1) != 0)
+            return NULL;
+        if (out_view.len / out_view.itemsize != self->ndata)
+        {
+            PyErr_Format(PyExc_ValueError, "the output buffer should have %d items, got %zd", self->ndata, out_view.len / out_view.itemsize);
+            PyBuffer_Release(&out_view);
+            return NULL;
+        }
+        r = (double *) out_view.buf;
+    }
+
+    /*
+     * self->x and self->r are shared by the threads that call this
+     * interpolator, so they are only used with the dataspace locked.
+     * The GIL may be released while waiting for the lock, so check
+     * again that the table was not freed meanwhile.
+     */
+    PyObject * result = NULL;
+    lock_dataspace(self->dataspace_mem_capsule);
+    if (!PyCapsule_IsValid(self->C_table_capsule, "TABLE") ||
+        !PyCapsule_IsValid(self->dataspace_mem_capsule, "DATASPACE"))
+    {
+        PyErr_SetString(PyExc_RuntimeError, "the table of this prepared interpolator has been freed, prepare it again");
+        goto done;
+    }
+    const double * const table = PyCapsule_GetPointer(self->C_table_capsule, "TABLE");
+    struct rinterpolate_data_t * const rinterpolate_data = PyCapsule_GetPointer(self->dataspace_mem_capsule, "DATASPACE");
+
+    if (prepared_get_x(self, x_obj) != 0)
+        goto done;
+
+    if (self->mode == RINTERPOLATE_MODE_LINEAR)
+    {
+        rinterpolate(table,
+                     rinterpolate_data,
+                     self->nparams,
+                     self->ndata,
+                     self->nlines,
+                     self->x,
+                     r,
+                     self->usecache);
+    }
+    else
+    {
+        evaluate_table(rinterpolate_find_table(rinterpolate_data, table, self->nparams, self->ndata, self->nlines, self->usecache),
+                       self->x,
+                       r,
+                       self->mode);
+    }
+
+    if (r != self->r)
+    {
+        Py_INCREF(out_obj);
+        result = out_obj;
+        goto done;
+    }
+
+    result = PyTuple_New(self->ndata);
+    if (result == NULL)
+        goto done;
+    int i;
+    for(i=0; i<self->ndata; i++)
+    {
+        PyObject * num = PyFloat_FromDouble(self->r[i]);
+        if (num == NULL)
+        {
+            Py_CLEAR(result);
+            goto done;
+        }
+        PyTuple_SET_ITEM(result, i, num);
+    }
+
+done:
+    unlock_dataspace(self->dataspace_mem_capsule);
+    if (r != self->r)
+        PyBuffer_Release(&out_view);
+    return result;
+}
+
+#if PY_VERSION_HEX >= 0x03090000
+static PyObject * prepared_interpolator_vectorcall(PyObject * self,
+                                                   PyObject * const * args,
+                                                   size_t nargsf,
+                                                   PyObject * kwnames)
+{
+    const Py_ssize_t nargs = PyVectorcall_NARGS(nargsf);
+    const Py_ssize_t nkwargs = kwnames != NULL ? PyTuple_GET_SIZE(kwnames) : 0;
+    PyObject * out_obj = NULL;
+
+    if (nkwargs == 1 &&
+        PyUnicode_CompareWithASCIIString(PyTuple_GET_ITEM(kwnames, 0), "out") == 0)
+    {
+        out_obj = args[nargs];
+    }
+    else if (nkwargs != 0)
+    {
+        PyErr_SetString(PyExc_TypeError, "a prepared interpolator only takes the keyword argument out");
+        return NULL;
+    }
+
+    if (nargs == 2 && out_obj == NULL)
+    {
+        out_obj = args[1];
+    }
+    else if (nargs != 1)
+    {
+        PyErr_SetString(PyExc_TypeError, "a prepared interpolator takes the coefficients and, optionally, out");
+        return NULL;
+    }
+
+    return prepared_interpolator_call_impl((PreparedInterpolatorObject *) self,
+                                           args[0],
+                                           out_obj);
+}
+#else
+static PyObject * prepared_interpolator_call(PyObject * self, PyObject * args, PyObject * kwargs)
+{
+    static char * kwlist[] = {"x", "out", NULL};
+    PyObject * x_obj = NULL;
+    PyObject * out_obj = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|O", kwlist, &x_obj, &out_obj))
+        return NULL;
+
+    return prepared_interpolator_call_impl((PreparedInterpolatorObject *) self,
+                                           x_obj,
+                                           out_obj);
+}
+#endif
+
+static PyObject * prepared_interpolator_new(PyTypeObject * type, PyObject * args, PyObject * kwargs)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+    int nparams = -1;
+    int ndata = -1;
+    int nlines = -1;
+    int usecache = -1;
+    int mode = RINTERPOLATE_MODE_LINEAR;
+
+    if(!PyArg_ParseTuple(args, "OOiiiii", &C_table_capsule, &dataspace_mem_capsule, &nparams, &ndata, &nlines, &usecache, &mode))
+        return NULL;
+
+    if (check_mode(mode) != 0)
+        return NULL;
+    if (unpack_C_table_capsule(C_table_capsule) == NULL ||
+        unpack_dataspace_capsule(dataspace_mem_capsule) == NULL)
+        return NULL;
+    if (nparams <= 0 || ndata < 0 || nlines <= 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "_PreparedInterpolator: invalid table dimensions");
+        return NULL;
+    }
+
+    PreparedInterpolatorObject * self = (PreparedInterpolatorObject *) type->tp_alloc(type, 0);
+    if (self == NULL)
+        return NULL;
+
+    self->x = PyMem_Malloc(sizeof(double) * nparams);
+    self->r = PyMem_Malloc(sizeof(double) * (ndata + 1));
+    if (self->x == NULL || self->r == NULL)
+    {
+        Py_DECREF(self);
+        return PyErr_NoMemory();
+    }
+
+    Py_INCREF(C_table_capsule);
+    Py_INCREF(dataspace_mem_capsule);
+    self->C_table_capsule = C_table_capsule;
+    self->dataspace_mem_capsule = dataspace_mem_capsule;
+    self->nparams = nparams;
+    self->ndata = ndata;
+    self->nlines = nlines;
+    self->usecache = usecache;
+    self->mode = mode;
+#if PY_VERSION_HEX >= 0x03090000
+    self->vectorcall = prepared_interpolator_vectorcall;
+#endif
+
+    return (PyObject *) self;
+}
+
+static void prepared_interpolator_dealloc(PyObject * obj)
+{
+    PreparedInterpolatorObject * self = (PreparedInterpolatorObject *) obj;
+    Py_XDECREF(self->C_table_capsule);
+    Py_XDECREF(self->dataspace_mem_capsule);
+    PyMem_Free(self->x);
+    PyMem_Free(self->r);
+    Py_TYPE(obj)->tp_free(obj);
+}
+
+static PyTypeObject PreparedInterpolatorType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "py_rinterpolate._py_rinterpolate._PreparedInterpolator",
+    .tp_doc = prepared_interpolator_docstring,
+    .tp_basicsize = sizeof(PreparedInterpolatorObject),
+    .tp_itemsize = 0,
+    .tp_new = prepared_interpolator_new,
+    .tp_dealloc = prepared_interpolator_dealloc,
+#if PY_VERSION_HEX >= 0x03090000
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_VECTORCALL,
+    .tp_vectorcall_offset = offsetof(PreparedInterpolatorObject, vectorcall),
+    .tp_call = PyVectorcall_Call,
+#else
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_call = prepared_interpolator_call,
+#endif
+};
+
+/*
+ * Function to get the length of the cache of the table in the
+ * dataspace, whether it is sized automatically, and then the hit rate
+ * of the last window (None before the first window ends). The table
+ * is not set up if it is not in the dataspace.
+ */
+static PyObject* rinterpolate_cache_info_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OO", &C_table_capsule, &dataspace_mem_capsule))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    unsigned int cache_length = 0;
+    int automatic = 0;
+    double hit_rate = -1.0;
+    lock_dataspace(dataspace_mem_capsule);
+    const rinterpolate_signed_counter_t table_id = rinterpolate_id_table(rinterpolate_data, table);
+    if (table_id != -1)
+    {
+        const struct rinterpolate_table_t * rinterpolate_table = rinterpolate_data->tables[table_id];
+        const struct rinterpolate_cache_stats_t * stats = rinterpolate_table->cache_stats;
+        cache_length = (unsigned int) rinterpolate_table->cache_length;
+        automatic = stats != NULL;
+        hit_rate = stats != NULL ? stats->hit_rate : -1.0;
+    }
+    unlock_dataspace(dataspace_mem_capsule);
+
+    if (hit_rate < 0.0)
+    {
+        return Py_BuildValue("{s:I,s:O,s:O}",
+                             "cache_length", cache_length,
+                             "auto", automatic ? Py_True : Py_False,
+                             "hit_rate", Py_None);
+    }
+    return Py_BuildValue("{s:I,s:O,s:d}",
+                         "cache_length", cache_length,
+                         "auto", Py_True,
+                         "hit_rate", hit_rate);
+}
+
+/*
+ * Function to get the number of bytes allocated by librinterpolate for
+ * the table (zero if it is not yet set up in the dataspace), by structure,
+ * and for all the tables in the dataspace.
+ */
+static PyObject* rinterpolate_memory_usage_wrapper(PyObject *self, PyObject *args)
+{
+    PyObject *  C_table_capsule = NULL;
+    PyObject *  dataspace_mem_capsule = NULL;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "OO", &C_table_capsule, &dataspace_mem_capsule))
+        return NULL;
+
+    /* Unpack the capsules */
+    double * table = unpack_C_table_capsule(C_table_capsule);
+    if (table == NULL)
+        return NULL;
+    struct rinterpolate_data_t * rinterpolate_data = unpack_dataspace_capsule(dataspace_mem_capsule);
+    if (rinterpolate_data == NULL)
+        return NULL;
+
+    struct rinterpolate_memory_t memory;
+    memset(&memory, 0, sizeof(struct rinterpolate_memory_t));
+    lock_dataspace(dataspace_mem_capsule);
+    const rinterpolate_signed_counter_t table_id = rinterpolate_id_table(rinterpolate_data, table);
+    if (table_id != -1)
+    {
+        rinterpolate_table_memory(rinterpolate_data->tables[table_id], &memory);
+    }
+    const size_t dataspace_memory = rinterpolate_dataspace_memory(rinterpolate_data);
+    unlock_dataspace(dataspace_mem_capsule);
+
+    return Py_BuildValue("{s:n,s:n,s:n,s:n,s:n,s:n,s:n,s:n}",
+                         "table", (Py_ssize_t) memory.table,
+                         "cache", (Py_ssize_t) memory.cache,
+                         "cell_cache", (Py_ssize_t) memory.cell_cache,
+                         "presearch", (Py_ssize_t) memory.presearch,
+                         "hypertable", (Py_ssize_t) memory.hypertable,
+                         "layout", (Py_ssize_t) memory.layout,
+                         "mask", (Py_ssize_t) memory.mask,
+                         "dataspace", (Py_ssize_t) dataspace_memory);
+}
+
+/*
+ * Function to choose the allocator of librinterpolate and the C_tables:
+ * the python raw allocator, which tracemalloc traces, if tracked is true,
+ * else the standard malloc. This can only be changed while no dataspace
+ * or C_table is allocated.
+ */
+static PyObject* rinterpolate_set_tracked_allocation(PyObject *self, PyObject *args)
+{
+    int tracked = 0;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "p", &tracked))
+        return NULL;
+
+    if ((rinterpolate_allocator.malloc_function == PyMem_RawMalloc) == (tracked != 0))
+        Py_RETURN_NONE;
+
+    if (live_allocations != 0)
+    {
+        PyErr_Format(PyExc_RuntimeError,
+                     "rinterpolate_set_tracked_allocation: cannot change the allocator while %zd dataspaces or C_tables are allocated",
+                     live_allocations);
+        return NULL;
+    }
+
+    rinterpolate_set_allocator(tracked ? &tracked_allocator : NULL);
+
+    Py_RETURN_NONE;
+}
+
+/*
+ * Function to choose the level of the SIMD kernels (RINTERPOLATE_SIMD_*,
+ * or -1 for the highest level supported by the CPU)
+ */
+static PyObject* rinterpolate_set_simd_wrapper(PyObject *self, PyObject *args)
+{
+    int level = RINTERPOLATE_SIMD_AUTO;
+
+    /* Parse the input tuple */
+    if(!PyArg_ParseTuple(args, "i", &level))
+        return NULL;
+
+    const rinterpolate_signed_counter_t use = rinterpolate_set_simd(level);
+    if (use == -1)
+    {
+        PyErr_Format(PyExc_ValueError,
+                     "rinterpolate_set_simd: SIMD level %d is not supported by this CPU (the highest is %d)",
+                     level,
+                     rinterpolate_simd_supported());
+        return NULL;
+    }
+
+    return PyLong_FromLong(use);
+}
+
+/*
+ * Function to get the level of the SIMD kernels in use (-1 if not yet
+ * chosen) and the highest level supported by the CPU
+ */
+static PyObject* rinterpolate_simd_level_wrapper(PyObject *self, PyObject *args)
+{
+    return Py_BuildValue("(ii)", rinterpolate_simd.level, rinterpolate_simd_supported());
+}